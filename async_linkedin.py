@@ -0,0 +1,151 @@
+"""
+Provides asyncio flavour of the linkedin api-related code
+"""
+
+import asyncio
+import time
+from random import randrange
+
+from salesloop_linkedin_api.client import AsyncClient
+from salesloop_linkedin_api.linkedin import Linkedin, logger
+import salesloop_linkedin_api.settings as settings
+from salesloop_linkedin_api.utils.pacing import EvadePolicy
+from salesloop_linkedin_api.utils.pagination import AsyncPagedIterator
+from salesloop_linkedin_api.utils.request_flow import async_iter_flow, async_run_flow
+
+
+class AsyncLinkedin(Linkedin):
+    """
+    Class for accessing LinkedIn API from asyncio code.
+
+    Exposes the same methods as `Linkedin`, but every method doing requests is a coroutine.
+    Requests are sent with the async curl_cffi session and evasion delays are awaited,
+    so one event loop can drive many accounts concurrently.
+    """
+
+    _CLIENT_CLASS = AsyncClient
+    _PAGED_ITERATOR_CLASS = AsyncPagedIterator
+    # Async sessions are bound to the event loop, they aren't reused
+    _CACHE_CLIENTS = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        self.flush_statistics()
+        await self.client.close()
+
+    async def _acquire_quota(self, request_type):
+        if self.quota:
+            await self.quota.async_acquire(self.pacing_key, request_type)
+
+    async def _evade(self, evade):
+        if isinstance(evade, EvadePolicy):
+            await self.pacing.async_wait(self.pacing_key, evade)
+        elif evade:
+            await evade()
+
+    async def _request(self, method, uri, evade, raw_url, allowed_status_codes, kwargs):
+        record = self._request_record(method, uri, raw_url)
+        started = time.perf_counter()
+        await self._evade(evade)
+        record.evade_time = time.perf_counter() - started
+
+        @self._retry(method, uri, record)
+        async def send_request():
+            # Each attempt, including backoff retries, takes a token of the account quota
+            started = time.perf_counter()
+            await self._acquire_quota(record.request_type)
+            record.evade_time += time.perf_counter() - started
+
+            url = self._prepare_request(method, uri, raw_url, kwargs)
+            send = self.client.session.post if method == "POST" else self.client.session.get
+
+            started = time.perf_counter()
+            try:
+                response = await send(url, **kwargs)
+            finally:
+                record.network_time += time.perf_counter() - started
+            return self._check_response(
+                record, url, response, time.perf_counter() - started, allowed_status_codes
+            )
+
+        try:
+            return await self._finish_request(record, send_request)
+        finally:
+            # Next requests of the account are spaced from the end of this one
+            self.pacing.complete(self.pacing_key)
+
+    def _run_flow(self, flow):
+        return async_run_flow(flow, self._send)
+
+    def _iter_flow(self, flow):
+        return async_iter_flow(flow, self._send)
+
+    @staticmethod
+    async def _collect(iterable) -> list:
+        return [item async for item in iterable]
+
+    @staticmethod
+    async def _finish_request(record, send):
+        try:
+            response = await send()
+        except Exception as e:
+            record.finished(error=e)
+            raise
+
+        record.finished()
+        response.request_record = record
+        return response
+
+    async def reformat_results(self, results, max_workers=None):
+        processed_results = [
+            item async for item in self._iter_reformat_results(results, max_workers=max_workers)
+        ]
+        return [lead for _, lead in sorted(processed_results, key=lambda item: item[0])]
+
+    async def iter_reformat_results(self, results, max_workers=None):
+        """Fill leads with profile data, see `Linkedin.iter_reformat_results`"""
+        async for _, lead in self._iter_reformat_results(results, max_workers=max_workers):
+            yield lead
+
+    async def _iter_reformat_results(self, results, max_workers=None):
+        reformat_max_errors = self._REFORMAT_MAX_ERRORS
+        semaphore = asyncio.Semaphore(max_workers or settings.PROFILE_ENRICHMENT_CONCURRENCY)
+
+        async def reformat_result(i, lead):
+            async with semaphore:
+                return await self._reformat_result(i, lead)
+
+        tasks = [asyncio.ensure_future(reformat_result(i, lead)) for i, lead in enumerate(results)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                i, lead, error = await task
+                if error:
+                    reformat_max_errors -= 1
+                    logger.warning("Failed get profile data for %s lead", lead, exc_info=error)
+
+                yield i, lead
+
+                if reformat_max_errors <= 0:
+                    raise Exception("Too many reformat errors, break parsing...")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _reformat_result(self, i, lead):
+        try:
+            if lead.get("publicIdentifier"):
+                # evade limit each N requests
+                if i > 0 and i % randrange(4, 6) == 0:
+                    self._defer(randrange(15, 25))
+
+                profile = await self.get_profile_data(public_id=lead.get("publicIdentifier"))
+                self._reformat_lead(lead, profile)
+        except Exception as e:
+            return i, lead, e
+
+        return i, lead, None
@@ -1,7 +1,14 @@
 import logging
-import pickle
 
-from curl_cffi.requests import Session
+from curl_cffi.requests import AsyncSession, Session
+
+from salesloop_linkedin_api.utils.session_snapshot import (
+    dump_cookies,
+    dump_headers,
+    is_pickled,
+    load_cookies,
+    load_headers,
+)
 logger = logging.getLogger()
 
 
@@ -43,15 +50,18 @@ class Client:
         api_cookies=None,
         api_headers=None,
         ua=None,
+        session=None,
     ):
         self.logger = logger
 
-        self.session = Session(proxies=proxies)
+        # Prepared session, e.g. utils.replay.ReplaySession to run client offline
+        self.session = session if session is not None else self._create_session(proxies)
         self.session.max_redirects = 5
 
         logging.basicConfig(level=logging.DEBUG if debug else logging.INFO)
 
         self.proxies = proxies
+        pickled = is_pickled(api_cookies) or is_pickled(api_headers)
 
         if not api_cookies and cookies:
             logger.debug("Initialize new api cookies")
@@ -64,7 +74,8 @@ class Client:
                     secure=cookie["secure"],
                 )
         else:
-            self.session.cookies.jar._cookies.update(pickle.loads(api_cookies))
+            for cookie in load_cookies(api_cookies):
+                self.session.cookies.jar.set_cookie(cookie)
 
         session_id = self.session.cookies.get("JSESSIONID")
         if not session_id:
@@ -72,12 +83,41 @@ class Client:
 
         if api_headers:
             logger.debug("Use saved api headers")
-            self.session.headers.update(pickle.loads(api_headers))
+            self.session.headers.update(load_headers(api_headers))
         else:
             if not ua:
                 raise Exception("User-agent not provided")
 
-            api_headers = Client.REQUEST_HEADERS
+            api_headers = dict(Client.REQUEST_HEADERS)
             api_headers["csrf-token"] = session_id.strip('"')
             api_headers["User-Agent"] = ua
             self.session.headers.update(api_headers)
+
+        # Session restored from pickled api cookies or headers, JSON snapshots of the session
+        # replace them in storage (see SESSION_SNAPSHOT_PICKLE_FALLBACK)
+        self.migrated_snapshot = None
+        if pickled:
+            logger.info("Pickled session is loaded, migrate it to JSON snapshots")
+            self.migrated_snapshot = {
+                "session_cookies": dump_cookies(self.session),
+                "session_headers": dump_headers(self.session),
+            }
+
+    def _create_session(self, proxies):
+        return Session(proxies=proxies)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncClient(Client):
+    """
+    Asyncio flavour of the Linkedin API client, session requests are coroutines.
+    Cookies and headers are restored the same way as in the `Client`.
+    """
+
+    def _create_session(self, proxies):
+        return AsyncSession(proxies=proxies)
+
+    async def close(self):
+        await self.session.close()
@@ -3,22 +3,26 @@ Provides linkedin api-related code
 """
 
 import base64
+import functools
 import json
+import logging
 import random
 import re
+import threading
+import time
 import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from os import environ
 from os.path import isfile
 from pathlib import Path
 from random import randrange
-from time import sleep
 from urllib.parse import urlencode, urlparse, quote_plus
 
 import backoff
 from curl_cffi.requests.exceptions import RequestsException
+from redis import RedisError
 
-from redis.client import StrictRedis
 from salesloop_linkedin_api.parser import parse_messenger_messages, parse_profile_from_source
 
 import salesloop_linkedin_api.settings as settings
@@ -41,7 +45,24 @@ from salesloop_linkedin_api.utils.generate_search_urls import (
     generate_grapqhl_search_url,
     generate_graphql_companies_search_url,
 )
-from salesloop_linkedin_api.statistic import APIRequestType
+from salesloop_linkedin_api.statistic import APIRequestType, StatisticsWriter, get_redis_connection
+from salesloop_linkedin_api.utils.pacing import EvadePolicy, RetryDeferred, pacing_scheduler
+from salesloop_linkedin_api.utils.pagination import PagedIterator, PaginationCursor
+from salesloop_linkedin_api.utils.company_cache import get_default_company_id_cache
+from salesloop_linkedin_api.utils.company_lookup import CompanyLookupService
+from salesloop_linkedin_api.utils.json_codec import response_json
+from salesloop_linkedin_api.utils.metrics import RequestRecord, get_default_request_hooks
+from salesloop_linkedin_api.utils.profile_cache import get_default_profile_cache
+from salesloop_linkedin_api.utils.proxy_pool import get_proxy_url
+from salesloop_linkedin_api.utils.quota import get_default_quota
+from salesloop_linkedin_api.utils.request_flow import (
+    Request,
+    iter_flow,
+    iter_request_flow,
+    request_flow,
+    run_flow,
+)
+from salesloop_linkedin_api.utils.session_cache import get_default_session_cache
 from salesloop_linkedin_api.utils.helpers import (
     cffi_set_cookies,
     cffi_set_headers,
@@ -52,10 +73,9 @@ from salesloop_linkedin_api.utils.helpers import (
     get_id_from_urn,
 )
 
-from celery.utils.log import get_task_logger
-
-
-logger = get_task_logger(__name__)
+# Like celery get_task_logger, without importing celery: records are handled by celery task
+# logger, which is configured by celery worker
+logger = logging.getLogger(f"celery.task.{__name__}")
 RetryExceptions = (RequestsException,)
 
 
@@ -74,6 +94,10 @@ class LinkedinInvitesRateLimit(Exception):
     pass
 
 
+class LinkedinProfileNotFound(LinkedinAPIError):
+    pass
+
+
 class Linkedin(object):
     """
     Class for accessing LinkedIn API.
@@ -83,9 +107,15 @@ class Linkedin(object):
     _MAX_SEARCH_COUNT = 49  # max seems to be 49
     _MAX_SEARCH_LEN = settings.MAX_SEARCH_LEN
     _MAX_SEARCH_LEN_SALES_NAV = settings.MAX_SEARCH_LEN_SALES_NAV
+    _INVITES_PAGE_SIZE = 100
+    _REFORMAT_MAX_ERRORS = 6
     _MAX_REPEATED_REQUESTS = 200  # VERY conservative max requests count to avoid rate-limit
     _DEFAULT_GET_TIMEOUT = settings.REQUEST_TIMEOUT
     _DEFAULT_POST_TIMEOUT = settings.REQUEST_TIMEOUT
+    _CLIENT_CLASS = Client
+    # Clients are reused by next instances of the account, see utils.session_cache
+    _CACHE_CLIENTS = True
+    _PAGED_ITERATOR_CLASS = PagedIterator
 
     def __init__(
         self,
@@ -101,19 +131,58 @@ class Linkedin(object):
         default_retry_max_time=600,
         linkedin_login_id=None,
         cookies=None,
+        profile_cache=None,
+        company_id_cache=None,
+        session=None,
+        request_hooks=None,
+        quota=None,
+        session_cache=None,
+        proxy_pool=None,
     ):
+        # Proxies of the account are assigned by the pool, if it's passed, account keeps
+        # its stored proxies while they are healthy
+        self.proxy_pool = proxy_pool
+        # Requests of the instance can be sent from several threads, see iter_reformat_results:
+        # proxies, requests counters and profile warmup time are guarded, requests are sent
+        # outside of the lock (client session has curl handle per thread)
+        self._session_lock = threading.RLock()
+        if proxy_pool is not None:
+            proxies = proxy_pool.assign(linkedin_login_id or username, preferred=proxies)
+
         self.proxies = proxies
         self.logger = logger
 
-        self.client = Client(
-            refresh_cookies=refresh_cookies,
-            debug=debug,
-            proxies=proxies,
-            api_cookies=api_cookies,
-            api_headers=api_headers,
-            cookies=cookies,
-            ua=ua,
-        )
+        def create_client():
+            return self._CLIENT_CLASS(
+                refresh_cookies=refresh_cookies,
+                debug=debug,
+                proxies=proxies,
+                api_cookies=api_cookies,
+                api_headers=api_headers,
+                cookies=cookies,
+                ua=ua,
+                session=session,
+            )
+
+        # Live clients of accounts restored from snapshots, shared by instances by default
+        self.session_cache = None
+        if self._CACHE_CLIENTS and linkedin_login_id and api_cookies and session is None:
+            self.session_cache = (
+                session_cache if session_cache is not None else get_default_session_cache()
+            )
+
+        self._release_client = None
+        if self.session_cache is not None:
+            self.client = self.session_cache.acquire(
+                linkedin_login_id, proxies, api_cookies, api_headers, create_client
+            )
+            # Client is returned to the cache even if instance isn't closed explicitly,
+            # e.g. by celery tasks
+            self._release_client = weakref.finalize(
+                self, self.session_cache.release, linkedin_login_id, proxies, self.client
+            )
+        else:
+            self.client = create_client()
         self.username = username
 
         logger.info(
@@ -135,6 +204,7 @@ class Linkedin(object):
 
         # Count each request and save amount per X timerange
         self.requests_amount = {k: 0 for k in settings.REQUESTS_TYPES.keys()}
+        self.requests_amount[settings.UNKNOWN_REQUEST_TYPE] = 0
         self.requests_amount["start_timestamp"] = 0
         self.requests_amount["end_timestamp"] = 0
 
@@ -143,21 +213,111 @@ class Linkedin(object):
         self.requests_end_timestamp = None
 
         # Generated proxy url, used for proxy error message
-        proxy_url = next(iter(proxies.values()))
-        self.parsed_proxy = urlparse(proxy_url)
+        self.parsed_proxy = urlparse(get_proxy_url(proxies))
 
         # Redis connection
-        redis_url = urlparse(environ["BROKER_URL"])
-        redis_host, redis_port = redis_url.netloc.split(":")
-        self.rds = StrictRedis(
-            redis_host, port=int(redis_port), decode_responses=True, charset="utf-8"
-        )
+        self.rds = get_redis_connection()
 
         # Unique session id, based on UUID
         self.session_id = uuid.uuid4()
         self.linkedin_login_id = linkedin_login_id
+
+        # Statistics are written in batches, ttl is 1 month
+        self.statistics = None
+        if linkedin_login_id:
+            self.statistics = StatisticsWriter(
+                f"ln.api:{linkedin_login_id}:{self.session_id}", self.rds
+            )
+            # Don't lose buffered statistics if instance isn't closed explicitly
+            weakref.finalize(self, self.statistics.flush)
+
         self.auto_throttle = AutoThrottleFunc()
 
+        # Requests of the same account are paced together, even across instances
+        self.pacing = pacing_scheduler
+        self.pacing_key = linkedin_login_id or username or f"instance:{self.session_id}"
+
+        # Slot of the next request is reserved by reserve_request_slot
+        self._slot_reserved = False
+        # Retryable errors raise RetryDeferred instead of waiting in backoff, the caller
+        # runs the whole call again later (see AccountPool)
+        self.defer_retries = False
+
+        # Last time profile page was fetched before profile data
+        self._profile_warmup_at = None
+
+        # Profiles cache, shared by Linkedin instances by default
+        self.profile_cache = (
+            profile_cache if profile_cache is not None else get_default_profile_cache()
+        )
+
+        # Company universal name -> id cache, shared with search urls generation
+        self.company_id_cache = (
+            company_id_cache if company_id_cache is not None else get_default_company_id_cache()
+        )
+        self._company_lookup = None
+        self._company_lookup_lock = threading.Lock()
+
+        # Called with timings of each finished request, process metrics by default
+        self.request_hooks = (
+            list(request_hooks) if request_hooks is not None else get_default_request_hooks()
+        )
+
+        # Daily requests limits of the account, shared by Linkedin instances by default
+        self.quota = quota if quota is not None else get_default_quota()
+        self._connections_number = None
+        self._is_premium = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def flush_statistics(self):
+        if self.statistics:
+            self.statistics.flush()
+
+        for hook in self.request_hooks:
+            hook.flush()
+
+    def close(self):
+        self.flush_statistics()
+        if self._company_lookup:
+            self._company_lookup.close()
+
+        if self._release_client is not None:
+            self._release_client()
+        else:
+            self.client.close()
+
+    def _proxy_succeeded(self, latency):
+        if self.proxy_pool:
+            self.proxy_pool.report_success(self.proxies, latency)
+
+    def _proxy_failed(self, details):
+        """
+        Backoff handler: when account proxy is marked unhealthy, next retries are sent
+        with other proxy of the pool, instead of waiting for the dead proxy
+        """
+        if not self.proxy_pool:
+            return
+
+        with self._session_lock:
+            if self.proxy_pool.report_error(self.proxies):
+                self._switch_proxy(self.proxy_pool.assign(self.pacing_key))
+
+    def _switch_proxy(self, proxies):
+        with self._session_lock:
+            if self.session_cache is not None:
+                # Client proxies are changed, client is closed instead of returning to the cache
+                self.session_cache.discard(self.linkedin_login_id, self.proxies)
+
+            self.proxies = self.api_proxies = proxies
+            self.parsed_proxy = urlparse(get_proxy_url(proxies))
+            self.client.proxies = proxies
+            self.client.session.proxies = proxies
+
     def _get_max_retry_time(self):
         return self.default_retry_max_time
 
@@ -179,97 +339,249 @@ class Linkedin(object):
 
     def _update_statistics(self, url):
         request_type = APIRequestType.get_request_type(url)
-        self.requests_amount[request_type] += 1
-        if not self.requests_amount["start_timestamp"]:
-            self.requests_amount["start_timestamp"] = int(datetime.utcnow().timestamp())
-
-        self.requests_amount["end_timestamp"] = int(datetime.utcnow().timestamp())
-
-        # Write statistics to redis, key contains username and uuid of the task
-        # ln.api -> LinkedIn API statistics
-        # ttl is 1 month
-        if self.linkedin_login_id:
-            logger.debug(f"New request {request_type} to {url}, updating statistics in redis")
-            self.rds.set(
-                f"ln.api:{self.linkedin_login_id}:{self.session_id}",
-                json.dumps(self.requests_amount),
-                ex=settings.STATISTICS_TTL,
-            )
+        with self._session_lock:
+            self.requests_amount[request_type] += 1
+            if not self.requests_amount["start_timestamp"]:
+                self.requests_amount["start_timestamp"] = int(datetime.utcnow().timestamp())
+
+            self.requests_amount["end_timestamp"] = int(datetime.utcnow().timestamp())
+
+        if self.statistics:
+            logger.debug(f"New request {request_type} to {url}, updating statistics")
+            self.statistics.add(request_type, self.requests_amount["end_timestamp"])
         else:
             logger.warning("No linkedin_login_id provided, skipping statistics store in redis")
 
-    def _fetch(self, uri, evade=default_evade, raw_url=False, **kwargs):
+    def _get_fetch_max_retry_time(self, uri):
+        if uri == "/relationships/connectionsSummary/":
+            return 20
+
+        return self._get_max_retry_time()
+
+    def _request_url(self, uri, raw_url=False):
+        if raw_url:
+            return uri
+
+        return f"{self.client.API_BASE_URL}{uri}"
+
+    def _evade(self, evade):
         """
-        GET request to LinkedIn API
+        Wait for the next request slot of the account, legacy evade callables are just called
         """
-        evade()
+        if self._slot_reserved:
+            self._slot_reserved = False
+            return
 
-        if uri == "/relationships/connectionsSummary/":
-            max_time = 20
-        else:
-            max_time = self._get_max_retry_time()
+        if isinstance(evade, EvadePolicy):
+            self.pacing.wait(self.pacing_key, evade)
+        elif evade:
+            evade()
 
-        @backoff.on_exception(
-            backoff.expo,
-            RetryExceptions,
-            max_time=max_time,
-            on_backoff=self.backoff_hdlr,
-        )
-        def fetch_data():
-            if raw_url:
-                url = uri
-            else:
-                url = f"{self.client.API_BASE_URL}{uri}"
+    def reserve_request_slot(self, evade=default_evade) -> float:
+        """
+        Reserve slot of the next request of the account, so the caller can start the call
+        at the slot instead of waiting in the call (see AccountPool). The next request doesn't
+        wait for its own slot.
+
+        Returns:
+            seconds until the slot
+        """
+        delay = self.pacing.reserve(self.pacing_key, evade)
+        self._slot_reserved = True
+        return delay
+
+    def set_requests_limits(self, connections_number: int, is_premium: bool):
+        """
+        Requests quota of the account is based on its connections number and premium access,
+        new account limits are used until limits are set.
+
+        Limits are set automatically, when both `get_ln_user_metadata` (premium access) and
+        `get_connections_summary` (connections number) are called. Callers, which know account
+        connections number and premium access, e.g. from account record, should set limits
+        right after instance is created.
+        """
+        self._connections_number = connections_number
+        self._is_premium = is_premium
+        if self.quota:
+            self.quota.set_account_limits(self.pacing_key, connections_number, is_premium)
 
-            if not kwargs.get("timeout"):
-                # Use default timeout
-                kwargs["timeout"] = Linkedin._DEFAULT_GET_TIMEOUT
+    def _update_requests_limits(self, connections_number=None, is_premium=None):
+        if connections_number is not None:
+            self._connections_number = connections_number
+        if is_premium is not None:
+            self._is_premium = is_premium
 
-            fetch_response = self.client.session.get(url, **kwargs)
-            fetch_response.raise_for_status()
+        if self._connections_number is not None and self._is_premium is not None:
+            self.set_requests_limits(self._connections_number, self._is_premium)
 
-            self._update_statistics(url)
-            return fetch_response
+    def _acquire_quota(self, request_type):
+        if self.quota:
+            self.quota.acquire(self.pacing_key, request_type)
 
-        return fetch_data()
+    def _defer(self, delay):
+        """
+        Postpone next request of the account, without blocking the current thread
+        """
+        self.pacing.defer(self.pacing_key, delay)
+
+    def _fetch(self, uri, evade=default_evade, raw_url=False, allowed_status_codes=(), **kwargs):
+        """
+        GET request to LinkedIn API
+        """
+        return self._request("GET", uri, evade, raw_url, allowed_status_codes, kwargs)
 
     def _post(self, uri, evade=default_evade, raw_url=False, allowed_status_codes=(), **kwargs):
         """
         POST request to LinkedIn API
         """
-        evade()
+        return self._request("POST", uri, evade, raw_url, allowed_status_codes, kwargs)
+
+    def _request(self, method, uri, evade, raw_url, allowed_status_codes, kwargs):
+        record = self._request_record(method, uri, raw_url)
+        started = time.perf_counter()
+        self._evade(evade)
+        record.evade_time = time.perf_counter() - started
+
+        @self._retry(method, uri, record)
+        def send_request():
+            # Each attempt, including backoff retries, takes a token of the account quota
+            started = time.perf_counter()
+            self._acquire_quota(record.request_type)
+            record.evade_time += time.perf_counter() - started
+
+            with self._session_lock:
+                url = self._prepare_request(method, uri, raw_url, kwargs)
+                session = self.client.session
+
+            send = session.post if method == "POST" else session.get
+            started = time.perf_counter()
+            try:
+                response = send(url, **kwargs)
+            finally:
+                record.network_time += time.perf_counter() - started
+            return self._check_response(
+                record, url, response, time.perf_counter() - started, allowed_status_codes
+            )
+
+        try:
+            return self._finish_request(record, send_request)
+        finally:
+            # Next requests of the account are spaced from the end of this one
+            self.pacing.complete(self.pacing_key)
 
-        @backoff.on_exception(
-            backoff.expo,
-            RetryExceptions,
-            max_time=self._get_max_retry_time,
-            on_backoff=self.backoff_hdlr,
+    def _retry(self, method, uri, record: RequestRecord):
+        """
+        Backoff decorator of request sending, retried on network errors and 429/5xx
+        """
+        max_time = (
+            self._get_max_retry_time() if method == "POST" else self._get_fetch_max_retry_time(uri)
         )
-        def post_data():
-            if raw_url:
-                url = uri
-            else:
-                url = f"{self.client.API_BASE_URL}{uri}"
+        on_backoff = [self.backoff_hdlr, record.retried, self._proxy_failed]
+        if self.defer_retries:
+            return self._deferred_retry(on_backoff, max_time)
 
-            if not kwargs.get("timeout"):
-                # Use default timeout
-                kwargs["timeout"] = Linkedin._DEFAULT_POST_TIMEOUT
+        return backoff.on_exception(
+            backoff.expo, RetryExceptions, max_time=max_time, on_backoff=on_backoff
+        )
 
-            post_response = self.client.session.post(url, **kwargs)
+    @staticmethod
+    def _deferred_retry(on_backoff, max_time):
+        """
+        Used instead of backoff with `defer_retries`: request is sent once, on retryable error
+        backoff handlers are called and RetryDeferred is raised
+        """
 
-            if (
-                post_response.status_code != 400  # TODO: need to remove this?
-                and post_response.status_code not in allowed_status_codes
-            ):
-                # Some responses, such as ln connection, can be valid with 400 code!
-                post_response.raise_for_status()
+        def decorator(send):
+            @functools.wraps(send)
+            def send_once():
+                started = time.monotonic()
+                try:
+                    return send()
+                except RetryExceptions as e:
+                    details = {
+                        "target": send,
+                        "args": (),
+                        "kwargs": {},
+                        "tries": 1,
+                        "elapsed": time.monotonic() - started,
+                        "wait": 0.0,
+                        "exception": e,
+                    }
+                    for handler in on_backoff:
+                        handler(details)
+
+                    raise RetryDeferred(e, max_time) from e
+
+            return send_once
+
+        return decorator
+
+    def _prepare_request(self, method, uri, raw_url, kwargs) -> str:
+        if not kwargs.get("timeout"):
+            # Use default timeout
+            kwargs["timeout"] = (
+                Linkedin._DEFAULT_POST_TIMEOUT
+                if method == "POST"
+                else Linkedin._DEFAULT_GET_TIMEOUT
+            )
+
+        return self._request_url(uri, raw_url)
+
+    def _check_response(self, record: RequestRecord, url, response, latency, allowed_status_codes):
+        self._proxy_succeeded(latency)
+        record.response_received(response)
+
+        if record.method == "POST":
+            # Some responses, such as ln connection, can be valid with 400 code!
+            allowed_status_codes = (400, *allowed_status_codes)
+        if response.status_code not in allowed_status_codes:
+            response.raise_for_status()
+
+        # Update statistics if request was successful
+        self._update_statistics(url)
+        return response
 
-            # Update statistics if request was successful
-            self._update_statistics(url)
-            return post_response
+    def _send(self, request: Request):
+        if request.method == "POST":
+            return self._post(request.uri, **request.kwargs)
+
+        return self._fetch(request.uri, **request.kwargs)
+
+    def _run_flow(self, flow):
+        """
+        Run request flow of the method, see utils.request_flow
+        """
+        return run_flow(flow, self._send)
+
+    def _iter_flow(self, flow):
+        return iter_flow(flow, self._send)
+
+    @staticmethod
+    def _collect(iterable) -> list:
+        return list(iterable)
+
+    def _request_record(self, method, uri, raw_url=False) -> RequestRecord:
+        return RequestRecord(
+            method, self._request_url(uri, raw_url), self.pacing_key, self.request_hooks
+        )
+
+    @staticmethod
+    def _finish_request(record: RequestRecord, send):
+        """
+        Send request and pass its record to request hooks, response keeps the record
+        to report parse time
+        """
+        try:
+            response = send()
+        except Exception as e:
+            record.finished(error=e)
+            raise
 
-        return post_data()
+        record.finished()
+        response.request_record = record
+        return response
 
+    @request_flow
     def get_ln_user_metadata(self, get_email=False):
         """
         Fetch basic metadata from Linkedin API.
@@ -279,10 +591,12 @@ class Linkedin(object):
         feature_access = LinkedinApFeatureAccess(linkedin=False, premium=False)
 
         # Check if we can access the network page
-        response = self._fetch("https://www.linkedin.com/mynetwork/", raw_url=True)
+        response = yield Request("GET", "https://www.linkedin.com/mynetwork/", raw_url=True)
         if response.status_code == 200:
             try:
-                user_metadata = self._parse_user_metadata(response.text, get_email=get_email)
+                user_metadata = yield from self._parse_user_metadata.flow(
+                    self, response.text, get_email=get_email
+                )
                 metadata.update(user_metadata)
             except (IndexError, LinkedinParsingError):
                 raise LinkedinUnauthorized("Unable to parse metadata/email from response")
@@ -291,12 +605,7 @@ class Linkedin(object):
             feature_access.linkedin = True
 
             # Verify if we has access to some premium features
-            feature_access_list = self.get_access_list()
-            if (
-                feature_access_list.CAN_ACCESS_SALES_NAV_ENTRY_POINT
-                or feature_access_list.CAN_ACCESS_RECRUITER_ENTRY_POINT
-                or feature_access_list.CAN_ACCESS_PREMIUM_REFERRALS
-            ):
+            if self._has_premium_access((yield from self.get_access_list.flow(self))):
                 feature_access.premium = True
 
             # Set cookies
@@ -307,9 +616,11 @@ class Linkedin(object):
             raise LinkedinLoginError("Linkedin account has no minimum access to Linkedin API")
 
         metadata["feature_access"] = feature_access
+        self._update_requests_limits(is_premium=feature_access.premium)
 
         return metadata
 
+    @request_flow
     def _parse_user_metadata(self, response_text: str, get_email: bool = False) -> dict:
         """
         Parse email from response text
@@ -320,9 +631,34 @@ class Linkedin(object):
             email address
 
         """
-        my_info = self.dash_global_navs()
-        mini_profile = my_info["included"][0]
+        my_info = yield from self.dash_global_navs.flow(self)
+        urn, avatar = self._parse_mini_profile(my_info["included"][0])
+
+        # TODO: cover this with tests
+        email = None
+        if get_email:
+            yield Request(
+                "GET",
+                "https://www.linkedin.com/mypreferences/d/categories/account", raw_url=True
+            )
+            response = yield Request(
+                "GET",
+                "https://www.linkedin.com/mysettings-api/settingsApiSneakPeeks?category=SIGN_IN_AND_SECURITY&q=category",
+                raw_url=True,
+            )
+            email = self._parse_account_email(response, response_text)
 
+        return {
+            "urn": urn,
+            "email": email,
+            "avatar": avatar,
+        }
+
+    @staticmethod
+    def _parse_mini_profile(mini_profile: dict) -> tuple:
+        """
+        Get profile urn and avatar url from the global navs mini profile
+        """
         logger.debug("Parsing user metadata from response: %s", mini_profile)
 
         # Get profile urn
@@ -345,37 +681,29 @@ class Linkedin(object):
                 "Could not parse avatar from search_hit_data: %s", mini_profile, exc_info=e
             )
 
-        # TODO: cover this with tests
-        email = None
-        if get_email:
-            self._fetch(
-                "https://www.linkedin.com/mypreferences/d/categories/account", raw_url=True
-            )
-            response = self._fetch(
-                "https://www.linkedin.com/mysettings-api/settingsApiSneakPeeks?category=SIGN_IN_AND_SECURITY&q=category",
-                raw_url=True,
-            )
-            if response.status_code == 401:
-                raise LinkedinLoginError()
-            else:
-                response.raise_for_status()
+        return urn, avatar
 
-            current_settings = response.json()
-            elements = current_settings["elements"]
-            for element in elements:
-                if element["settingCardKey"] == "manageEmailAddresses":
-                    email = element["displayText"]
+    @staticmethod
+    def _parse_account_email(response, response_text: str) -> str:
+        """
+        Get account email from the sign-in settings response
+        """
+        if response.status_code == 401:
+            raise LinkedinLoginError()
+        else:
+            response.raise_for_status()
 
-            if not email:
-                raise LinkedinParsingError(
-                    "Could not parse email from response: %s", response_text
-                )
+        email = None
+        current_settings = response_json(response)
+        elements = current_settings["elements"]
+        for element in elements:
+            if element["settingCardKey"] == "manageEmailAddresses":
+                email = element["displayText"]
 
-        return {
-            "urn": urn,
-            "email": email,
-            "avatar": avatar,
-        }
+        if not email:
+            raise LinkedinParsingError("Could not parse email from response: %s", response_text)
+
+        return email
 
     def search(self, params, limit=-1, offset=0):
         """Perform a LinkedIn search.
@@ -388,78 +716,90 @@ class Linkedin(object):
         :return: List of search results
         :rtype: list
         """
-        count = Linkedin._MAX_SEARCH_COUNT
-        if limit is None:
-            limit = -1
-
-        results = []
-        while True:
-            if limit > -1 and limit - len(results) < count:
-                count = limit - len(results)
-            default_params = {
-                "count": str(count),
-                "filters": "List()",
-                "origin": "GLOBAL_SEARCH_HEADER",
-                "q": "all",
-                "start": len(results) + offset,
-                "queryContext": "List(spellCorrectionEnabled->true,"
-                "relatedSearchesEnabled->true,kcardTypes->PROFILE|COMPANY)",
-            }
-            default_params.update(params)
-
-            res = self._fetch(
-                f"/search/blended?{urlencode(default_params, safe='(),')}",
-                headers={"accept": "application/vnd.linkedin.normalized+json+2.1"},
-            )
-            data = res.json()
-
-            new_elements = []
-            elements = data.get("data", {}).get("elements", [])
-            for i in range(len(elements)):
-                new_elements.extend(elements[i]["elements"])
-                # not entirely sure what extendedElements generally
-                # refers to - keyword search gives back a single job?
-                # new_elements.extend(data["data"]["elements"][i]["extendedElements"])
-            results.extend(new_elements)
-
-            # break the loop if we're done searching
-            # NOTE: we could also check for the `total` returned in the response.
-            # This is in data["data"]["paging"]["total"]
-            if (
-                (limit > -1 and len(results) >= limit)  # if our results exceed set limit
-                or len(results) / count >= Linkedin._MAX_REPEATED_REQUESTS
-            ) or len(new_elements) == 0:
-                break
-
-            self.logger.debug(f"results grew to {len(results)}")
-
-        return results
+        return self._collect(self.iter_search(params, limit=limit, offset=offset))
+
+    def iter_search(self, params, limit=-1, offset=0, transform=None):
+        """Perform a LinkedIn search lazily, see `search`.
+        Elements are yielded as their page arrives, paging total is available
+        in `total` attribute of the returned iterator after the first page.
+        :rtype: PagedIterator
+        """
+        return self._PAGED_ITERATOR_CLASS(
+            lambda start, count: self._search_page(params, start, count),
+            Linkedin._MAX_SEARCH_COUNT,
+            limit=limit,
+            offset=offset,
+            max_repeated_requests=Linkedin._MAX_REPEATED_REQUESTS,
+            transform=transform,
+        )
 
+    @request_flow
+    def _search_page(self, params, start, count):
+        res = yield Request(
+            "GET",
+            self._search_uri(params, count, start),
+            headers={"accept": "application/vnd.linkedin.normalized+json+2.1"},
+        )
+        data = response_json(res)
+        return self._parse_search_elements(data), data.get("data", {}).get("paging")
+
+    @staticmethod
+    def _search_uri(params: dict, count: int, start: int) -> str:
+        default_params = {
+            "count": str(count),
+            "filters": "List()",
+            "origin": "GLOBAL_SEARCH_HEADER",
+            "q": "all",
+            "start": start,
+            "queryContext": "List(spellCorrectionEnabled->true,"
+            "relatedSearchesEnabled->true,kcardTypes->PROFILE|COMPANY)",
+        }
+        default_params.update(params)
+        return f"/search/blended?{urlencode(default_params, safe='(),')}"
+
+    @staticmethod
+    def _parse_search_elements(data: dict) -> list:
+        new_elements = []
+        elements = data.get("data", {}).get("elements", [])
+        for i in range(len(elements)):
+            new_elements.extend(elements[i]["elements"])
+            # not entirely sure what extendedElements generally
+            # refers to - keyword search gives back a single job?
+            # new_elements.extend(data["data"]["elements"][i]["extendedElements"])
+
+        return new_elements
+
+    @request_flow
     def cluster_sales_search_people(self, linkedin_url):
         generated_url = generate_sales_search_url(linkedin_url)
-        random_page_instance_postfix = get_random_base64()
-        res = self._fetch(
+        res = yield Request(
+            "GET",
             generated_url,
-            headers={
-                "authority": "www.linkedin.com",
-                "dnt": "1",
-                "x-li-lang": "en_US",
-                "sec-ch-ua-mobile": "?0",
-                "x-li-page-instance": f"urn:li:page:d_sales2_search_people;"
-                f"{random_page_instance_postfix}",
-                "x-restli-protocol-version": "2.0.0",
-                "accept": "*/*",
-                "sec-fetch-site": "same-origin",
-                "sec-fetch-mode": "cors",
-                "sec-fetch-dest": "empty",
-                "referer": linkedin_url,
-            },
+            headers=self._sales_search_headers(linkedin_url),
             raw_url=True,
         )
         res.raise_for_status()
-        data = res.json()
+        data = response_json(res)
         return data
 
+    @staticmethod
+    def _sales_search_headers(linkedin_url: str) -> dict:
+        random_page_instance_postfix = get_random_base64()
+        return {
+            "authority": "www.linkedin.com",
+            "dnt": "1",
+            "x-li-lang": "en_US",
+            "sec-ch-ua-mobile": "?0",
+            "x-li-page-instance": f"urn:li:page:d_sales2_search_people;"
+            f"{random_page_instance_postfix}",
+            "x-restli-protocol-version": "2.0.0",
+            "accept": "*/*",
+            "sec-fetch-site": "same-origin",
+            "sec-fetch-mode": "cors",
+            "sec-fetch-dest": "empty",
+            "referer": linkedin_url,
+        }
+
     def search_people(
         self,
         keywords=None,
@@ -478,6 +818,73 @@ class Linkedin(object):
         """
         Do a people search.
         """
+        return self._collect(
+            self.iter_search_people(
+                keywords=keywords,
+                connection_of=connection_of,
+                network_depth=network_depth,
+                current_company=current_company,
+                past_companies=past_companies,
+                nonprofit_interests=nonprofit_interests,
+                profile_languages=profile_languages,
+                regions=regions,
+                industries=industries,
+                schools=schools,
+                title=title,
+                limit=limit,
+            )
+        )
+
+    def iter_search_people(
+        self,
+        keywords=None,
+        connection_of=None,
+        network_depth=None,
+        current_company=None,
+        past_companies=None,
+        nonprofit_interests=None,
+        profile_languages=None,
+        regions=None,
+        industries=None,
+        schools=None,
+        title=None,
+        limit=None,
+        offset=0,
+    ):
+        """
+        Do a people search lazily, people are yielded as their page arrives.
+        """
+        params = self._search_people_params(
+            keywords=keywords,
+            connection_of=connection_of,
+            network_depth=network_depth,
+            current_company=current_company,
+            past_companies=past_companies,
+            nonprofit_interests=nonprofit_interests,
+            profile_languages=profile_languages,
+            regions=regions,
+            industries=industries,
+            schools=schools,
+            title=title,
+        )
+        return self.iter_search(
+            params, limit=limit, offset=offset, transform=self._parse_search_person
+        )
+
+    @staticmethod
+    def _search_people_params(
+        keywords=None,
+        connection_of=None,
+        network_depth=None,
+        current_company=None,
+        past_companies=None,
+        nonprofit_interests=None,
+        profile_languages=None,
+        regions=None,
+        industries=None,
+        schools=None,
+        title=None,
+    ) -> dict:
         filters = ["resultType->PEOPLE"]
         if connection_of:
             filters.append(f"connectionOf->{connection_of}")
@@ -505,32 +912,33 @@ class Linkedin(object):
         if keywords:
             params["keywords"] = keywords
 
-        data = self.search(params, limit=limit)
+        return params
 
-        results = []
-        for item in data:
-            if "publicIdentifier" not in item:
-                continue
-            results.append(
-                {
-                    "urn_id": get_id_from_urn(item.get("targetUrn")),
-                    "distance": item.get("memberDistance", {}).get("value"),
-                    "public_id": item.get("publicIdentifier"),
-                }
-            )
+    @staticmethod
+    def _parse_search_person(item: dict):
+        if "publicIdentifier" not in item:
+            return None
 
-        return results
+        return {
+            "urn_id": get_id_from_urn(item.get("targetUrn")),
+            "distance": item.get("memberDistance", {}).get("value"),
+            "public_id": item.get("publicIdentifier"),
+        }
 
+    @request_flow
     def get_connections_summary(self):
-        res = self._fetch(
+        res = yield Request(
+            "GET",
             "/relationships/connectionsSummary/",
             headers={"accept": "application/vnd.linkedin.normalized+json+2.1"},
         )
-        data = res.json()
+        data = response_json(res)
         connections_summary = data["data"]
+        self._update_requests_limits(connections_number=connections_summary.get("numConnections"))
         return connections_summary
 
     # TODO: outdated, need to remove
+    @request_flow
     def get_profile_contact_info(self, public_id=None, urn_id=None):
         """
         Return data for a single profile.
@@ -538,9 +946,11 @@ class Linkedin(object):
         [public_id] - public identifier i.e. tom-quirk-1928345
         [urn_id] - id provided by the related URN
         """
-        res = self._fetch(f"/identity/profiles/{public_id or urn_id}/profileContactInfo")
-        data = res.json()
+        res = yield Request("GET", f"/identity/profiles/{public_id or urn_id}/profileContactInfo")
+        return self._parse_contact_info(response_json(res))
 
+    @staticmethod
+    def _parse_contact_info(data: dict) -> dict:
         contact_info = {
             "email_address": data.get("emailAddress"),
             "websites": [],
@@ -567,6 +977,7 @@ class Linkedin(object):
 
         return contact_info
 
+    @request_flow
     def get_profile_skills(self, public_id=None, urn_id=None):
         """
         Return the skills of a profile.
@@ -575,8 +986,8 @@ class Linkedin(object):
         [urn_id] - id provided by the related URN
         """
         params = {"count": 100, "start": 0}
-        res = self._fetch(f"/identity/profiles/{public_id or urn_id}/skills", params=params)
-        data = res.json()
+        res = yield Request("GET", f"/identity/profiles/{public_id or urn_id}/skills", params=params)
+        data = response_json(res)
 
         skills = data.get("elements", [])
         for item in skills:
@@ -584,67 +995,102 @@ class Linkedin(object):
 
         return skills
 
-    def sn_profile(self, urn_id) -> dict:
+    @request_flow
+    def sn_profile(self, urn_id, use_cache=True) -> dict:
+        cached = self._get_cached_profile("sn_profile", urn=urn_id, use_cache=use_cache)
+        if cached is not None:
+            return cached
+
         profile_url = f"https://www.linkedin.com/profile/view/?id={urn_id}"
-        profile_data = self._fetch(profile_url, raw_url=True)
-        profile_data = parse_profile_from_source(profile_data.text)
+        profile_data = yield Request("GET", profile_url, raw_url=True, allowed_status_codes=(404,))
+        if profile_data.status_code == 404:
+            raise self._profile_not_found("sn_profile", urn=urn_id)
+
+        profile_data = parse_profile_from_source(profile_data.content)
+        self._cache_profile(
+            "sn_profile", profile_data, public_id=profile_data.get("public_id"), urn=urn_id
+        )
         return profile_data
 
-    def profile(self, public_id: str) -> dict:
+    @staticmethod
+    def _profile_view_headers(public_id: str | None = None) -> dict:
         random_page_instance_postfix = get_random_base64()
-        # Fetch profile page
-        self._fetch("https://www.linkedin.com/in/" + public_id, raw_url=True)
-
         headers = {
             "Accept": "application/vnd.linkedin.normalized+json+2.1",
             "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{random_page_instance_postfix}",
             "x-restli-protocol-version": "2.0.0",
         }
+        if public_id:
+            headers["Referer"] = f"https://www.linkedin.com/in/{public_id}/"
 
-        # Get profile data
+        return headers
+
+    @staticmethod
+    def _profile_graphql_uri(public_id: str, query_id: str) -> str:
         params = {
             "includeWebMetadata": "true",
             "variables": f"(vanityName:{public_id})",
-            "queryId": "voyagerIdentityDashProfiles.99846ade1cc203e6f684e7369b01d501",
+            "queryId": query_id,
         }
+        return f"/graphql?{urlencode(params, safe='(),:')}"
 
-        response = self._fetch(
-            f"/graphql?{urlencode(params, safe='(),:')}",
-            headers=headers,
+    @request_flow
+    def profile(self, public_id: str, use_cache=True) -> dict:
+        cached = self._get_cached_profile("profile", public_id=public_id, use_cache=use_cache)
+        if cached is not None:
+            return cached
+
+        # Fetch profile page
+        page = yield Request(
+            "GET",
+            "https://www.linkedin.com/in/" + public_id, raw_url=True, allowed_status_codes=(404,)
+        )
+        if page.status_code == 404:
+            raise self._profile_not_found("profile", public_id=public_id)
+
+        # Get profile data
+        response = yield Request(
+            "GET",
+            self._profile_graphql_uri(
+                public_id, "voyagerIdentityDashProfiles.99846ade1cc203e6f684e7369b01d501"
+            ),
+            headers=self._profile_view_headers(),
         )
         response.raise_for_status()
-        return response.json()
 
-    def profile_cards(self, profile_urn: str) -> dict:
-        random_page_instance_postfix = get_random_base64()
-        headers = {
-            "Accept": "application/vnd.linkedin.normalized+json+2.1",
-            "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{random_page_instance_postfix}",
-            "x-restli-protocol-version": "2.0.0",
-        }
+        data = response_json(response)
+        self._cache_profile(
+            "profile", data, public_id=public_id, urn=self._profile_response_urn(data)
+        )
+        return data
 
-        response = self._fetch(
+    @request_flow
+    def profile_cards(self, profile_urn: str, use_cache=True) -> dict:
+        cached = self._get_cached_profile("cards", urn=profile_urn, use_cache=use_cache)
+        if cached is not None:
+            return cached
+
+        response = yield Request(
+            "GET",
             f"/graphql?includeWebMetadata=true&variables=(profileUrn:urn%3Ali%3Afsd_profile%3A{profile_urn})&queryId=voyagerIdentityDashProfileCards.5ba28aea1970071579633b9f449b8a7e",
-            headers=headers,
+            headers=self._profile_view_headers(),
         )
-
         response.raise_for_status()
-        return response.json()
+
+        data = response_json(response)
+        self._cache_profile("cards", data, urn=profile_urn)
+        return data
 
     # NEXT: need to remove
+    @request_flow
     def profile_contacts(self, public_id: str) -> dict:
-        random_page_instance_postfix = get_random_base64()
-        headers = {
-            "Accept": "application/vnd.linkedin.normalized+json+2.1",
-            "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{random_page_instance_postfix}",
-            "x-restli-protocol-version": "2.0.0",
-        }
-        response = self._fetch(
+        response = yield Request(
+            "GET",
             f"/graphql?variables=(memberIdentity:{public_id})&queryId=voyagerIdentityDashProfiles.84cab0be7183be5d0b8e79cd7d5ffb7b",
-            headers=headers,
+            headers=self._profile_view_headers(),
         )
         response.raise_for_status()
-        return response.json()
+        return response_json(response)
 
     def get_profile_connections(self, urn_id, limit=None):
         """
@@ -652,85 +1098,128 @@ class Linkedin(object):
         """
         return self.search_people(connection_of=urn_id, network_depth="F", limit=limit)
 
-    def get_company_updates(self, public_id=None, urn_id=None, max_results=None, results=[]):
+    def get_company_updates(self, public_id=None, urn_id=None, max_results=None):
         """
         Return a list of company posts
 
         [public_id] - public identifier ie - microsoft
         [urn_id] - id provided by the related URN
         """
-        params = {
-            "companyUniversalName": {public_id or urn_id},
-            "q": "companyFeedByUniversalName",
-            "moduleKey": "member-share",
-            "count": Linkedin._MAX_UPDATE_COUNT,
-            "start": len(results),
-        }
-
-        res = self._fetch("/feed/updates", params=params)
-
-        data = res.json()
-
-        if (
-            len(data["elements"]) == 0
-            or (max_results is not None and len(results) >= max_results)
-            or (
-                max_results is not None
-                and len(results) / max_results >= Linkedin._MAX_REPEATED_REQUESTS
-            )
-        ):
-            return results
+        return self._collect(
+            self.iter_company_updates(public_id=public_id, urn_id=urn_id, max_results=max_results)
+        )
 
-        results.extend(data["elements"])
-        self.logger.debug(f"results grew: {len(results)}")
+    def iter_company_updates(
+        self, public_id=None, urn_id=None, max_results=None, cursor=None, cursor_key=None
+    ):
+        """
+        Yield company posts page by page, see `get_company_updates`
 
-        return self.get_company_updates(
-            public_id=public_id, urn_id=urn_id, results=results, max_results=max_results
-        )
+        [cursor] - PaginationCursor to continue from, it's advanced after each page
+        [cursor_key] - redis key to load cursor from and save it to after each page
+        """
+        params = self._company_updates_params(public_id or urn_id)
+        return self._iter_updates(params, max_results, cursor=cursor, cursor_key=cursor_key)
 
-    def get_profile_updates(self, public_id=None, urn_id=None, max_results=None, results=[]):
+    def get_profile_updates(self, public_id=None, urn_id=None, max_results=None):
         """
         Return a list of profile posts
 
         [public_id] - public identifier i.e. tom-quirk-1928345
         [urn_id] - id provided by the related URN
         """
-        params = {
-            "profileId": {public_id or urn_id},
+        return self._collect(
+            self.iter_profile_updates(public_id=public_id, urn_id=urn_id, max_results=max_results)
+        )
+
+    def iter_profile_updates(
+        self, public_id=None, urn_id=None, max_results=None, cursor=None, cursor_key=None
+    ):
+        """
+        Yield profile posts page by page, see `get_profile_updates` and `iter_company_updates`
+        """
+        params = self._profile_updates_params(public_id or urn_id)
+        return self._iter_updates(params, max_results, cursor=cursor, cursor_key=cursor_key)
+
+    @staticmethod
+    def _company_updates_params(public_id) -> dict:
+        return {
+            "companyUniversalName": {public_id},
+            "q": "companyFeedByUniversalName",
+            "moduleKey": "member-share",
+            "count": Linkedin._MAX_UPDATE_COUNT,
+        }
+
+    @staticmethod
+    def _profile_updates_params(public_id) -> dict:
+        return {
+            "profileId": {public_id},
             "q": "memberShareFeed",
             "moduleKey": "member-share",
             "count": Linkedin._MAX_UPDATE_COUNT,
-            "start": len(results),
         }
 
-        res = self._fetch("/feed/updates", params=params)
+    @staticmethod
+    def _update_entity_key(update: dict):
+        return update.get("entityUrn") or update.get("urn")
 
-        data = res.json()
+    @staticmethod
+    def _updates_done(max_results, cursor) -> bool:
+        return max_results is not None and (
+            cursor.yielded >= max_results
+            or cursor.yielded / max_results >= Linkedin._MAX_REPEATED_REQUESTS
+        )
 
-        if (
-            len(data["elements"]) == 0
-            or (max_results is not None and len(results) >= max_results)
-            or (
-                max_results is not None
-                and len(results) / max_results >= Linkedin._MAX_REPEATED_REQUESTS
-            )
-        ):
-            return results
+    @iter_request_flow
+    def _iter_updates(self, params, max_results=None, cursor=None, cursor_key=None):
+        cursor = self._load_cursor(cursor, cursor_key)
+        while not self._updates_done(max_results, cursor):
+            res = yield Request("GET", "/feed/updates", params={**params, "start": cursor.start})
+            elements = response_json(res)["elements"]
+            if not elements:
+                break
 
-        results.extend(data["elements"])
-        self.logger.debug(f"results grew: {len(results)}")
+            updates = cursor.new_elements(elements, self._update_entity_key)
+            yield from updates
 
-        return self.get_profile_updates(
-            public_id=public_id, urn_id=urn_id, results=results, max_results=max_results
-        )
+            cursor.advance(elements, self._update_entity_key)
+            cursor.yielded += len(updates)
+            self._save_cursor(cursor, cursor_key)
+            self.logger.debug(f"results grew: {cursor.yielded}")
+
+        self._delete_cursor(cursor_key)
+
+    def get_cursor_key(self, name):
+        """
+        Redis key to save pagination cursor of the account crawl, e.g. "connections"
+        """
+        return f"ln.api.cursor:{self.pacing_key}:{name}"
+
+    def _load_cursor(self, cursor=None, cursor_key=None) -> PaginationCursor:
+        if cursor is not None:
+            return cursor
 
+        if cursor_key:
+            return PaginationCursor.load(self.rds, cursor_key)
+
+        return PaginationCursor()
+
+    def _save_cursor(self, cursor, cursor_key=None):
+        if cursor_key:
+            cursor.save(self.rds, cursor_key)
+
+    def _delete_cursor(self, cursor_key=None):
+        if cursor_key:
+            PaginationCursor.delete(self.rds, cursor_key)
+
+    @request_flow
     def get_current_profile_views(self):
         """
         Get profile view statistics, including chart data.
         """
-        res = self._fetch("/identity/wvmpCards")
+        res = yield Request("GET", "/identity/wvmpCards")
 
-        data = res.json()
+        data = response_json(res)
 
         return data["elements"][0]["value"][
             "com.linkedin.voyager.identity.me.wvmpOverview.WvmpViewersCard"
@@ -738,6 +1227,7 @@ class Linkedin(object):
             "com.linkedin.voyager.identity.me.wvmpOverview.WvmpSummaryInsightCard"
         ]["numViews"]
 
+    @request_flow
     def get_school(self, public_id):
         """
         Return data for a single school.
@@ -750,9 +1240,9 @@ class Linkedin(object):
             "universalName": public_id,
         }
 
-        res = self._fetch(f"/organization/companies?{urlencode(params)}")
+        res = yield Request("GET", f"/organization/companies?{urlencode(params)}")
 
-        data = res.json()
+        data = response_json(res)
 
         if data and "status" in data and data["status"] != 200:
             self.logger.info("request failed: {}".format(data))
@@ -762,54 +1252,126 @@ class Linkedin(object):
 
         return school
 
-    def get_company(self, public_id):
+    @request_flow
+    def get_company(self, public_id, evade=default_evade, timeout=None):
         """Fetch data about a given LinkedIn company.
 
         :param public_id: LinkedIn public ID for a company
         :type public_id: str
+        :param evade: evade policy of the request
+        :param timeout: request timeout, default GET timeout is used if not set
 
         :return: Company data
         :rtype: dict
         """
-        params = {
-            "decorationId": "com.linkedin.voyager.deco.organization.web.WebFullCompanyMain-12",
-            "q": "universalName",
-            "universalName": public_id,
-        }
-
-        res = self._fetch("/organization/companies", params=params)
-
-        data = res.json()
+        data = yield from self._get_company_data.flow(self, public_id, evade, timeout)
 
         if data and "status" in data and data["status"] != 200:
             self.logger.info("request failed: {}".format(data["message"]))
             return {}
 
+        if not data.get("elements"):
+            return {}
+
         company = data["elements"][0]
 
         return company
 
-    def get_company_id(self, public_id):
+    @request_flow
+    def _get_company_data(self, public_id, evade=default_evade, timeout=None):
+        params = {
+            "decorationId": "com.linkedin.voyager.deco.organization.web.WebFullCompanyMain-12",
+            "q": "universalName",
+            "universalName": public_id,
+        }
+
+        res = yield Request(
+            "GET",
+            "/organization/companies",
+            params=params,
+            evade=evade,
+            allowed_status_codes=(404,),
+            timeout=timeout,
+        )
+
+        return response_json(res)
+
+    @request_flow
+    def get_company_id(self, public_id, use_cache=True, evade=default_evade, timeout=None):
         """
 
         Args:
             public_id: company identifier
+            use_cache: use cached company id (or cached "not found" company)
+            evade: evade policy of the request
+            timeout: request timeout, default GET timeout is used if not set
+
+        Returns:
+            numeric company id or None
+        """
+        if use_cache and self.company_id_cache:
+            company_id = self.company_id_cache.get(public_id)
+            if company_id is not None:
+                return None if self.company_id_cache.is_missing(company_id) else company_id
+
+        data = yield from self._get_company_data.flow(self, public_id, evade, timeout)
+        return self._cache_company_id(public_id, data)
+
+    def get_company_lookup(self, max_workers=settings.COMPANY_LOOKUP_CONCURRENCY):
+        """
+        Company ids lookup service of the account, it's created once and closed with the instance.
+        `max_workers` is used only when service is created.
+        """
+        with self._company_lookup_lock:
+            if self._company_lookup is None:
+                self._company_lookup = CompanyLookupService(self, max_workers=max_workers)
+
+            return self._company_lookup
+
+    def _cache_company_id(self, public_id, data):
+        """
+        Cache company id of fetched company data. Company is cached as not found only
+        if it's definitely not found: 404 status or no company with numeric id, other
+        failed responses (e.g. rate limit) aren't cached
 
         Returns:
             numeric company id or None
         """
-        company = self.get_company(public_id)
-        if company:
-            company_id = get_id_from_urn(company.get("entityUrn"))
+        status = data.get("status", 200) if data else 200
+        if status not in (200, 404):
+            self.logger.info("request failed: {}".format(data.get("message")))
+            return None
+
+        company = data["elements"][0] if status == 200 and data.get("elements") else None
+        entity_urn = company.get("entityUrn") if company else None
+        company_id = get_id_from_urn(entity_urn) if entity_urn else None
+        if not (company_id and company_id.isnumeric()):
+            company_id = None
 
-            if company_id and company_id.isnumeric():
-                return company_id
+        if self.company_id_cache:
+            if company_id:
+                self.company_id_cache.set(public_id, company_id)
+            else:
+                self.company_id_cache.set_missing(public_id)
+
+        return company_id
 
+    @request_flow
     def create_conversation(self, entity_urn, message_body):
         """
         Create conversation
         """
-        payload = json.dumps(
+        res = yield Request(
+            "POST",
+            "/messaging/conversations?action=create",
+            data=self._create_conversation_payload(entity_urn, message_body),
+        )
+
+        return res.status_code != 201
+
+    @staticmethod
+    def _create_conversation_payload(entity_urn, message_body) -> str:
+        return json.dumps(
             {
                 "keyVersion": "LEGACY_INBOX",
                 "conversationCreate": {
@@ -830,13 +1392,6 @@ class Linkedin(object):
             }
         )
 
-        res = self._post(
-            "/messaging/conversations?action=create",
-            data=payload,
-        )
-
-        return res.status_code != 201
-
     def event_bodies(self, receiver_urn_id, user_elements):
         """
         Args:
@@ -876,18 +1431,22 @@ class Linkedin(object):
 
         return receiver_messages, sender_messages, conversation_urn_id
 
+    @request_flow
     def get_conversation_details(self, profile_urn_id, get_id=False):
         """
         Return the conversation (or "message thread") details for a given [public_profile_id]
         """
         # passing `params` doesn't work properly, think it's to do with List().
         # Might be a bug in `requests`?
-        res = self._fetch(
+        res = yield Request(
+            "GET",
             f"/messaging/conversations?\
             keyVersion=LEGACY_INBOX&q=participants&recipients=List({profile_urn_id})"
         )
 
-        data = res.json()
+        return self._parse_conversation_details(response_json(res), profile_urn_id, get_id=get_id)
+
+    def _parse_conversation_details(self, data, profile_urn_id, get_id=False):
         elements = data.get("elements", [])
         latest_reply_from_recipient = False
         only_first_message_found = None
@@ -940,6 +1499,7 @@ class Linkedin(object):
         }
 
     # NEXT: outdated, need to remove
+    @request_flow
     def get_conversations(self, createdBefore=None):
         """
         Return list of conversations the user is in.
@@ -949,18 +1509,20 @@ class Linkedin(object):
         else:
             params = {"keyVersion": "LEGACY_INBOX", "createdBefore": createdBefore}
 
-        res = self._fetch("/messaging/conversations", params=params)
+        res = yield Request("GET", "/messaging/conversations", params=params)
 
-        return res.json()
+        return response_json(res)
 
+    @request_flow
     def get_conversation(self, conversation_urn_id):
         """
         Return the full conversation at a given [conversation_urn_id]
         """
-        res = self._fetch(f"/messaging/conversations/{conversation_urn_id}/events")
+        res = yield Request("GET", f"/messaging/conversations/{conversation_urn_id}/events")
 
-        return res.json()
+        return response_json(res)
 
+    @request_flow
     def send_message(
         self, conversation_urn_id=None, recipients=[], message_body=None, parse_urn_id=False
     ) -> bool:
@@ -974,24 +1536,14 @@ class Linkedin(object):
         if not (conversation_urn_id or recipients) and not message_body:
             return True
 
-        message_event = {
-            "eventCreate": {
-                "value": {
-                    "com.linkedin.voyager.messaging.create.MessageCreate": {
-                        "body": message_body,
-                        "attachments": [],
-                        "attributedBody": {"text": message_body, "attributes": []},
-                        "mediaAttachments": [],
-                    }
-                }
-            }
-        }
+        message_event = self._message_event(message_body)
 
         if conversation_urn_id and not recipients:
             if parse_urn_id:
                 conversation_urn_id = get_id_from_urn(conversation_urn_id)
 
-            res = self._post(
+            res = yield Request(
+                "POST",
                 f"/messaging/conversations/{conversation_urn_id}/events",
                 params=params,
                 data=json.dumps(message_event),
@@ -999,75 +1551,107 @@ class Linkedin(object):
 
             return res.status_code == 201
         elif recipients and not conversation_urn_id:
-            message_event["recipients"] = recipients
-            message_event["subtype"] = "MEMBER_TO_MEMBER"
-            payload = {
-                "keyVersion": "LEGACY_INBOX",
-                "conversationCreate": message_event,
+            payload = self._conversation_create_payload(message_event, recipients)
+            res = yield Request("POST", "/messaging/conversations", params=params, data=json.dumps(payload))
+
+            return res.status_code == 201
+
+    @staticmethod
+    def _message_event(message_body) -> dict:
+        return {
+            "eventCreate": {
+                "value": {
+                    "com.linkedin.voyager.messaging.create.MessageCreate": {
+                        "body": message_body,
+                        "attachments": [],
+                        "attributedBody": {"text": message_body, "attributes": []},
+                        "mediaAttachments": [],
+                    }
+                }
             }
-            res = self._post("/messaging/conversations", params=params, data=json.dumps(payload))
+        }
 
-            return res.status_code == 201
+    @staticmethod
+    def _conversation_create_payload(message_event, recipients) -> dict:
+        message_event["recipients"] = recipients
+        message_event["subtype"] = "MEMBER_TO_MEMBER"
+        return {
+            "keyVersion": "LEGACY_INBOX",
+            "conversationCreate": message_event,
+        }
 
+    @request_flow
     def mark_conversation_as_seen(self, conversation_urn_id):
         """
         Send seen to a given conversation. If error, return True.
         """
         payload = json.dumps({"patch": {"$set": {"read": True}}})
 
-        res = self._post(f"/messaging/conversations/{conversation_urn_id}", data=payload)
+        res = yield Request("POST", f"/messaging/conversations/{conversation_urn_id}", data=payload)
 
         return res.status_code != 200
 
     # NEXT: trigger deauth, need to remove
+    @request_flow
     def get_user_profile(self):
         """
         Return current user profile
         """
-        res = self._fetch("/me")
-        data = res.json()
+        res = yield Request("GET", "/me")
+        data = response_json(res)
 
         return data
 
-    def dash_global_navs(self):
-        """
-        Return current user profile
-        """
+    _DASH_GLOBAL_NAVS_URI = "/graphql?" + urlencode(
+        {
+            "includeWebMetadata": "true",
+            "variables": "()",
+            "queryId": "voyagerFeedDashGlobalNavs.392ef5b3577c3f317acf6087b30391ff",
+        },
+        safe="(),:",
+    )
 
-        headers = {
+    @staticmethod
+    def _feed_headers() -> dict:
+        return {
             "Accept": "application/vnd.linkedin.normalized+json+2.1",
             "x-li-page-instance": f"urn:li:page:d_flagship3_feed;{get_random_base64()}",
             "x-restli-protocol-version": "2.0.0",
         }
 
-        # Get profile data
-        params = {
-            "includeWebMetadata": "true",
-            "variables": "()",
-            "queryId": "voyagerFeedDashGlobalNavs.392ef5b3577c3f317acf6087b30391ff",
-        }
+    @request_flow
+    def dash_global_navs(self):
+        """
+        Return current user profile
+        """
 
         # NEXT: parmetrize?
-        response = self._fetch(
-            f"/graphql?{urlencode(params, safe='(),:')}",
-            headers=headers,
+        response = yield Request(
+            "GET",
+            self._DASH_GLOBAL_NAVS_URI,
+            headers=self._feed_headers(),
         )
         response.raise_for_status()
-        return response.json()
+        return response_json(response)
 
+    @request_flow
     def conversations(self, inbox_user_urn):
         """
         Return list of conversations from users inbox
         NOTE: not support next/previous page (newSyncToken), but it can be added
         """
 
-        response = self._fetch(
+        response = yield Request(
+            "GET",
             f"/voyagerMessagingGraphQL/graphql?queryId=messengerConversations.0df6f006f938bcf4f6be8f8fdfc2fe4c&variables=(mailboxUrn:urn%3Ali%3Afsd_profile%3A{inbox_user_urn})",
             headers={"Accept": "application/graphql"},
         )
+        return self._parse_conversations(response_json(response), inbox_user_urn)
+
+    @staticmethod
+    def _parse_conversations(data: dict, inbox_user_urn) -> tuple:
         conversations = (
-            get_object_by_path(response.json(), "data.messengerConversationsBySyncToken.elements")
-            or []
+            get_object_by_path(data, "data.messengerConversationsBySyncToken.elements") or []
         )
         if not conversations:
             logger.warning("No converations found")
@@ -1104,19 +1688,25 @@ class Linkedin(object):
 
         return parcipiants, parsed_messages
 
+    @request_flow
     def messenger_conversations(self, inbox_user_urn, recipient_urn) -> dict:
         """Get conversation data between two users.
         :param inbox_user_urn: the URN of the inbox user (who is logged in)
         :param recipient_urn: the URN of the recipient
         """
 
-        response = self._fetch(
+        response = yield Request(
+            "GET",
             f"https://www.linkedin.com/voyager/api/voyagerMessagingGraphQL/graphql?queryId=messengerConversations.c6e2778ef6f5c2b617c06261738cd193&variables=(mailboxUrn:urn%3Ali%3Afsd_profile%3A{inbox_user_urn},recipients:List(urn%3Ali%3Afsd_profile%3A{recipient_urn}))",
             raw_url=True,
             headers={"Accept": "application/graphql"},
         )
         response.raise_for_status()
-        elements = response.json()["data"]["messengerConversationsByRecipients"]["elements"]
+        return self._parse_messenger_conversation(response_json(response))
+
+    @staticmethod
+    def _parse_messenger_conversation(data: dict) -> dict:
+        elements = data["data"]["messengerConversationsByRecipients"]["elements"]
         if not elements:
             logger.debug("No conversations found")
             return {}
@@ -1133,90 +1723,112 @@ class Linkedin(object):
             "lastActivityAt": root_element["lastActivityAt"],
         }
 
+    @request_flow
     def messenger_messages(self, recipient_urn) -> list:
         recipient_urn = quote_plus(recipient_urn)
         url = f"https://www.linkedin.com/voyager/api/voyagerMessagingGraphQL/graphql?queryId=messengerMessages.fcaf6a3aca4ff63c4d1585bddb1e1a8e&variables=(conversationUrn:{recipient_urn})"
-        response = self._fetch(url, raw_url=True, headers={"Accept": "application/graphql"})
+        response = yield Request("GET", url, raw_url=True, headers={"Accept": "application/graphql"})
         response.raise_for_status()
-        return parse_messenger_messages(response.json())
+        return parse_messenger_messages(response_json(response))
 
-    def get_access_list(self) -> FeatureAccess:
-        random_page_instance_postfix = get_random_base64()
-        headers = {
-            "Accept": "application/vnd.linkedin.normalized+json+2.1",
-            "x-li-page-instance": f"urn:li:page:d_flagship3_feed;{random_page_instance_postfix}",
-            "x-restli-protocol-version": "2.0.0",
-            "Referer": "https://www.linkedin.com/in/mynetwork/",
-        }
-        params = {
+    _ACCESS_LIST_URI = "/graphql?" + urlencode(
+        {
             "variables": "(featureAccessTypes:List(CAN_ACCESS_SALES_NAV_ENTRY_POINT,CAN_ACCESS_RECRUITER_ENTRY_POINT,CAN_ACCESS_ADVERTISE_BADGE,CAN_ACCESS_HIRING_MANAGER_MAILBOX,CAN_ACCESS_PREMIUM_REFERRALS))",
             "queryId": "voyagerPremiumDashFeatureAccess.c87b20dac35795f9920f2a8072fd7af5",
-        }
-        response = self._fetch(
-            f"/graphql?{urlencode(params, safe='(),:')}",
-            headers=headers,
-        ).json()
+        },
+        safe="(),:",
+    )
+
+    @request_flow
+    def get_access_list(self) -> FeatureAccess:
+        headers = self._feed_headers()
+        headers["Referer"] = "https://www.linkedin.com/in/mynetwork/"
+        response = response_json((yield Request("GET", self._ACCESS_LIST_URI, headers=headers)))
+        return self._parse_access_list(response)
+
+    @staticmethod
+    def _parse_access_list(response: dict) -> FeatureAccess:
         return FeatureAccess(
             **{access["featureAccessType"]: access["hasAccess"] for access in response["included"]}
         )
 
+    @staticmethod
+    def _has_premium_access(feature_access_list: FeatureAccess) -> bool:
+        return bool(
+            feature_access_list.CAN_ACCESS_SALES_NAV_ENTRY_POINT
+            or feature_access_list.CAN_ACCESS_RECRUITER_ENTRY_POINT
+            or feature_access_list.CAN_ACCESS_PREMIUM_REFERRALS
+        )
+
+    @request_flow
     def get_premium_subscription(self):
         """
         Return current user profile
         """
-        random_page_instance_postfix = get_random_base64()
-        res = self._fetch(
+        res = yield Request(
+            "GET",
             "https://www.linkedin.com/psettings/premium-subscription?asJson=true",
             raw_url=True,
-            headers={
-                "authority": "www.linkedin.com",
-                "accept": "application/json, text/javascript, */*; q=0.01",
-                "dnt": "1",
-                "x-requested-with": "XMLHttpRequest",
-                "x-li-page-instance": f"urn:li:page:psettings-premium-subscription;"
-                f"{random_page_instance_postfix}",
-                "sec-fetch-site": "same-origin",
-                "sec-fetch-mode": "cors",
-                "sec-fetch-dest": "empty",
-                "referer": "https://www.linkedin.com/",
-                "accept-language": "en,en-GB;q=0.9,en;q=0.8,en-US;q=0.7",
-            },
+            headers=self._premium_subscription_headers(),
         )
-        data = res.json()
+        data = response_json(res)
 
         return data
 
+    @staticmethod
+    def _premium_subscription_headers() -> dict:
+        random_page_instance_postfix = get_random_base64()
+        return {
+            "authority": "www.linkedin.com",
+            "accept": "application/json, text/javascript, */*; q=0.01",
+            "dnt": "1",
+            "x-requested-with": "XMLHttpRequest",
+            "x-li-page-instance": f"urn:li:page:psettings-premium-subscription;"
+            f"{random_page_instance_postfix}",
+            "sec-fetch-site": "same-origin",
+            "sec-fetch-mode": "cors",
+            "sec-fetch-dest": "empty",
+            "referer": "https://www.linkedin.com/",
+            "accept-language": "en,en-GB;q=0.9,en;q=0.8,en-US;q=0.7",
+        }
+
+    _BILLINGS_HEADERS = {
+        "authority": "www.linkedin.com",
+        "pragma": "no-cache",
+        "cache-control": "no-cache",
+        "accept": "*/*",
+        "dnt": "1",
+        "x-requested-with": "XMLHttpRequest",
+        "sec-fetch-site": "same-origin",
+        "sec-fetch-mode": "cors",
+        "sec-fetch-dest": "empty",
+        "referer": "https://www.linkedin.com/",
+    }
+
+    @request_flow
     def get_billings(self):
         """ "
         Return current user billings
         """
-        res = self._fetch(
+        res = yield Request(
+            "GET",
             "https://www.linkedin.com/psettings/premium-subscription/billings",
             raw_url=True,
-            headers={
-                "authority": "www.linkedin.com",
-                "pragma": "no-cache",
-                "cache-control": "no-cache",
-                "accept": "*/*",
-                "dnt": "1",
-                "x-requested-with": "XMLHttpRequest",
-                "sec-fetch-site": "same-origin",
-                "sec-fetch-mode": "cors",
-                "sec-fetch-dest": "empty",
-                "referer": "https://www.linkedin.com/",
-            },
+            headers=self._BILLINGS_HEADERS,
         )
-        data = res.json()
+        data = response_json(res)
         return data
 
+    @request_flow
     def get_user_panels(self):
         """
         Return current user profile
         """
-        res = self._fetch("/identity/panels")
-        data = res.json()
+        res = yield Request("GET", "/identity/panels")
+        data = response_json(res)
         return data
 
+    @request_flow
     def get_sent_invitations(self, start=0, limit=100):
         """
         Return list of new invites
@@ -1230,13 +1842,14 @@ class Linkedin(object):
             "start": start,
         }
 
-        res = self._fetch("/relationships/sentInvitationViewsV2", params=params)
+        res = yield Request("GET", "/relationships/sentInvitationViewsV2", params=params)
 
         res.raise_for_status()
 
-        response_payload = res.json()
+        response_payload = response_json(res)
         return [element["invitation"] for element in response_payload["elements"]]
 
+    @request_flow
     def get_invitations(self, start=0, limit=3):
         """
         Return list of new invites
@@ -1248,26 +1861,28 @@ class Linkedin(object):
             "q": "receivedInvitation",
         }
 
-        res = self._fetch("/relationships/invitationViews", params=params)
+        res = yield Request("GET", "/relationships/invitationViews", params=params)
 
         if res.status_code != 200:
             return []
 
-        response_payload = res.json()
+        response_payload = response_json(res)
         return [element["invitation"] for element in response_payload["elements"]]
 
+    @request_flow
     def get_invitations_summary(self):
         """
         Return list of new invites
         """
-        res = self._fetch("/relationships/invitationsSummary")
+        res = yield Request("GET", "/relationships/invitationsSummary")
 
         if res.status_code != 200:
             return []
 
-        response_payload = res.json()
+        response_payload = response_json(res)
         return response_payload
 
+    @request_flow
     def reply_invitation(self, invitation_entity_urn, invitation_shared_secret, action="accept"):
         """
         Reply to an invite, the default is to accept the invitation.
@@ -1286,7 +1901,8 @@ class Linkedin(object):
             }
         )
 
-        res = self._post(
+        res = yield Request(
+            "POST",
             f"{self.client.API_BASE_URL}/relationships/invitations/{invitation_id}",
             params=params,
             data=payload,
@@ -1294,81 +1910,156 @@ class Linkedin(object):
 
         return res.status_code == 200
 
-    def get_profile_connections_raw(self, max_results=None, results=[]) -> list:
+    def get_profile_connections_raw(self, max_results=None) -> list:
+        return self._collect(self.iter_profile_connections_raw(max_results=max_results))
+
+    @iter_request_flow
+    def iter_profile_connections_raw(self, max_results=None, cursor=None, cursor_key=None):
+        """
+        Yield connections of current profile page by page, recently added first.
+
+        [cursor] - PaginationCursor to continue from, it's advanced after each page
+        [cursor_key] - redis key to load cursor from and save it to after each page,
+        so a crawl failed with e.g. proxy error is resumed from the last page
+        """
         count = (
             max_results
             if max_results and max_results <= Linkedin._MAX_SEARCH_COUNT
             else Linkedin._MAX_SEARCH_COUNT
         )
 
-        params = {
-            "decorationId": "com.linkedin.voyager.dash.deco.web.mynetwork.ConnectionListWithProfile-16",
-            "count": count,
-            "q": "search",
-            "sortType": "RECENTLY_ADDED",
-            "start": len(results),
-        }
+        cursor = self._load_cursor(cursor, cursor_key)
+        while True:
+            params = self._profile_connections_params(count, cursor.start)
+            res = yield Request("GET", "/relationships/dash/connections", params=params)
+            data = response_json(res)
 
-        res = self._fetch("/relationships/dash/connections", params=params)
-        data = res.json()
+            elements = data["elements"]
+            connections = self._parse_connections(
+                cursor.new_elements(elements, self._connection_entity_key)
+            )
+            if max_results:
+                connections = connections[: max_results - cursor.yielded]
 
-        if data and data["elements"]:
-            connections_list = data["elements"]
-            connections = []
-            logger.debug("Found %d elements", len(connections_list))
-            for profile in connections_list:
-                try:
-                    connections.append(
-                        {
-                            "publicIdentifier": profile["connectedMemberResolutionResult"][
-                                "publicIdentifier"
-                            ],
-                            "entityUrn": get_id_from_urn(profile["entityUrn"]),
-                        }
-                    )
-                except KeyError:
-                    # This is probably a deleted profile or canceled invitation
-                    logger.warning("Failed to parse connection data: %s", profile)
-                    continue
+            yield from connections
+
+            cursor.advance(elements, self._connection_entity_key)
+            cursor.yielded += len(connections)
+
+            if (
+                len(elements) == 0
+                or data["paging"]["count"] is None
+                or (max_results and cursor.yielded >= max_results)
+            ):
+                break
 
-            results = results + connections
+            self._save_cursor(cursor, cursor_key)
+            self._defer(random.randint(1, 40))  # pause to avoid throttling
 
-        total_found = data["paging"]["count"]
+        self._delete_cursor(cursor_key)
 
-        # recursive base case
-        if (
-            len(data["elements"]) == 0
-            or (max_results and len(results) >= max_results)
-            or total_found is None
-            or (
-                max_results is not None
-                and len(results) / max_results >= Linkedin._MAX_REPEATED_REQUESTS
-            )
-        ):
-            if max_results and (len(results) > max_results):
-                results = results[:max_results]
+    @staticmethod
+    def _connection_entity_key(connection: dict):
+        return connection.get("entityUrn")
 
-            return results
+    @staticmethod
+    def _profile_connections_params(count: int, start: int) -> dict:
+        return {
+            "decorationId": "com.linkedin.voyager.dash.deco.web.mynetwork.ConnectionListWithProfile-16",
+            "count": count,
+            "q": "search",
+            "sortType": "RECENTLY_ADDED",
+            "start": start,
+        }
+
+    @staticmethod
+    def _parse_connections(connections_list: list) -> list:
+        connections = []
+        logger.debug("Found %d elements", len(connections_list))
+        for profile in connections_list:
+            try:
+                connections.append(
+                    {
+                        "publicIdentifier": profile["connectedMemberResolutionResult"][
+                            "publicIdentifier"
+                        ],
+                        "entityUrn": get_id_from_urn(profile["entityUrn"]),
+                    }
+                )
+            except KeyError:
+                # This is probably a deleted profile or canceled invitation
+                logger.warning("Failed to parse connection data: %s", profile)
+                continue
 
-        sleep(random.randint(1, 40))  # sleep to avoid throttling
-        return self.get_profile_connections_raw(max_results=max_results, results=results)
+        return connections
 
+    @request_flow
     def get_current_profile_urn(self, public_id=None):
         """
         Get profile view statistics, including chart data.
         """
-        network_info = self._fetch(f"/identity/profiles/{public_id}/networkinfo")
+        network_info = yield Request("GET", f"/identity/profiles/{public_id}/networkinfo")
 
-        network_info_data = network_info.json()
+        network_info_data = response_json(network_info)
         entityUrn = network_info_data.get("entityUrn")
 
         if entityUrn:
             return get_id_from_urn(entityUrn)
 
+    @request_flow
     def sales_login(self, timeout=None):
-        request_homepage = self._fetch(
+        request_homepage = yield Request(
+            "GET",
             "https://www.linkedin.com/sales/", raw_url=True, timeout=timeout
         )
+        client_page_instance = self._parse_sales_page_instance(request_homepage)
+
+        request_sales_api_identity = yield Request(
+            "GET",
+            self._SALES_API_IDENTITY_URL,
+            raw_url=True,
+            headers=self._SALES_API_IDENTITY_HEADERS,
+            timeout=timeout,
+        )
+
+        contract_data = self._parse_sales_contract(response_json(request_sales_api_identity))
+        if contract_data:
+            request_api_agnostic = yield Request(
+                "POST",
+                self._SALES_API_AGNOSTIC_AUTH_URL,
+                raw_url=True,
+                headers=self._sales_api_agnostic_auth_headers(client_page_instance),
+                data=json.dumps(contract_data),
+                timeout=timeout,
+            )
+            request_api_agnostic.raise_for_status()
+            return True
+
+        return False
+
+    _SALES_API_IDENTITY_URL = (
+        "https://www.linkedin.com/sales-api/salesApiIdentity?q=findLicensesByCurrentMember"
+    )
+    _SALES_API_IDENTITY_HEADERS = {
+        "dnt": "1",
+        "accept-encoding": "gzip, deflate, br",
+        "x-li-lang": "en_US",
+        "accept-language": "en-US,en;q=0.9",
+        "x-requested-with": "XMLHttpRequest",
+        "pragma": "no-cache",
+        "accept": "*/*",
+        "cache-control": "no-cache",
+        "x-restli-protocol-version": "2.0.0",
+        "authority": "www.linkedin.com",
+        "referer": "https://www.linkedin.com/sales/",
+    }
+    _SALES_API_AGNOSTIC_AUTH_URL = (
+        "https://www.linkedin.com/sales-api/salesApiAgnosticAuthentication?%s"
+        % (urlencode({"redirect": "/sales/search"}),)
+    )
+
+    @staticmethod
+    def _parse_sales_page_instance(request_homepage) -> str:
         client_page_instance = None
 
         client_page_instance_data_groups = re.search(
@@ -1386,30 +2077,13 @@ class Linkedin(object):
             )
             raise LinkedinLoginError("No client_page_instance_data_groups groups")
 
-        request_sales_api_identity = self._fetch(
-            "https://www.linkedin.com/sales-api/salesApiIdentity?q=findLicensesByCurrentMember",
-            raw_url=True,
-            headers={
-                "dnt": "1",
-                "accept-encoding": "gzip, deflate, br",
-                "x-li-lang": "en_US",
-                "accept-language": "en-US,en;q=0.9",
-                "x-requested-with": "XMLHttpRequest",
-                "pragma": "no-cache",
-                "accept": "*/*",
-                "cache-control": "no-cache",
-                "x-restli-protocol-version": "2.0.0",
-                "authority": "www.linkedin.com",
-                "referer": "https://www.linkedin.com/sales/",
-            },
-            timeout=timeout,
-        )
-
-        sales_api_identity_data = request_sales_api_identity.json()
+        return client_page_instance
 
+    @staticmethod
+    def _parse_sales_contract(sales_api_identity_data: dict) -> dict | None:
         if sales_api_identity_data.get("elements"):
             element = sales_api_identity_data["elements"][0]
-            contractData = {
+            return {
                 "viewerDeviceType": "DESKTOP",
                 "name": element["name"],
                 "identity": {
@@ -1418,35 +2092,45 @@ class Linkedin(object):
                 },
             }
 
-            redirect = "/sales/search"
-            redirect = urlencode({"redirect": redirect})
-
-            SALES_API_AGONSITC_AUTH_URL = (
-                "https://www.linkedin.com/sales-api/salesApiAgnosticAuthentication?%s"
-                % (redirect,)
-            )
-            request_api_agnostic = self._post(
-                SALES_API_AGONSITC_AUTH_URL,
-                raw_url=True,
-                headers={
-                    "X-Restli-Protocol-Version": "2.0.0",
-                    "X-Requested-With": "XMLHttpRequest",
-                    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-                    "X-Li-Page-Instance": client_page_instance,
-                    "X-Li-Lang": "en_US",
-                    "Referer": "https://www.linkedin.com/sales/contract-chooser?redirect=%2Fsales%2Fsearch",
-                },
-                data=json.dumps(contractData),
-                timeout=timeout,
-            )
-            request_api_agnostic.raise_for_status()
-            return True
-
-        return False
+    @staticmethod
+    def _sales_api_agnostic_auth_headers(client_page_instance: str) -> dict:
+        return {
+            "X-Restli-Protocol-Version": "2.0.0",
+            "X-Requested-With": "XMLHttpRequest",
+            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+            "X-Li-Page-Instance": client_page_instance,
+            "X-Li-Lang": "en_US",
+            "Referer": "https://www.linkedin.com/sales/contract-chooser?redirect=%2Fsales%2Fsearch",
+        }
 
+    @request_flow
     def get_leads(
         self, search_url, is_sales=False, timeout=None, get_raw=False, send_sn_requests=True
     ):
+        is_sales = self._validate_leads_search(search_url, is_sales, timeout)
+
+        if is_sales and send_sn_requests:
+            yield from self.sales_login.flow(self, timeout=timeout)
+
+        raw_html_request = yield Request("GET", search_url, raw_url=True, timeout=timeout)
+        raw_html_request.raise_for_status()
+        html = raw_html_request.text
+
+        if get_raw:
+            return html
+        else:
+            if is_sales:
+                search_hits = yield from self.cluster_sales_search_people.flow(self, search_url)
+                leads = self._parse_sales_leads(search_hits)
+            else:
+                search_url = generate_grapqhl_search_url(search_url)
+                search_json = response_json((yield Request("GET", search_url, raw_url=True)))
+                leads = self._parse_default_leads(search_json)
+
+            return self._finalize_leads(*leads)
+
+    @staticmethod
+    def _validate_leads_search(search_url, is_sales, timeout) -> bool:
         logger.info(
             "Leads quick search %s url, with %s timeout. Is Sales %s.",
             search_url,
@@ -1460,92 +2144,156 @@ class Linkedin(object):
         if search_url.startswith("https://www.linkedin.com/sales/search"):
             is_sales = True
 
-        if is_sales and send_sn_requests:
-            self.sales_login(timeout=timeout)
+        return is_sales
 
-        raw_html_request = self._fetch(search_url, raw_url=True, timeout=timeout)
-        raw_html_request.raise_for_status()
-        html = raw_html_request.text
+    def _parse_sales_leads(self, search_hits) -> tuple:
+        parsed_users, pagination, unknown_profiles, limit_data = parse_search_hits(
+            search_hits, is_sales=True
+        )
 
-        if get_raw:
-            return html
-        else:
-            if is_sales:
-                search_hits = self.cluster_sales_search_people(search_url)
-                parsed_users, pagination, unknown_profiles, limit_data = parse_search_hits(
-                    search_hits, is_sales=is_sales
-                )
+        # Normalize pagination total, can't be more than _MAX_SEARCH_LEN_SALES_NAV
+        if pagination.get("total") and pagination["total"] > self._MAX_SEARCH_LEN_SALES_NAV:
+            pagination["total"] = self._MAX_SEARCH_LEN_SALES_NAV
 
-                # Normalize pagination total, can't be more than _MAX_SEARCH_LEN_SALES_NAV
-                if (
-                    pagination.get("total")
-                    and pagination["total"] > self._MAX_SEARCH_LEN_SALES_NAV
-                ):
-                    pagination["total"] = self._MAX_SEARCH_LEN_SALES_NAV
-            else:
-                search_url = generate_grapqhl_search_url(search_url)
-                search_json = self._fetch(
-                    search_url,
-                    raw_url=True,
-                ).json()
-                search_parser = LinkedinJSONParser(search_json)
-                pagination = search_parser.get_paging()
+        return parsed_users, pagination, unknown_profiles, limit_data
 
-                # Normalize pagination total, can't be more than _MAX_SEARCH_LEN
-                if pagination.get("total") and pagination["total"] > self._MAX_SEARCH_LEN:
-                    pagination["total"] = self._MAX_SEARCH_LEN
+    def _parse_default_leads(self, search_json) -> tuple:
+        search_parser = LinkedinJSONParser(search_json)
+        pagination = search_parser.get_paging()
 
-                parsed_users = search_parser.parse_users()
-                unknown_profiles = []
-                limit_data = {}
+        # Normalize pagination total, can't be more than _MAX_SEARCH_LEN
+        if pagination.get("total") and pagination["total"] > self._MAX_SEARCH_LEN:
+            pagination["total"] = self._MAX_SEARCH_LEN
 
-            if parsed_users:
-                # default pagination params can be useful for debugging
-                logger.debug("Override pagination, reason: we found parsed_users")
-                pagination["logged_in"] = True
-                pagination["results_length"] = len(parsed_users)
+        parsed_users = search_parser.parse_users()
+        return parsed_users, pagination, [], {}
 
-            return parsed_users, pagination, unknown_profiles, limit_data
+    @staticmethod
+    def _finalize_leads(parsed_users, pagination, unknown_profiles, limit_data) -> tuple:
+        if parsed_users:
+            # default pagination params can be useful for debugging
+            logger.debug("Override pagination, reason: we found parsed_users")
+            pagination["logged_in"] = True
+            pagination["results_length"] = len(parsed_users)
 
+        return parsed_users, pagination, unknown_profiles, limit_data
+
+    @request_flow
     def random_user_actions(self, public_id=None):
         results = []
 
         if public_id:
             if random.randint(0, 1):
-                results.append(self.get_profile_network_info(public_id))
+                results.append((yield from self.get_profile_network_info.flow(self, public_id)))
             else:
-                results.append(self.get_current_profile_urn(public_id))
+                results.append((yield from self.get_current_profile_urn.flow(self, public_id)))
         else:
-            results.append(self.get_user_profile())
+            results.append((yield from self.get_user_profile.flow(self)))
 
         return results
 
-    def get_profile_data(self, public_id: str) -> dict:
-        random_page_instance_postfix = get_random_base64()
-        headers = {
-            "Accept": "application/vnd.linkedin.normalized+json+2.1",
-            "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{random_page_instance_postfix}",
-            "x-restli-protocol-version": "2.0.0",
-            "Referer": f"https://www.linkedin.com/in/{public_id}/",
-        }
+    @request_flow
+    def get_profile_data(self, public_id: str, warmup=None, use_cache=True) -> dict:
+        """
+        [warmup] - fetch profile page before profile data, by default page is fetched
+        only if no profile page was fetched in last PROFILE_WARMUP_INTERVAL seconds
+        [use_cache] - return profile data from profile cache, if cached
+        """
+        cached = self._get_cached_profile("profile_data", public_id=public_id, use_cache=use_cache)
+        if cached is not None:
+            return cached
+
+        headers = self._profile_view_headers(public_id)
 
         # Fetch profile page
-        self._fetch("https://www.linkedin.com/in/" + public_id, raw_url=True)
+        if self._claim_profile_warmup(warmup):
+            page = yield Request(
+                "GET",
+                "https://www.linkedin.com/in/" + public_id,
+                raw_url=True,
+                allowed_status_codes=(404,),
+            )
+            if page.status_code == 404:
+                raise self._profile_not_found("profile_data", public_id=public_id)
 
         # Get profile data
-        params = {
-            "includeWebMetadata": "true",
-            "variables": f"(vanityName:{public_id})",
-            "queryId": "voyagerIdentityDashProfiles.a1941bc56db02d2a36a03dd81313f3c7",
-        }
-
-        response = self._fetch(
-            f"/graphql?{urlencode(params, safe='(),:')}",
+        response = yield Request(
+            "GET",
+            self._profile_graphql_uri(
+                public_id, "voyagerIdentityDashProfiles.a1941bc56db02d2a36a03dd81313f3c7"
+            ),
             headers=headers,
         )
         response.raise_for_status()
-        profile = response.json()
 
+        data = response_json(response)
+        profile_data = self._parse_profile_data(data)
+        self._cache_profile(
+            "profile_data", profile_data, public_id=public_id, urn=self._profile_response_urn(data)
+        )
+        return profile_data
+
+    def _get_cached_profile(self, group, public_id=None, urn=None, use_cache=True):
+        """
+        Returns:
+            cached profile record or None, LinkedinProfileNotFound is raised
+            if profile is cached as not found
+        """
+        if not (use_cache and self.profile_cache):
+            return None
+
+        record = self.profile_cache.get(
+            group, public_id=public_id, urn=urn, viewer=self.pacing_key
+        )
+        if record is not None and self.profile_cache.is_missing(record):
+            raise LinkedinProfileNotFound(f"Profile {public_id or urn} not found (cached)")
+
+        return record
+
+    def _cache_profile(self, group, record, public_id=None, urn=None):
+        if self.profile_cache:
+            self.profile_cache.set(
+                group, record, public_id=public_id, urn=urn, viewer=self.pacing_key
+            )
+
+    def _profile_not_found(self, group, public_id=None, urn=None):
+        """
+        Cache profile as not found, returns exception to raise
+        """
+        if self.profile_cache:
+            self.profile_cache.set_missing(
+                group, public_id=public_id, urn=urn, viewer=self.pacing_key
+            )
+
+        return LinkedinProfileNotFound(f"Profile {public_id or urn} not found")
+
+    @staticmethod
+    def _profile_response_urn(data: dict):
+        try:
+            return data["data"]["data"]["identityDashProfilesByMemberIdentity"]["*elements"][0]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    def _claim_profile_warmup(self, warmup=None) -> bool:
+        """
+        Check if profile page is fetched before profile data, warmup time is set
+        by the claiming thread only
+        """
+        if warmup is False:
+            return False
+
+        with self._session_lock:
+            if warmup is None and not (
+                self._profile_warmup_at is None
+                or time.monotonic() - self._profile_warmup_at > settings.PROFILE_WARMUP_INTERVAL
+            ):
+                return False
+
+            self._profile_warmup_at = time.monotonic()
+            return True
+
+    @staticmethod
+    def _parse_profile_data(profile: dict) -> dict:
         entity_urn = profile["data"]["data"]["identityDashProfilesByMemberIdentity"]["*elements"][
             0
         ]
@@ -1564,6 +2312,7 @@ class Linkedin(object):
     def get_profile_urn_v2(self, json_data: dict) -> str:
         return json_data["included"][0]["entityUrn"]
 
+    @request_flow
     def connect_with_someone(
         self, profile_urn_id: str, message: str | None = None
     ) -> LinkedinConnectionState:
@@ -1571,13 +2320,31 @@ class Linkedin(object):
         Send a message to a given conversation. If error, return true.
         generate_tracking_id is not equal to API, gene
         """
-        params = {
-            "action": "verifyQuotaAndCreateV2",
-            "decorationId": "com.linkedin.voyager.dash.deco.relationships.InvitationCreationResultWithInvitee-2",
-        }
+        res = yield Request(
+            "POST",
+            "/voyagerRelationshipsDashMemberRelationships",
+            headers=self._connect_headers(),
+            params=self._CONNECT_PARAMS,
+            json=self._connect_payload(profile_urn_id, message),
+            allowed_status_codes=(406, 429),
+        )
+        res_data = response_json(res)["data"]
 
+        connection_state = self._parse_connection_state(res_data)
+        if connection_state == LinkedinConnectionState.SUCCESS:
+            self.invalidate_invites_sent_cache()
+
+        return connection_state
+
+    _CONNECT_PARAMS = {
+        "action": "verifyQuotaAndCreateV2",
+        "decorationId": "com.linkedin.voyager.dash.deco.relationships.InvitationCreationResultWithInvitee-2",
+    }
+
+    @staticmethod
+    def _connect_headers() -> dict:
         random_page_instance_postfix = get_random_base64()
-        headers = {
+        return {
             "Accept": "application/vnd.linkedin.normalized+json+2.1",
             "x-li-lang": "en_US",
             "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{random_page_instance_postfix}",
@@ -1588,6 +2355,8 @@ class Linkedin(object):
             "DNT": "1",
         }
 
+    @staticmethod
+    def _connect_payload(profile_urn_id: str, message: str | None = None) -> dict:
         message_data = {
             "invitee": {
                 "inviteeUnion": {
@@ -1598,14 +2367,10 @@ class Linkedin(object):
         if message:
             message_data["customMessage"] = message
 
-        res_data = self._post(
-            "/voyagerRelationshipsDashMemberRelationships",
-            headers=headers,
-            params=params,
-            json=message_data,
-            allowed_status_codes=(406, 429),
-        ).json()["data"]
+        return message_data
 
+    @staticmethod
+    def _parse_connection_state(res_data: dict) -> LinkedinConnectionState:
         error_code = res_data.get("code")
         if error_code == "CANT_RESEND_YET":
             return LinkedinConnectionState.CANT_RESEND_YET
@@ -1621,34 +2386,60 @@ class Linkedin(object):
 
         raise Exception(f"Unknown connection error: {res_data}")
 
+    @request_flow
     def remove_connection(self, public_profile_id):
-        res = self._post(
+        res = yield Request(
+            "POST",
             f"/identity/profiles/{public_profile_id}/profileActions?action=disconnect",
             headers={"accept": "application/vnd.linkedin.normalized+json+2.1"},
         )
 
         return res.status_code != 200
 
+    @request_flow
     def get_profile_member_badges(self, public_profile_id):
-        res = self._fetch(
+        res = yield Request(
+            "GET",
             f"/identity/profiles/{public_profile_id}/memberBadges",
             headers={"accept": "application/vnd.linkedin.normalized+json+2.1"},
         )
         if res.status_code != 200:
             return {}
 
-        data = res.json()
+        data = response_json(res)
         return data.get("data", {})
 
-    def get_profile_network_info(self, public_profile_id):
-        res = self._fetch(
+    @request_flow
+    def get_profile_network_info(self, public_profile_id, use_cache=True):
+        try:
+            cached = self._get_cached_profile(
+                "network_info", public_id=public_profile_id, use_cache=use_cache
+            )
+        except LinkedinProfileNotFound:
+            return {}
+
+        if cached is not None:
+            return cached
+
+        res = yield Request(
+            "GET",
             f"/identity/profiles/{public_profile_id}/networkinfo",
             headers={"accept": "application/vnd.linkedin.normalized+json+2.1"},
+            allowed_status_codes=(404,),
         )
+        if res.status_code == 404:
+            self._profile_not_found("network_info", public_id=public_profile_id)
+            return {}
+
         if res.status_code != 200:
             return {}
 
-        data = res.json()
+        network_info = self._parse_network_info(response_json(res))
+        self._cache_profile("network_info", network_info, public_id=public_profile_id)
+        return network_info
+
+    @staticmethod
+    def _parse_network_info(data: dict) -> dict:
         data = data.get("data", {})
         if data:
             distance = data.get("distance", {}).get("value")
@@ -1656,6 +2447,7 @@ class Linkedin(object):
 
         return data
 
+    @request_flow
     def search_companies(self, keywords=None):
         """Perform a LinkedIn search for companies.
         NOTE: we search only 1st page, no recursive search
@@ -1664,7 +2456,8 @@ class Linkedin(object):
         :rtype: list
         """
         search_url = generate_graphql_companies_search_url(keywords)
-        res = self._fetch(
+        res = yield Request(
+            "GET",
             search_url,
             raw_url=True,
         )
@@ -1672,6 +2465,27 @@ class Linkedin(object):
         json_parser = LinkedinJSONParserCompany(res.text)
         return json_parser.parse_companies()
 
+    # This headers usually outdated, need generate each times...
+    _REGIONS_TYPEAHEAD_HEADERS = {
+        "authority": "www.linkedin.com",
+        "pragma": "no-cache",
+        "cache-control": "no-cache",
+        "dnt": "1",
+        "x-li-lang": "en_US",
+        "x-li-identity": "dXJuOmxpOm1lbWJlcjo0MDAzMTE2Nzc",
+        "x-li-page-instance": "urn:li:page:d_sales2_search_people;g//MAJuSRwe6HvmrIEQK5g==",
+        "accept": "*/*",
+        "x-restli-protocol-version": "2.0.0",
+        "x-requested-with": "XMLHttpRequest",
+        "sec-fetch-site": "same-origin",
+        "sec-fetch-mode": "cors",
+        "sec-fetch-dest": "empty",
+        "referer": "https://www.linkedin.com/sales/search/people?"
+        "preserveScrollPosition=true&selectedFilter=GE&viewAllFilters=true",
+        "accept-language": "en-GB,en;q=0.9,ru;q=0.8,en-US;q=0.7",
+    }
+
+    @request_flow
     def get_regions(self):
         """
         Get regions directly from linkedin, typehead API
@@ -1685,34 +2499,13 @@ class Linkedin(object):
         input_regions = get_default_regions(regions_json)
         self.logger.info("Found %d regions at %s", len(input_regions), regions_json)
         output_regions = {}
-        self.client.session.get("https://www.linkedin.com/sales/")
+        yield Request("GET", "https://www.linkedin.com/sales/", raw_url=True, evade=None)
         cookies = self.client.session.cookies.get_dict()
         cookies.get("JSESSIONID").strip('"')
 
         for i, region in enumerate(input_regions):
             region_name = region.get("name")
             region_code = region.get("code")
-            # This headers usually outdated, need generate each times...
-            headers = {
-                "authority": "www.linkedin.com",
-                "pragma": "no-cache",
-                "cache-control": "no-cache",
-                "dnt": "1",
-                "x-li-lang": "en_US",
-                "x-li-identity": "dXJuOmxpOm1lbWJlcjo0MDAzMTE2Nzc",
-                "x-li-page-instance": "urn:li:page:d_sales2_search_people;"
-                "g//MAJuSRwe6HvmrIEQK5g==",
-                "accept": "*/*",
-                "x-restli-protocol-version": "2.0.0",
-                "x-requested-with": "XMLHttpRequest",
-                "sec-fetch-site": "same-origin",
-                "sec-fetch-mode": "cors",
-                "sec-fetch-dest": "empty",
-                "referer": "https://www.linkedin.com/sales/search/people?"
-                "preserveScrollPosition=true&selectedFilter=GE&viewAllFilters=true",
-                "accept-language": "en-GB,en;q=0.9,ru;q=0.8,en-US;q=0.7",
-            }
-
             params = (
                 ("q", "query"),
                 ("start", "0"),
@@ -1721,14 +2514,15 @@ class Linkedin(object):
                 ("query", region_name),
             )
 
-            res = self._fetch(
+            res = yield Request(
+                "GET",
                 "https://www.linkedin.com/sales-api/salesApiFacetTypeahead",
-                headers=headers,
+                headers=self._REGIONS_TYPEAHEAD_HEADERS,
                 params=params,
                 raw_url=True,
             )
 
-            data = res.json()
+            data = response_json(res)
             elements = data.get("elements", [])
             subregions = []
             for element in elements:
@@ -1741,79 +2535,177 @@ class Linkedin(object):
             output_regions[region_code] = subregions
             logger.debug(output_regions[region_code])
 
-            sleep(random.randint(0, 3))
+            self._defer(random.randint(0, 3))
 
         return output_regions
 
-    def reformat_results(self, results):
+    def reformat_results(self, results, max_workers=None):
         # search public ids if not exists, use same method like in scrapy search
-        processed_results = []
-        reformat_max_errors = 6
-        for i, lead in enumerate(results):
-            try:
-                if lead.get("publicIdentifier"):
-                    # evade limit each N requests
-                    if i > 0 and i % randrange(4, 6) == 0:
-                        sleep(randrange(15, 25))
+        processed_results = list(self._iter_reformat_results(results, max_workers=max_workers))
+        # leads are enriched as their profiles arrive, keep order of results
+        return [lead for _, lead in sorted(processed_results, key=lambda item: item[0])]
 
-                    profile = self.get_profile_data(public_id=lead.get("publicIdentifier"))
-                    lead["publicIdentifier"] = profile["publicIdentifier"]
-
-                    # fill additional fields
-                    lead["firstname"] = profile["firstName"]
-                    lead["lastname"] = profile["lastName"]
-                    lead["headline"] = profile["headline"]
-
-                    if "currentPositions" in lead:
-                        for position in lead["currentPositions"]:
-                            if "companyName" in position:
-                                lead["companyName"] = position["companyName"]
-
-                            if "title" in position:
-                                lead["position"] = position["title"]
-                            break
+    def iter_reformat_results(self, results, max_workers=None):
+        """
+        Fill leads with profile data, leads are yielded as their profile is fetched.
+        Profiles are fetched by `max_workers` threads (PROFILE_ENRICHMENT_CONCURRENCY by default),
+        requests of the account are still paced, see `PacingScheduler`.
+        """
+        for _, lead in self._iter_reformat_results(results, max_workers=max_workers):
+            yield lead
 
-                    processed_results.append(lead)
-                else:
-                    processed_results.append(lead)
+    def _iter_reformat_results(self, results, max_workers=None):
+        reformat_max_errors = self._REFORMAT_MAX_ERRORS
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.PROFILE_ENRICHMENT_CONCURRENCY
+        )
+        try:
+            futures = [
+                executor.submit(self._reformat_result, i, lead) for i, lead in enumerate(results)
+            ]
+            for future in as_completed(futures):
+                i, lead, error = future.result()
+                if error:
+                    reformat_max_errors -= 1
+                    logger.warning("Failed get profile data for %s lead", lead, exc_info=error)
 
-            except Exception as e:
-                processed_results.append(lead)
-                reformat_max_errors -= 1
-                logger.warning("Failed get profile data for %s lead", lead, exc_info=e)
+                yield i, lead
 
-            if reformat_max_errors <= 0:
-                raise Exception("Too many reformat errors, break parsing...")
+                if reformat_max_errors <= 0:
+                    raise Exception("Too many reformat errors, break parsing...")
+        finally:
+            executor.shutdown(cancel_futures=True)
 
-        return processed_results
+    def _reformat_result(self, i, lead):
+        """
+        Returns:
+            lead index, lead and error, if profile data isn't fetched
+        """
+        try:
+            if lead.get("publicIdentifier"):
+                # evade limit each N requests
+                if i > 0 and i % randrange(4, 6) == 0:
+                    self._defer(randrange(15, 25))
+
+                profile = self.get_profile_data(public_id=lead.get("publicIdentifier"))
+                self._reformat_lead(lead, profile)
+        except Exception as e:
+            return i, lead, e
+
+        return i, lead, None
+
+    @staticmethod
+    def _reformat_lead(lead, profile):
+        lead["publicIdentifier"] = profile["publicIdentifier"]
+
+        # fill additional fields
+        lead["firstname"] = profile["firstName"]
+        lead["lastname"] = profile["lastName"]
+        lead["headline"] = profile["headline"]
+
+        if "currentPositions" in lead:
+            for position in lead["currentPositions"]:
+                if "companyName" in position:
+                    lead["companyName"] = position["companyName"]
+
+                if "title" in position:
+                    lead["position"] = position["title"]
+                break
 
-    def get_invites_sent_per_interval(self, interval=86400.0) -> list:
+    @request_flow
+    def get_invites_sent_per_interval(self, interval=86400.0, use_cache=True) -> list:
         """
         Get invites sent per interval
         :param interval: seconds, default 86400 seconds (1 day)
+        :param use_cache: use result cached in redis for INVITES_SENT_CACHE_TTL seconds
         """
+        if use_cache:
+            sent_invites_data = self._get_cached_invites_sent(interval)
+            if sent_invites_data is not None:
+                return sent_invites_data
+
+        interval_start = (time.time() - interval) * 1000
         sent_invites_data = []
+        seen_urns = set()
         max_pages_to_parse = 8 + random.randint(0, 5)
 
-        # Get connections from conversation history
-        for i in range(max_pages_to_parse):
-            get_sent_invites_start = i * 100
+        # Invites are sorted by sent time, newest first
+        page_size = self._INVITES_PAGE_SIZE
+        for page in range(max_pages_to_parse):
+            invites = yield from self.get_sent_invitations.flow(
+                self, start=page * page_size, limit=page_size
+            )
+            if not invites:
+                logger.debug("No more invites found, break parsing")
+                break
+
+            if self._collect_sent_invites(invites, interval_start, seen_urns, sent_invites_data):
+                logger.debug("Reached invites sent before interval, break parsing")
+                break
+
+        self._cache_invites_sent(interval, sent_invites_data)
+        return sent_invites_data
 
-            # check app sending limits
-            current_invites_data = self.get_sent_invitations(start=get_sent_invites_start)
+    @staticmethod
+    def _collect_sent_invites(invites, interval_start, seen_urns, sent_invites) -> bool:
+        """
+        Add page invites sent since interval start, duplicates are skipped by entityUrn
 
-            for invite in current_invites_data:
-                if invite in sent_invites_data:
-                    logger.debug("%s invite already exist, skipping", invite)
+        Returns:
+            True if page has invites sent before interval start, next pages are older
+        """
+        for invite in invites:
+            entity_urn = invite.get("entityUrn")
+            if entity_urn is not None:
+                if entity_urn in seen_urns:
+                    logger.debug("%s invite already exist, skipping", entity_urn)
                     continue
 
-                sent_time = datetime.fromtimestamp(invite["sentTime"] / 1000)
-                sent_time_timedelta = datetime.utcnow() - sent_time
-                if sent_time_timedelta.total_seconds() <= interval:
-                    sent_invites_data.append(invite)
+                seen_urns.add(entity_urn)
 
-            if not current_invites_data:
-                logger.debug("No more invites found, break parsing")
-                break
+            if invite["sentTime"] >= interval_start:
+                sent_invites.append(invite)
 
-        return sent_invites_data
+        return min(invite["sentTime"] for invite in invites) < interval_start
+
+    def _invites_sent_cache_key(self):
+        return f"ln.api.invites_sent:{self.pacing_key}"
+
+    def _get_cached_invites_sent(self, interval):
+        try:
+            cached = self.rds.hget(self._invites_sent_cache_key(), str(interval))
+        except RedisError as e:
+            logger.warning(f"Can't read cached sent invites: {e}, fetch them")
+            return None
+
+        if not cached:
+            return None
+
+        cached = json.loads(cached)
+        if time.time() - cached["cached_at"] > settings.INVITES_SENT_CACHE_TTL:
+            return None
+
+        return cached["invites"]
+
+    def _cache_invites_sent(self, interval, sent_invites_data):
+        key = self._invites_sent_cache_key()
+        try:
+            pipe = self.rds.pipeline(transaction=False)
+            pipe.hset(
+                key,
+                str(interval),
+                json.dumps({"cached_at": time.time(), "invites": sent_invites_data}),
+            )
+            pipe.expire(key, settings.INVITES_SENT_CACHE_TTL)
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Can't cache sent invites: {e}")
+
+    def invalidate_invites_sent_cache(self):
+        """
+        Drop cached sent invites of the account, called when new invite is sent
+        """
+        try:
+            self.rds.delete(self._invites_sent_cache_key())
+        except RedisError as e:
+            logger.warning(f"Can't drop cached sent invites: {e}")
@@ -1,9 +1,8 @@
+from collections import defaultdict
 from datetime import UTC, datetime
-from json import JSONDecodeError
-from bs4 import BeautifulSoup
-from flask import json
 from application.integrations.linkedin.utils import get_object_by_path
-from salesloop_linkedin_api.utils.helpers import get_id_from_urn, logger
+from salesloop_linkedin_api.utils.helpers import get_id_from_urn, iter_code_chunks, logger
+from salesloop_linkedin_api.utils.json_codec import JSONDecodeError, loads
 import re
 
 class ProfileParsingError(Exception):
@@ -14,21 +13,62 @@ def profile_element_urn(element_name, profile_item):
     return profile_elements[0] if profile_elements else None
 
 
+class IncludedIndex:
+    """
+    Index of response "included" items, built in one pass.
+    Build it once per response and pass it to the parse functions instead of scanning
+    "included" on every lookup.
+    """
+
+    def __init__(self, included: list):
+        self.included = included
+        self.by_urn = {}
+        self.by_type = defaultdict(list)
+
+        for item in included:
+            item_type = item.get("$type")
+            self.by_type[item_type].append(item)
+
+            entity_urn = item.get("entityUrn")
+            if entity_urn is not None:
+                # Keep first item, like linear scan does
+                self.by_urn.setdefault((entity_urn, item_type), item)
+
+    @classmethod
+    def from_response(cls, response_data: dict) -> "IncludedIndex":
+        return cls(response_data["included"])
+
+    def get(self, item_type, item_entity_urn, default=None):
+        return self.by_urn.get((item_entity_urn, item_type), default)
+
+    def of_type(self, item_type) -> list:
+        return self.by_type.get(item_type, [])
+
+
 def extract_included_item(item_type, item_entity_urn, included):
-    for item in included:
-        if item["$type"] == item_type and item["entityUrn"] == item_entity_urn:
+    """
+    Find included item by type and urn, `included` is list or IncludedIndex
+    """
+    if isinstance(included, IncludedIndex):
+        item = included.get(item_type, item_entity_urn)
+        if item is not None:
             return item
+    else:
+        for item in included:
+            if item["$type"] == item_type and item["entityUrn"] == item_entity_urn:
+                return item
 
     raise ProfileParsingError("item not found")
 
 
-def extracte_code_chunks(html: str) -> list:
-    soup = BeautifulSoup(html, "lxml")
-    code_chunks = soup.find_all("code")
-    return code_chunks
+def _included(response_data: dict, included_index: IncludedIndex = None):
+    if included_index is not None:
+        return included_index
+
+    return IncludedIndex.from_response(response_data)
 
 
-def parse_profile(response_data: dict) -> dict:
+def parse_profile(response_data: dict, included_index: IncludedIndex = None) -> dict:
     # TODO: need validate is somewhere used this fields,
     # they are were removed from parser
     # spider name?
@@ -44,8 +84,8 @@ def parse_profile(response_data: dict) -> dict:
     # tags
     # degreename
 
-    included = response_data["included"]
     try:
+        included = _included(response_data, included_index)
         item_entity_urn = response_data["data"]["data"]["identityDashProfilesByMemberIdentity"]["*elements"][0]
         profile_item = extract_included_item(
             item_entity_urn=item_entity_urn,
@@ -98,14 +138,15 @@ def parse_profile(response_data: dict) -> dict:
     return profile_data
 
 
-def parse_profile_from_source(html: str) -> dict:
+def parse_profile_from_source(html) -> dict:
+    """
+    Parse profile from profile page source (str or bytes)
+    """
     profile_item = None
-    code_chunks = extracte_code_chunks(html)
-    for code in code_chunks:
-        code_text = code.get_text()
-
+    code_chunks = iter_code_chunks(html, markers=("identityDashProfilesByMemberIdentity",))
+    for code_text in code_chunks:
         try:
-            chunk = json.loads(code_text)
+            chunk = loads(code_text)
             chunk_data = chunk["data"]
         except (JSONDecodeError, KeyError):
             logger.debug(f"Can't parse chunk: {code_text}")
@@ -204,7 +245,7 @@ def parse_profile_from_source(html: str) -> dict:
 #     return profile_data
 
 
-def parse_profile_cards(response_data) -> dict:
+def parse_profile_cards(response_data, included_index: IncludedIndex = None) -> dict:
     item_entity_urn = response_data["data"]["data"]["identityDashProfileCardsByDeferredCards"][
         "*elements"
     ][0]
@@ -213,7 +254,7 @@ def parse_profile_cards(response_data) -> dict:
     profile_item = extract_included_item(
         item_type="com.linkedin.voyager.dash.identity.profile.Profile",
         item_entity_urn=f"urn:li:fsd_profile:{item_entity_urn}",
-        included=response_data["included"],
+        included=_included(response_data, included_index),
     )
 
     picture = get_object_by_path(
@@ -230,7 +271,7 @@ def parse_profile_cards(response_data) -> dict:
     return profile_card
 
 
-def parse_profile_contacts(response_data) -> dict:
+def parse_profile_contacts(response_data, included_index: IncludedIndex = None) -> dict:
     contact_info = {
         "email_address": None,
         "phone_numbers": None,
@@ -244,7 +285,7 @@ def parse_profile_contacts(response_data) -> dict:
         item_entity_urn=response_data["data"]["data"]["identityDashProfilesByMemberIdentity"][
             "*elements"
         ][0],
-        included=response_data["included"],
+        included=_included(response_data, included_index),
     )
 
     if not profile_item:
@@ -270,6 +311,33 @@ def parse_profile_contacts(response_data) -> dict:
     return contact_info
 
 
+def parse_full_profile(
+    profile_data: dict, cards_data: dict = None, contacts_data: dict = None
+) -> dict:
+    """
+    Parse profile payload with its picture (`Linkedin.profile_cards` payload) and contact info
+    (`Linkedin.profile_contacts` payload, it can be the profile payload itself).
+    "included" of each payload is indexed once and passed to the parse functions.
+    """
+    indexes = {}
+
+    def included_index(response_data):
+        index = indexes.get(id(response_data))
+        if index is None:
+            index = indexes[id(response_data)] = IncludedIndex.from_response(response_data)
+        return index
+
+    profile = parse_profile(profile_data, included_index(profile_data))
+    if cards_data is not None:
+        profile.update(parse_profile_cards(cards_data, included_index(cards_data)))
+    if contacts_data is not None:
+        profile["contact_info"] = parse_profile_contacts(
+            contacts_data, included_index(contacts_data)
+        )
+
+    return profile
+
+
 def parse_messenger_messages(response_data: dict) -> list:
     """Extract limited fields from messenger messages response"""
     elements = response_data["data"]["messengerMessagesBySyncToken"]["elements"]
@@ -11,6 +11,98 @@ MAX_SEARCH_LEN_SALES_NAV = 2500
 
 # statistics TTL 1 month, stored in redis
 STATISTICS_TTL = int(os.getenv("LINKEDIN_API_STATISTICS_TTL", 2592000))
+# statistics are buffered and written to redis after N requests or T seconds, whichever comes first
+STATISTICS_FLUSH_SIZE = int(os.getenv("LINKEDIN_API_STATISTICS_FLUSH_SIZE", 25))
+STATISTICS_FLUSH_INTERVAL = float(os.getenv("LINKEDIN_API_STATISTICS_FLUSH_INTERVAL", 60))
+
+# sent invites per interval are cached in redis for 5 minutes
+INVITES_SENT_CACHE_TTL = int(os.getenv("LINKEDIN_API_INVITES_SENT_CACHE_TTL", 300))
+
+# profiles fetched in parallel per account when leads are enriched, requests are still paced
+PROFILE_ENRICHMENT_CONCURRENCY = int(os.getenv("LINKEDIN_API_PROFILE_ENRICHMENT_CONCURRENCY", 3))
+# profile html page isn't fetched before profile data, if one was fetched N seconds ago
+PROFILE_WARMUP_INTERVAL = float(os.getenv("LINKEDIN_API_PROFILE_WARMUP_INTERVAL", 120))
+
+# profiles cache: "redis" (shared by all processes), "lru" (in-process) or "none"
+PROFILE_CACHE_BACKEND = os.getenv("LINKEDIN_API_PROFILE_CACHE", "redis")
+PROFILE_CACHE_LRU_SIZE = int(os.getenv("LINKEDIN_API_PROFILE_CACHE_LRU_SIZE", 10000))
+# TTL per cached profile data group, network info (connection distance) changes more often
+PROFILE_CACHE_TTL = int(os.getenv("LINKEDIN_API_PROFILE_CACHE_TTL", 604800))
+PROFILE_CACHE_TTLS = {
+    "profile": PROFILE_CACHE_TTL,
+    "profile_data": PROFILE_CACHE_TTL,
+    "cards": PROFILE_CACHE_TTL,
+    "sn_profile": PROFILE_CACHE_TTL,
+    "network_info": int(os.getenv("LINKEDIN_API_PROFILE_CACHE_NETWORK_INFO_TTL", 3600)),
+}
+# not found (404) profiles are cached for 1 day
+PROFILE_CACHE_MISSING_TTL = int(os.getenv("LINKEDIN_API_PROFILE_CACHE_MISSING_TTL", 86400))
+
+# company universal name -> id cache: "redis", "sqlite" (local file) or "none"
+COMPANY_ID_CACHE_BACKEND = os.getenv("LINKEDIN_API_COMPANY_ID_CACHE", "redis")
+COMPANY_ID_CACHE_SQLITE_PATH = os.getenv(
+    "LINKEDIN_API_COMPANY_ID_CACHE_SQLITE_PATH", "linkedin_company_ids.sqlite3"
+)
+# company ids don't change, cached for 30 days, not found companies for 1 day
+COMPANY_ID_CACHE_TTL = int(os.getenv("LINKEDIN_API_COMPANY_ID_CACHE_TTL", 2592000))
+COMPANY_ID_CACHE_MISSING_TTL = int(os.getenv("LINKEDIN_API_COMPANY_ID_CACHE_MISSING_TTL", 86400))
+# company ids lookups of account are running in parallel in a long-lived pool,
+# at most N lookups are queued
+COMPANY_LOOKUP_CONCURRENCY = int(os.getenv("LINKEDIN_API_COMPANY_LOOKUP_CONCURRENCY", 5))
+COMPANY_LOOKUP_QUEUE_SIZE = int(os.getenv("LINKEDIN_API_COMPANY_LOOKUP_QUEUE_SIZE", 100))
+# company lookup requests are retried for N seconds, with N seconds request timeout
+# (LINKEDIN_API_SEARCH_TIMEOUT is the former name of the timeout)
+COMPANY_LOOKUP_MAX_RETRY_TIME = float(os.getenv("LINKEDIN_API_COMPANY_LOOKUP_MAX_RETRY_TIME", 30))
+COMPANY_LOOKUP_TIMEOUT = float(
+    os.getenv("LINKEDIN_API_COMPANY_LOOKUP_TIMEOUT", os.getenv("LINKEDIN_API_SEARCH_TIMEOUT", 20))
+)
+# lookup services of account records, unused for N seconds, are closed with their clients
+COMPANY_LOOKUP_MAX_IDLE = float(os.getenv("LINKEDIN_API_COMPANY_LOOKUP_MAX_IDLE", 300))
+
+# accounts calls are running in parallel in a shared pool, calls of one account one by one
+ACCOUNT_POOL_WORKERS = int(os.getenv("LINKEDIN_API_ACCOUNT_POOL_WORKERS", 32))
+
+# sessions are saved as JSON snapshots (utils.session_snapshot). Pickled api cookies and
+# headers of old sessions are loaded while stored sessions are migrated, client keeps their
+# JSON snapshots in `migrated_snapshot` to be saved. Unpickling stored data can run arbitrary
+# code: disable once sessions are migrated, the fallback is removed after 2027-01-31
+SESSION_SNAPSHOT_PICKLE_FALLBACK = os.getenv("LINKEDIN_API_SESSION_PICKLE_FALLBACK", "1") == "1"
+
+# live clients of accounts are reused by next tasks of the process: "memory" or "none".
+# Clients idle for N seconds are closed, at most N clients are cached
+SESSION_CACHE_BACKEND = os.getenv("LINKEDIN_API_SESSION_CACHE", "memory")
+SESSION_CACHE_MAX_IDLE = float(os.getenv("LINKEDIN_API_SESSION_CACHE_MAX_IDLE", 300))
+SESSION_CACHE_SIZE = int(os.getenv("LINKEDIN_API_SESSION_CACHE_SIZE", 256))
+
+# proxy pool (utils.proxy_pool): latency and errors EWMA weight of the last request, proxy is
+# unhealthy for N seconds after N consecutive network errors
+PROXY_POOL_EWMA_ALPHA = float(os.getenv("LINKEDIN_API_PROXY_POOL_EWMA_ALPHA", 0.3))
+PROXY_POOL_MAX_FAILURES = int(os.getenv("LINKEDIN_API_PROXY_POOL_MAX_FAILURES", 3))
+PROXY_POOL_UNHEALTHY_TTL = float(os.getenv("LINKEDIN_API_PROXY_POOL_UNHEALTHY_TTL", 300))
+# proxies are checked with HEAD request by health check, it doesn't prewarm accounts sessions
+PROXY_POOL_CHECK_URL = os.getenv("LINKEDIN_API_PROXY_POOL_CHECK_URL", "https://www.linkedin.com/")
+PROXY_POOL_CHECK_TIMEOUT = float(os.getenv("LINKEDIN_API_PROXY_POOL_CHECK_TIMEOUT", 10))
+
+# JSON decoding backend: "auto" (orjson if installed, otherwise stdlib), "orjson" or "json"
+JSON_BACKEND = os.getenv("LINKEDIN_API_JSON_BACKEND", "auto")
+
+# requests timings and sizes histograms: "memory" (per process), "redis" (process histograms
+# are also pushed to redis, to export them from all processes) or "none"
+REQUEST_METRICS_BACKEND = os.getenv("LINKEDIN_API_REQUEST_METRICS", "memory")
+# histograms are pushed to redis at most every N seconds and on Linkedin.close, kept for 1 day
+REQUEST_METRICS_PUSH_INTERVAL = float(os.getenv("LINKEDIN_API_REQUEST_METRICS_PUSH_INTERVAL", 60))
+REQUEST_METRICS_TTL = int(os.getenv("LINKEDIN_API_REQUEST_METRICS_TTL", 86400))
+# label metrics by account, each account adds its own series, so it's off by default
+REQUEST_METRICS_ACCOUNT_LABEL = os.getenv("LINKEDIN_API_REQUEST_METRICS_ACCOUNT_LABEL", "0") == "1"
+
+# daily requests limits (get_account_requests_limits) enforcement, when account quota is used:
+# "wait" (until quota is refilled), "reject" (raise QuotaExceeded), "reorder" (raise
+# QuotaExceeded, AccountPool runs other queued calls of the account first) or "none"
+QUOTA_POLICY = os.getenv("LINKEDIN_API_QUOTA_POLICY", "none")
+# quota buckets: "redis" (shared by all processes) or "local" (in-process)
+QUOTA_BACKEND = os.getenv("LINKEDIN_API_QUOTA_BACKEND", "redis")
+# with "wait" policy request is rejected, if quota isn't refilled in N seconds
+QUOTA_MAX_WAIT = float(os.getenv("LINKEDIN_API_QUOTA_MAX_WAIT", 600))
 
 OLD_ACCOUNT_MIN_CONNECTIONS = 5000
 
@@ -54,18 +146,13 @@ REQUESTS_TYPES = {
         "feed/updates",
         "feed/urlpreview",
         "feed/packageRecommendations",
-        "feed/updates",
         "feed/social",
-        "feed/urlpreview",
         "feed/likes",
-        "feed/social",
     ),
     "messaging": (
         "messaging/conversations",
         "messaging/badge",
-        "messaging/conversations",
         "messaging/stickerpacks",
-        "messaging/conversations",
         "voyagerMessagingGraphQL/graphql"
     ),
     "identity": (
@@ -74,7 +161,6 @@ REQUESTS_TYPES = {
         "me",
         "identity/ge",
         "identity/badge",
-        "identity/profiles",
         "identity/wvmpCards",
         "identity/panels",
         "sales-api/salesApiIdentity",
@@ -89,7 +175,6 @@ REQUESTS_TYPES = {
         "fileUploadToken",
         "pushRegistration",
         "takeovers",
-        "pushRegistration",
         "appUniverse",
         "lite/rum-track",
         "csp/sct",
@@ -113,6 +198,15 @@ REQUESTS_TYPES = {
     ),
 }
 
+# Endpoints matched by prefix, e.g. "in/john-doe" profile pages
+REQUESTS_TYPES_PREFIXES = (
+    ("in/", "identity"),
+    ("voyagerMessagingDashComposeOptions", "identity"),
+)
+
+# Requests to endpoints missing in REQUESTS_TYPES are counted under this type
+UNKNOWN_REQUEST_TYPE = "unknown"
+
 # Maximum number of requests per DAY
 # we use these multiples to calculate the requests limits
 # 1. New account (xxx*, xxx, xxx)
@@ -1,30 +1,81 @@
 import logging
 import re
-from urllib.parse import urlparse
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from os import environ
+from types import MappingProxyType
+from urllib.parse import urlsplit
 
-from salesloop_linkedin_api.settings import REQUESTS_TYPES
+from redis import ConnectionPool, RedisError, StrictRedis
+
+from salesloop_linkedin_api.settings import (
+    REQUESTS_TYPES,
+    REQUESTS_TYPES_PREFIXES,
+    STATISTICS_FLUSH_INTERVAL,
+    STATISTICS_FLUSH_SIZE,
+    STATISTICS_TTL,
+    UNKNOWN_REQUEST_TYPE,
+)
 
 logger = logging.getLogger()
 
+_redis_pool = None
+_redis_pool_lock = threading.Lock()
+
+
+def get_redis_connection():
+    """
+    Redis client using connection pool shared by all Linkedin instances of the process
+    """
+    global _redis_pool
+
+    if _redis_pool is None:
+        with _redis_pool_lock:
+            if _redis_pool is None:
+                redis_url = urlsplit(environ["BROKER_URL"])
+                redis_host, redis_port = redis_url.netloc.split(":")
+                _redis_pool = ConnectionPool(
+                    host=redis_host, port=int(redis_port), decode_responses=True, encoding="utf-8"
+                )
+
+    return StrictRedis(connection_pool=_redis_pool)
+
 
 class APIRequestType:
     """
     Type of API endpoint
     """
 
-    @classmethod
-    def get_url_endpoint(cls, url):
-        path = urlparse(url).path
-        if not path:
-            raise SyntaxError(f"Invalid url detected: {url}")
+    # Built once, endpoint -> request type, first type wins if endpoint is listed twice
+    ENDPOINTS = MappingProxyType(
+        {
+            endpoint: request_type
+            for request_type, endpoints in reversed(REQUESTS_TYPES.items())
+            for endpoint in endpoints
+        }
+    )
+    PREFIXES = REQUESTS_TYPES_PREFIXES
+    _API_PREFIX_RE = re.compile("^/voyager/api/")
 
-        path_parts = re.sub("^/voyager/api/", "", path).strip("/").split("/")
+    @classmethod
+    def get_path_endpoint(cls, path):
+        path_parts = cls._API_PREFIX_RE.sub("", path).strip("/").split("/")
 
         if len(path_parts) == 1:
             return path_parts[0]
         else:
             return f"{path_parts[0]}/{path_parts[1]}"
 
+    @classmethod
+    def get_url_endpoint(cls, url):
+        path = urlsplit(url).path
+        if not path:
+            raise SyntaxError(f"Invalid url detected: {url}")
+
+        return cls.get_path_endpoint(path)
+
     @classmethod
     def get_request_type(cls, url):
         """
@@ -35,16 +86,108 @@ class APIRequestType:
             url: LinkedIn url
 
         Returns:
-            endpoint string like "search/blended"
+            request type like "search", UNKNOWN_REQUEST_TYPE if endpoint is not known
         """
-        endpoint = cls.get_url_endpoint(url)
-        for request_type, request_tuple in REQUESTS_TYPES.items():
-            if endpoint in request_tuple:
-                return request_type
+        return cls._get_path_request_endpoint(urlsplit(url).path)[0]
 
-        # TODO: avoid hardcode here
-        if endpoint.startswith("in/") \
-            or endpoint.startswith("voyagerMessagingDashComposeOptions"):
-            return "identity"
+    @classmethod
+    def get_request_endpoint(cls, url):
+        """
+        Like `get_request_type`, with known endpoint of the url. Endpoints matched by prefix
+        are replaced with the prefix (no profile ids), unknown endpoints are UNKNOWN_REQUEST_TYPE,
+        so endpoints can be used as metrics labels.
 
-        raise Exception(f"Found unknown url/request type: {url}, endpoint: {endpoint}")
+        Returns:
+            (request type, endpoint)
+        """
+        return cls._get_path_request_endpoint(urlsplit(url).path)
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _get_path_request_endpoint(cls, path):
+        endpoint = cls.get_path_endpoint(path)
+
+        request_type = cls.ENDPOINTS.get(endpoint)
+        if request_type:
+            return request_type, endpoint
+
+        for prefix, request_type in cls.PREFIXES:
+            if endpoint.startswith(prefix):
+                return request_type, prefix
+
+        logger.warning(f"Found unknown request type, path: {path}, endpoint: {endpoint}")
+        return UNKNOWN_REQUEST_TYPE, UNKNOWN_REQUEST_TYPE
+
+
+class StatisticsWriter:
+    """
+    Buffers requests amount of one Linkedin session and writes it to redis hash.
+
+    Counters are flushed with one pipeline of HINCRBY calls after `flush_size` requests,
+    after `flush_interval` seconds or on `flush()` call (Linkedin.close).
+    """
+
+    def __init__(
+        self,
+        key,
+        rds,
+        flush_size=STATISTICS_FLUSH_SIZE,
+        flush_interval=STATISTICS_FLUSH_INTERVAL,
+        ttl=STATISTICS_TTL,
+    ):
+        self.key = key
+        self.rds = rds
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.ttl = ttl
+
+        self._counters = Counter()
+        self._pending = 0
+        self._start_timestamp = None
+        self._end_timestamp = None
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, request_type, timestamp):
+        with self._lock:
+            self._counters[request_type] += 1
+            self._pending += 1
+            if self._start_timestamp is None:
+                self._start_timestamp = timestamp
+            self._end_timestamp = timestamp
+
+            flush_needed = (
+                self._pending >= self.flush_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+
+        if flush_needed:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+
+            counters, self._counters = self._counters, Counter()
+            pending, self._pending = self._pending, 0
+            self._last_flush = time.monotonic()
+
+        # Write statistics to redis, key contains username and uuid of the task
+        # ln.api -> LinkedIn API statistics
+        try:
+            pipe = self.rds.pipeline(transaction=False)
+            for request_type, amount in counters.items():
+                pipe.hincrby(self.key, request_type, amount)
+
+            pipe.hsetnx(self.key, "start_timestamp", self._start_timestamp)
+            pipe.hset(self.key, "end_timestamp", self._end_timestamp)
+            pipe.expire(self.key, self.ttl)
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Can't write statistics to redis: {e}, keep them for next flush")
+            with self._lock:
+                self._counters.update(counters)
+                self._pending += pending
+        else:
+            logger.debug(f"Flushed {pending} requests statistics to {self.key}")
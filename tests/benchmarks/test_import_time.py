@@ -0,0 +1,59 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+# Loaded on first use only, Linkedin module import shouldn't pull them in
+LAZY_MODULES = ("bs4", "lxml", "flask", "pycountry", "requests_futures", "celery")
+# Linkedin module import took ~306 ms with eager imports, ~167 ms with lazy ones
+IMPORT_TIME_BUDGET_US = 250_000
+IMPORT_TIME_RE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def import_times(module: str) -> dict:
+    """
+    Returns:
+        top-level module name -> cumulative import time in microseconds, from `python -X importtime`
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_RE.match(line)
+        if match:
+            cumulative, _, name = match.groups()
+            top_level = name.split(".")[0]
+            times[top_level] = max(times.get(top_level, 0), int(cumulative))
+
+    return times
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["salesloop_linkedin_api.linkedin", "salesloop_linkedin_api.utils.generate_search_urls"],
+)
+def test_heavy_modules_are_lazy(module):
+    imported = import_times(module)
+
+    assert not [name for name in LAZY_MODULES if name in imported]
+
+
+def test_linkedin_import_time(benchmark):
+    times = benchmark.pedantic(import_times, args=("salesloop_linkedin_api.linkedin",), rounds=3)
+    benchmark.extra_info["import_time_us"] = times["salesloop_linkedin_api"]
+
+    # The fastest of few imports, a single import can be slowed down by other processes
+    fastest = min(
+        import_times("salesloop_linkedin_api.linkedin")["salesloop_linkedin_api"]
+        for _ in range(3)
+    )
+    assert fastest < IMPORT_TIME_BUDGET_US
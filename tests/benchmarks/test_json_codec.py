@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from salesloop_linkedin_api.utils.json_codec import BACKENDS
+
+from .test_parse_search_hits import generate_search_page
+
+
+def generate_profile_payload(positions_count: int) -> dict:
+    """
+    Synthetic profile response, with positions and skills included
+    """
+    profile_urn = "urn:li:fsd_profile:ACoAA00000001"
+    included = [
+        {
+            "$type": "com.linkedin.voyager.dash.identity.profile.Profile",
+            "entityUrn": profile_urn,
+            "publicIdentifier": "john-doe",
+            "firstName": "John",
+            "lastName": "Doe",
+            "headline": "Engineer at Company",
+        }
+    ]
+    for i in range(positions_count):
+        included.append(
+            {
+                "$type": "com.linkedin.voyager.dash.identity.profile.Position",
+                "entityUrn": f"urn:li:fsd_profilePosition:(ACoAA00000001,{i})",
+                "companyName": f"Company {i}",
+                "title": "Engineer",
+                "description": "Lorem ipsum dolor sit amet " * 10,
+                "dateRange": {"start": {"year": 2000 + i % 20, "month": 1}},
+            }
+        )
+
+    return {
+        "data": {
+            "data": {"identityDashProfilesByMemberIdentity": {"*elements": [profile_urn]}},
+        },
+        "included": included,
+    }
+
+
+def generate_messenger_payload(messages_count: int) -> dict:
+    """
+    Synthetic messenger messages response
+    """
+    return {
+        "data": {
+            "messengerMessagesBySyncToken": {
+                "elements": [
+                    {
+                        "entityUrn": f"urn:li:msg_message:(urn:li:fsd_profile:ACoAA1,{i})",
+                        "deliveredAt": 1700000000000 + i,
+                        "body": {"text": f"Hello, message number {i} " * 5, "attributes": []},
+                        "sender": {
+                            "entityUrn": "urn:li:msg_messagingParticipant:urn:li:fsd_profile:ACo1",
+                            "participantType": {
+                                "member": {
+                                    "firstName": {"text": "John"},
+                                    "lastName": {"text": "Doe"},
+                                }
+                            },
+                        },
+                    }
+                    for i in range(messages_count)
+                ],
+            }
+        }
+    }
+
+
+PAYLOADS = {
+    "search": lambda: generate_search_page(500)[0],
+    "profile": lambda: generate_profile_payload(200),
+    "messenger": lambda: generate_messenger_payload(500),
+}
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("payload", sorted(PAYLOADS))
+def test_json_backend(benchmark, backend, payload):
+    data = json.dumps(PAYLOADS[payload]()).encode()
+    assert benchmark(BACKENDS[backend], data) == json.loads(data)
@@ -0,0 +1,194 @@
+"""
+Linkedin client benchmarks, requests are served by ReplaySession, without network
+"""
+import logging
+
+import pytest
+
+from application.utlis_sales_search import generate_sales_search_url
+from salesloop_linkedin_api.linkedin import Linkedin
+from salesloop_linkedin_api.parser import IncludedIndex, parse_full_profile, parse_profile
+from salesloop_linkedin_api.utils import helpers
+from salesloop_linkedin_api.utils.generate_search_urls import generate_grapqhl_search_url
+from salesloop_linkedin_api.utils.replay import ReplaySession, fixture_entry
+
+from .test_json_codec import generate_profile_payload
+
+SALES_SEARCH_URL = (
+    "https://www.linkedin.com/sales/search/people?query=(recentSearchParam:(doLogHistory:true),"
+    "keywords:engineer)&sessionId=abc123"
+)
+SEARCH_URL = (
+    "https://www.linkedin.com/search/results/people/?keywords=software%20engineer"
+    "&geoUrn=%5B%22103644278%22%5D&network=%5B%22S%22%5D&origin=FACETED_SEARCH&page=3"
+)
+INBOX_USER_URN = "ACoAA0000000"
+# Proxy isn't used by ReplaySession
+PROXIES = {"https": "http://127.0.0.1:3128"}
+COOKIES = [
+    {"name": "JSESSIONID", "value": '"ajax:0000"', "domain": ".linkedin.com", "secure": True}
+]
+
+
+def generate_sales_search_page(hits_count: int) -> dict:
+    """
+    Synthetic sales navigator search page
+    """
+    return {
+        "paging": {"start": 0, "count": hits_count, "total": 2500},
+        "elements": [
+            {
+                "entityUrn": f"urn:li:fs_salesProfile:(ACwAA{i:08d},NAME_SEARCH,tok{i})",
+                "objectUrn": f"urn:li:member:{i}",
+                "firstName": "John",
+                "lastName": f"Doe {i}",
+                "fullName": f"John Doe {i}",
+                "degree": 2,
+                "premium": bool(i % 2),
+                "geoRegion": "Berlin, Germany",
+                "currentPositions": [
+                    {"current": True, "companyName": f"Company {i}", "title": "Engineer"}
+                ],
+                "profilePictureDisplayImage": {
+                    "rootUrl": "https://media.licdn.com/",
+                    "artifacts": [{"width": 400, "fileIdentifyingUrlPathSegment": f"{i}.jpg"}],
+                },
+            }
+            for i in range(hits_count)
+        ],
+    }
+
+
+def generate_conversations_payload(conversations_count: int) -> dict:
+    """
+    Synthetic messenger conversations response, with 2 messages per conversation
+    """
+    conversations = []
+    for i in range(conversations_count):
+        participant_urn = f"urn:li:msg_messagingParticipant:urn:li:fsd_profile:ACoAA{i:08d}"
+        conversations.append(
+            {
+                "entityUrn": f"urn:li:msg_conversation:(urn:li:fsd_profile:{INBOX_USER_URN},{i})",
+                "conversationParticipants": [
+                    {"entityUrn": f"urn:li:msg_messagingParticipant:{INBOX_USER_URN}"},
+                    {"entityUrn": participant_urn},
+                ],
+                "messages": {
+                    "elements": [
+                        {
+                            "entityUrn": f"urn:li:msg_message:({i},{j})",
+                            "deliveredAt": 1700000000000 + i * 1000 + j,
+                            "body": {"text": f"Hello, message number {j} " * 5},
+                            "sender": {"entityUrn": participant_urn},
+                            "_type": "com.linkedin.messenger.Message",
+                        }
+                        for j in range(2)
+                    ]
+                },
+            }
+        )
+
+    return {"data": {"messengerConversationsBySyncToken": {"elements": conversations}}}
+
+
+def add_member_relationship(profile_payload: dict) -> dict:
+    profile_urn = profile_payload["included"][0]["entityUrn"]
+    profile_payload["included"].append(
+        {
+            "$type": "com.linkedin.voyager.dash.relationships.MemberRelationship",
+            "entityUrn": f"urn:li:fsd_memberRelationship:{profile_urn.split(':')[-1]}",
+            "memberRelationship": {"*connection": None},
+        }
+    )
+    return profile_payload
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    monkeypatch.setattr(helpers.default_evade, "min_delay", 0)
+    monkeypatch.setattr(helpers.default_evade, "max_delay", 0)
+
+    logger = logging.getLogger("application")
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    yield
+    logger.setLevel(level)
+
+
+@pytest.fixture
+def api():
+    api = Linkedin(
+        "user@example.com",
+        None,
+        proxies=PROXIES,
+        cookies=COOKIES,
+        ua="Mozilla/5.0",
+        session=ReplaySession(),
+    )
+    api._defer = lambda delay: None
+    yield api
+    api.close()
+
+
+@pytest.mark.parametrize("hits_count", (25, 100))
+def test_get_leads_sales(benchmark, api, hits_count):
+    entries = [
+        fixture_entry("GET", SALES_SEARCH_URL, "<html><body>search</body></html>"),
+        fixture_entry(
+            "GET",
+            generate_sales_search_url(SALES_SEARCH_URL),
+            generate_sales_search_page(hits_count),
+        ),
+    ]
+
+    def setup():
+        api.client.session = ReplaySession(entries)
+        return (SALES_SEARCH_URL,), {"send_sn_requests": False}
+
+    leads, pagination, *_ = benchmark.pedantic(api.get_leads, setup=setup, rounds=10)
+
+    assert len(leads) == hits_count
+    assert leads[0]["entityUrn"] == "ACwAA00000000"
+    assert pagination["total"] == 2500
+
+
+@pytest.mark.parametrize("conversations_count", (20, 200))
+def test_conversations(benchmark, api, conversations_count):
+    api.client.session = ReplaySession(
+        [
+            fixture_entry(
+                "GET",
+                f"{api.client.API_BASE_URL}/voyagerMessagingGraphQL/graphql",
+                generate_conversations_payload(conversations_count),
+            )
+        ]
+    )
+
+    participants, messages = benchmark(api.conversations, INBOX_USER_URN)
+
+    assert len(participants) == len(messages) == conversations_count
+
+
+@pytest.mark.parametrize("positions_count", (10, 200))
+def test_parse_profile(benchmark, positions_count):
+    payload = add_member_relationship(generate_profile_payload(positions_count))
+
+    profile = benchmark(lambda: parse_profile(payload, IncludedIndex.from_response(payload)))
+
+    assert profile["publicIdentifier"] == "john-doe"
+
+
+@pytest.mark.parametrize("positions_count", (10, 200))
+def test_parse_full_profile(benchmark, positions_count):
+    payload = add_member_relationship(generate_profile_payload(positions_count))
+
+    # Profile and contact info are parsed from the same payload, it's indexed once
+    profile = benchmark(parse_full_profile, payload, contacts_data=payload)
+
+    assert profile["contact_info"]["email_address"] is None
+
+
+def test_generate_grapqhl_search_url(benchmark):
+    url = benchmark(generate_grapqhl_search_url, SEARCH_URL)
+
+    assert url.startswith("https://www.linkedin.com/voyager/api/graphql?")
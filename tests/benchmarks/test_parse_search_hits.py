@@ -0,0 +1,130 @@
+import logging
+import time
+import tracemalloc
+
+import pytest
+
+from salesloop_linkedin_api.utils import helpers
+from salesloop_linkedin_api.utils.helpers import parse_search_hits
+from salesloop_linkedin_api.utils.lead import lead_dict
+
+PAGE_SIZES = (10, 100, 500, 2500)
+
+
+def generate_search_page(hits_count: int) -> list:
+    """
+    Synthetic dash search page, users order is reversed to included order
+    """
+    included = []
+    results = []
+    for i in range(hits_count):
+        public_id = f"john-doe-{i}"
+        profile_urn = f"urn:li:fsd_profile:ACoAA{i:08d}"
+        entity_result_urn = f"urn:li:fsd_entityResultViewModel:({profile_urn},SEARCH_SRP,DEFAULT)"
+        results.append(entity_result_urn)
+
+        included.append(
+            {
+                "$type": "com.linkedin.voyager.dash.identity.profile.Profile",
+                "entityUrn": profile_urn,
+                "publicIdentifier": public_id,
+                "firstName": "John",
+                "lastName": f"Doe {i}",
+            }
+        )
+        included.append(
+            {
+                "$type": "com.linkedin.voyager.dash.search.EntityResultViewModel",
+                "entityUrn": entity_result_urn,
+                "navigationUrl": f"https://www.linkedin.com/in/{public_id}?miniProfileUrn={i}",
+                "title": {"text": f"John Doe {i}"},
+                "primarySubtitle": {"text": "Engineer at Company"},
+                "secondaryTitle": {"text": "2nd"},
+                "image": {
+                    "attributes": [
+                        {
+                            "detailDataUnion": {
+                                "nonEntityProfilePicture": {
+                                    "vectorImage": {
+                                        "rootUrl": "https://media.licdn.com/",
+                                        "artifacts": [
+                                            {
+                                                "width": 400,
+                                                "fileIdentifyingUrlPathSegment": f"{i}.jpg",
+                                            }
+                                        ],
+                                    }
+                                }
+                            }
+                        }
+                    ]
+                },
+            }
+        )
+
+    return [
+        {
+            "data": {
+                "$type": "com.linkedin.restli.common.CollectionResponse",
+                "paging": {"start": 0, "count": hits_count, "total": hits_count},
+                "elements": [{"*results": list(reversed(results))}],
+            },
+            "included": included,
+        }
+    ]
+
+
+@pytest.fixture(autouse=True)
+def quiet_logger():
+    logger = logging.getLogger("application")
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    yield
+    logger.setLevel(level)
+
+
+def parse_page(hits_count: int) -> float:
+    search_hits = generate_search_page(hits_count)
+    started = time.perf_counter()
+    users, *_ = parse_search_hits(search_hits)
+    elapsed = time.perf_counter() - started
+
+    assert len(users) == hits_count
+    assert users[0]["publicIdentifier"] == f"john-doe-{hits_count - 1}"
+    assert users[0]["picture"] == f"https://media.licdn.com/{hits_count - 1}.jpg"
+    return elapsed
+
+
+@pytest.mark.parametrize("hits_count", PAGE_SIZES)
+def test_parse_search_hits(benchmark, hits_count):
+    benchmark.pedantic(
+        parse_search_hits, setup=lambda: ((generate_search_page(hits_count),), {}), rounds=5
+    )
+
+
+def test_parse_search_hits_scales_linearly():
+    parse_page(PAGE_SIZES[0])  # warm up
+    small = min(parse_page(250) for _ in range(3))
+    large = min(parse_page(2500) for _ in range(3))
+
+    # 10x more hits, quadratic parsing would be ~100x slower
+    assert large / small < 30
+
+
+def traced_leads_size(search_hits) -> int:
+    tracemalloc.start()
+    try:
+        users, *_ = parse_search_hits(search_hits)
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_lead_records_memory(monkeypatch):
+    records_size = traced_leads_size(generate_search_page(2500))
+    # Leads parsed as plain dicts, like before Lead records
+    monkeypatch.setattr(helpers, "Lead", lead_dict)
+    dicts_size = traced_leads_size(generate_search_page(2500))
+
+    # Lead fields values (names, links) are the same, records save dicts overhead
+    assert records_size < dicts_size * 0.8
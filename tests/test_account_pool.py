@@ -0,0 +1,163 @@
+import threading
+import time
+
+import pytest
+
+from salesloop_linkedin_api.utils.account_pool import AccountPool
+from salesloop_linkedin_api.utils.pacing import EvadePolicy, PacingScheduler, RetryDeferred
+
+
+class FakeLinkedin:
+    def __init__(self, pacing_key, evade=EvadePolicy(0, 0)):
+        self.pacing_key = pacing_key
+        self.pacing = PacingScheduler()
+        self.evade = evade
+        self.defer_retries = False
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def get_profile(self, public_id, delay=0.1):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(delay)
+        self.calls.append(public_id)
+
+        with self._lock:
+            self.running -= 1
+
+        if public_id == "bad":
+            raise ValueError(public_id)
+
+        return f"{self.pacing_key}:{public_id}"
+
+    def reserve_request_slot(self):
+        return self.pacing.reserve(self.pacing_key, self.evade)
+
+    def close(self):
+        self.closed = True
+
+
+def test_accounts_calls_order_and_parallelism():
+    accounts = [FakeLinkedin(f"account-{i}") for i in range(4)]
+    pool = AccountPool(max_workers=8)
+    for account in accounts:
+        pool.add(account)
+
+    started = time.monotonic()
+    futures = [
+        pool.submit(account.pacing_key, "get_profile", f"profile-{i}")
+        for i in range(3)
+        for account in accounts
+    ]
+    results = [future.result() for future in futures]
+    elapsed = time.monotonic() - started
+
+    assert results[:4] == [f"account-{i}:profile-0" for i in range(4)]
+    for account in accounts:
+        # Calls of the account are running one by one, in submit order
+        assert account.calls == ["profile-0", "profile-1", "profile-2"]
+        assert account.max_running == 1
+
+    # Accounts are running in parallel: 3 calls per account, not 12 calls
+    assert elapsed < 0.6
+
+    pool.close()
+    assert all(account.closed for account in accounts)
+
+
+def test_map_and_errors():
+    with AccountPool(max_workers=2) as pool:
+        key = pool.add(FakeLinkedin("account"))
+        other_key = pool.add(FakeLinkedin("other"), key="other-key")
+
+        results = pool.map("get_profile", [key, other_key], ["john-doe", "jane-doe"], [0, 0])
+        assert list(results) == ["account:john-doe", "other:jane-doe"]
+
+        failed = pool.submit(key, "get_profile", "bad", delay=0)
+        after_failed = pool.submit(key, lambda api: api.calls[-1])
+        with pytest.raises(ValueError):
+            failed.result()
+        assert after_failed.result() == "bad"
+
+        with pytest.raises(KeyError):
+            pool.submit("unknown", "get_profile", "john-doe")
+
+        with pytest.raises(KeyError):
+            pool.add(FakeLinkedin("account"))
+
+
+def test_workers_do_not_wait_for_request_slot():
+    slow = FakeLinkedin("slow", evade=EvadePolicy(0.5, 0.5))
+    fast = FakeLinkedin("fast")
+    with AccountPool(max_workers=1) as pool:
+        pool.add(slow)
+        pool.add(fast)
+
+        slow_future = pool.submit("slow", "get_profile", "john-doe", delay=0)
+        fast_future = pool.submit("fast", "get_profile", "jane-doe", delay=0)
+
+        # The only worker isn't taken by slow account until its request slot
+        assert fast_future.result(timeout=0.3) == "fast:jane-doe"
+        assert not slow_future.done()
+        assert slow_future.result(timeout=1) == "slow:john-doe"
+
+
+def test_retry_is_deferred(monkeypatch):
+    monkeypatch.setattr("random.uniform", lambda a, b: 0.05)
+    account = FakeLinkedin("account")
+    errors = [ConnectionError("reset"), ConnectionError("reset")]
+
+    def flaky(api):
+        api.calls.append("flaky")
+        if errors:
+            raise RetryDeferred(errors.pop(), max_time=5)
+        return "done"
+
+    with AccountPool(max_workers=2) as pool:
+        key = pool.add(account)
+        assert account.defer_retries
+
+        futures = [pool.submit(key, flaky), pool.submit(key, "get_profile", "john-doe", delay=0)]
+        assert [future.result(timeout=2) for future in futures] == ["done", "account:john-doe"]
+        # Retries of the call run before other queued calls of the account
+        assert account.calls == ["flaky", "flaky", "flaky", "john-doe"]
+
+        def failing(api):
+            raise RetryDeferred(ConnectionError("reset"), max_time=0.1)
+
+        with pytest.raises(ConnectionError):
+            pool.submit(key, failing).result(timeout=2)
+
+        pool.remove(key)
+        assert not account.defer_retries
+
+
+def test_waiting_accounts_share_scheduler_thread():
+    accounts = [FakeLinkedin(f"account-{i}", evade=EvadePolicy(0.2, 0.2)) for i in range(20)]
+    with AccountPool(max_workers=2) as pool:
+        for account in accounts:
+            pool.add(account)
+            # The first request slot of the account is taken, its next call waits
+            account.pacing.reserve(account.pacing_key, account.evade)
+
+        threads = threading.active_count()
+        futures = [
+            pool.submit(account.pacing_key, "get_profile", "john-doe", 0) for account in accounts
+        ]
+        # Waiting accounts don't start a timer thread each
+        assert threading.active_count() == threads
+
+        removed = pool.remove("account-0")
+        assert futures[0].cancelled()
+        assert [future.result(timeout=2) for future in futures[1:]] == [
+            f"{account.pacing_key}:john-doe" for account in accounts[1:]
+        ]
+
+        # Removed waiting account is scheduled again, when it's added back
+        pool.add(removed)
+        assert pool.submit("account-0", "get_profile", "jane-doe", 0).result(timeout=2)
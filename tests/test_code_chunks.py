@@ -0,0 +1,25 @@
+import html
+import json
+
+from salesloop_linkedin_api.utils.helpers import iter_code_chunks
+
+SEARCH_CHUNK = {"data": {"$type": "com.linkedin.restli.common.CollectionResponse"}}
+PROFILE_CHUNK = {"included": [{"publicIdentifier": "john-doe", "headline": "R&D <lead> at O'Neil"}]}
+
+PAGE = (
+    "<html><body>"
+    f'<code style="display: none" id="bpr-guid-1">\n  {html.escape(json.dumps(SEARCH_CHUNK))}\n</code>'
+    '<code id="comment"><!--{"skipped": true}--></code>'
+    "<code></code>"
+    f'<code id="bpr-guid-2">{html.escape(json.dumps(PROFILE_CHUNK))}</code>'
+    "</body></html>"
+)
+
+
+def test_iter_code_chunks():
+    assert [json.loads(chunk) for chunk in iter_code_chunks(PAGE)] == [SEARCH_CHUNK, PROFILE_CHUNK]
+
+
+def test_iter_code_chunks_markers():
+    chunks = list(iter_code_chunks(PAGE.encode(), markers=("publicIdentifier",)))
+    assert [json.loads(chunk) for chunk in chunks] == [PROFILE_CHUNK]
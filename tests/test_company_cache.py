@@ -0,0 +1,45 @@
+from redis import ConnectionError as RedisConnectionError
+
+from salesloop_linkedin_api.utils.company_cache import CompanyIdCache, SQLiteCacheBackend
+from salesloop_linkedin_api.utils.profile_cache import LRUCacheBackend, RedisCacheBackend
+
+
+def test_company_id_cache():
+    cache = CompanyIdCache(LRUCacheBackend())
+    cache.set("Microsoft", 1035)
+    cache.set_missing("ghost-company")
+
+    assert cache.get("microsoft/") == "1035"
+    assert cache.is_missing(cache.get("ghost-company"))
+    assert cache.get("unknown") is None
+
+
+def test_sqlite_backend_ttl(tmp_path):
+    path = str(tmp_path / "company_ids.sqlite3")
+    backend = SQLiteCacheBackend(path)
+    backend.set("a", "1", ttl=60)
+    backend.set("expired", "2", ttl=-1)
+
+    assert backend.get("a") == "1"
+    assert backend.get("expired") is None
+
+    backend.close()
+    assert SQLiteCacheBackend(path).get("a") == "1"
+
+
+class DownRedis:
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            raise RedisConnectionError("Connection refused")
+
+        return command
+
+
+def test_company_id_cache_redis_errors():
+    cache = CompanyIdCache(RedisCacheBackend(DownRedis()))
+
+    # Company ids are looked up, when cache isn't available
+    cache.set("microsoft", 1035)
+    cache.set_missing("ghost-company")
+    cache.delete("microsoft")
+    assert cache.get("microsoft") is None
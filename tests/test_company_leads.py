@@ -0,0 +1,70 @@
+from salesloop_linkedin_api.utils.company_leads import (
+    get_country_code,
+    parse_leadfeeder_leads,
+    parse_visitorqueue_leads,
+)
+
+
+def leadfeeder_payload(leads_number):
+    return {
+        "data": [
+            {
+                "id": f"lead-{i}",
+                "attributes": {
+                    "name": f"Company {i}",
+                    "linkedin_url": f"https://www.linkedin.com/company/company-{i}" if i else None,
+                },
+                "relationships": {"location": {"data": {"type": "locations", "id": f"loc-{i}"}}},
+            }
+            for i in range(leads_number)
+        ],
+        "included": [
+            {
+                "type": "locations",
+                "id": f"loc-{i}",
+                "attributes": {"country_code": "DE", "country": "Germany", "city": f"City {i}"},
+            }
+            for i in range(leads_number)
+        ],
+    }
+
+
+def test_parse_leadfeeder_leads():
+    parsed_leads, skipped_leads = parse_leadfeeder_leads(leadfeeder_payload(5), 3)
+
+    assert skipped_leads == ["Company 0"]
+    assert list(parsed_leads) == ["company-1", "company-2", "company-3"]
+    assert parsed_leads["company-2"] == {
+        "id": "lead-2",
+        "name": "Company 2",
+        "company_id": None,
+        "country_code": "de",
+        "valid": False,
+        "country": "Germany",
+        "region": None,
+        "city": "City 2",
+    }
+    assert parse_leadfeeder_leads({"data": []}, 3) is None
+
+
+def test_parse_visitorqueue_leads():
+    leads = [
+        {
+            "id": 1,
+            "name": "Acme",
+            "country": "Germany",
+            "social_urls": ["https://twitter.com/acme", "https://linkedin.com/company/acme"],
+        },
+        {
+            "id": 2,
+            "name": "Nowhere",
+            "country": "Atlantis",
+            "social_urls": ["https://linkedin.com/company/nowhere"],
+        },
+    ]
+    parsed_leads, skipped_leads = parse_visitorqueue_leads(leads, 10)
+
+    assert skipped_leads == ["Nowhere"]
+    assert parsed_leads["acme"]["id"] == "1"
+    assert parsed_leads["acme"]["country_code"] == "de"
+    assert get_country_code("Germany") == "de" and get_country_code.cache_info().hits
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+from salesloop_linkedin_api.client import Client
+from salesloop_linkedin_api.utils.company_lookup import CompanyLookupRegistry
+from salesloop_linkedin_api.utils.session_cache import SessionCache
+from salesloop_linkedin_api.utils.session_snapshot import dump_cookies, dump_headers
+
+PROXIES = {"https": "http://127.0.0.1:3128"}
+COOKIES = [
+    {"name": "JSESSIONID", "value": '"ajax:123"', "domain": ".www.linkedin.com", "secure": True},
+    {"name": "li_at", "value": "AQEDA", "domain": ".linkedin.com", "secure": True},
+]
+
+
+def account_record(username, linkedin_login_id):
+    client = Client(cookies=COOKIES, ua="Mozilla/5.0")
+    record = SimpleNamespace(
+        username=username,
+        linkedin_login_id=linkedin_login_id,
+        api_proxies=PROXIES,
+        api_cookies=dump_cookies(client.session),
+        api_headers=dump_headers(client.session),
+    )
+    client.close()
+    return record
+
+
+def test_registry_evicts_idle_services(monkeypatch):
+    session_cache = SessionCache()
+    monkeypatch.setattr(
+        "salesloop_linkedin_api.linkedin.get_default_session_cache", lambda: session_cache
+    )
+    registry = CompanyLookupRegistry(max_idle=0, max_retry_time=30)
+    first, second = account_record("first", 1), account_record("second", 2)
+
+    service = registry.get(first)
+    assert registry.get(first) is service
+    assert service.linkedin_api.default_retry_max_time == 30
+
+    # Idle service of other account is closed, its client is returned to the session cache
+    other_service = registry.get(second)
+    assert len(registry) == 1
+    assert not session_cache._clients[session_cache.get_key(1, PROXIES)].in_use
+
+    registry.close()
+    assert len(registry) == 0
+    assert not session_cache._clients[session_cache.get_key(2, PROXIES)].in_use
+    assert other_service._executor._shutdown
+    session_cache.clear()
@@ -0,0 +1,47 @@
+from salesloop_linkedin_api.utils.helpers import get_navigation_url_public_id, index_entity_results
+
+ENTITY_RESULT_TYPE = "com.linkedin.voyager.dash.search.EntityResultViewModel"
+
+
+def entity_result(navigation_url):
+    return {"$type": ENTITY_RESULT_TYPE, "navigationUrl": navigation_url}
+
+
+def substring_matches(public_id, included):
+    """
+    Items matched to lead before entity results were indexed
+    """
+    return [
+        item
+        for item in included
+        if item.get("$type") == ENTITY_RESULT_TYPE
+        and item.get("navigationUrl")
+        and public_id in item.get("navigationUrl")
+    ]
+
+
+def test_index_matches_substring_scan():
+    public_ids = ["john-doe", "jane-doe-42a1b", "j%C3%BCrgen-m", "ACoAA123"]
+    included = [
+        entity_result(f"https://www.linkedin.com/in/{public_ids[0]}?miniProfileUrn=urn%3Ali%3A1"),
+        entity_result(f"https://www.linkedin.com/in/{public_ids[1]}/"),
+        {"$type": "com.linkedin.voyager.dash.identity.profile.Profile", "entityUrn": "urn:1"},
+        entity_result(f"https://www.linkedin.com/in/{public_ids[2]}"),
+        entity_result(f"https://www.linkedin.com/in/{public_ids[3]}?trk=search"),
+        # The same lead is matched to all its items, in included order
+        entity_result(f"https://www.linkedin.com/in/{public_ids[0]}/"),
+        entity_result(None),
+    ]
+    entity_results = index_entity_results(included)
+
+    for public_id in public_ids:
+        assert entity_results.get(public_id, []) == substring_matches(public_id, included)
+
+
+def test_public_id_prefix_is_not_matched():
+    included = [entity_result("https://www.linkedin.com/in/john-doe")]
+
+    # Substring scan matched "john" lead to "john-doe" item
+    assert substring_matches("john", included) == included
+    assert index_entity_results(included).get("john") is None
+    assert get_navigation_url_public_id("https://www.linkedin.com/in/john-doe/") == "john-doe"
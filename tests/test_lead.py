@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from salesloop_linkedin_api.utils.lead import LEAD_DEFAULTS, Lead, lead_dict
+
+
+def test_lead_dict_key_order():
+    lead = lead_dict(index=3, publicIdentifier="john-doe", entityUrn="ACoAA123")
+
+    # Keys order is the same as before defaults were shared by search parsers
+    assert list(lead) == ["index", *LEAD_DEFAULTS, "entityUrn"]
+    assert lead["index"] == 3 and lead["publicIdentifier"] == "john-doe"
+    assert lead["companyName"] is None and lead["extractEmailAddress"] is False
+
+
+def test_lead_dict_without_index():
+    lead = lead_dict(publicIdentifier="john-doe")
+
+    assert list(lead) == list(LEAD_DEFAULTS)
+    assert lead_dict() == LEAD_DEFAULTS and lead_dict() is not LEAD_DEFAULTS
+
+
+def test_lead_record_is_lead_dict():
+    lead = Lead(index=3, publicIdentifier="john-doe")
+    expected = lead_dict(index=3, publicIdentifier="john-doe")
+    assert lead == expected
+
+    for key, value in (("tags", ""), ("entityUrn", "ACoAA123"), ("custom", 1)):
+        lead[key] = value
+        expected[key] = value
+
+    del lead["companyName"]
+    del expected["companyName"]
+
+    assert lead.to_dict() == expected
+    assert list(lead) == list(expected) and len(lead) == len(expected)
+    assert lead.get("memberId") is None and "memberId" not in lead
+    assert lead.get("custom") == 1 and lead["extractEmailAddress"] is False
+    with pytest.raises(KeyError):
+        lead["companyName"]
+
+    assert json.loads(json.dumps(lead.copy())) == expected
+    assert not hasattr(lead, "__dict__")
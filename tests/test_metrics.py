@@ -0,0 +1,100 @@
+import random
+
+from salesloop_linkedin_api.linkedin import Linkedin
+from salesloop_linkedin_api.utils.json_codec import response_json
+from salesloop_linkedin_api.utils.metrics import Histogram, RequestMetrics
+from salesloop_linkedin_api.utils.replay import ReplaySession, fixture_entry
+
+ME_URL = "https://www.linkedin.com/voyager/api/me"
+LABELS = ("account", "GET", "identity", "me")
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def scan_iter(self, match):
+        return [key for key in self.data if key.startswith(match.rstrip("*"))]
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(unit=1e-6)
+    values = [random.uniform(0.001, 10) for _ in range(10000)]
+    for value in values:
+        histogram.record(value)
+
+    values.sort()
+    for q in (0.5, 0.9, 0.99):
+        expected = values[int(q * len(values)) - 1]
+        assert abs(histogram.quantile(q) - expected) / expected < 0.02
+
+    assert histogram.quantile(1) == max(values)
+    assert len(histogram.counts) < 1000
+
+
+def create_api(metrics, account="account"):
+    return Linkedin(
+        account,
+        None,
+        proxies={"https": "http://127.0.0.1:3128"},
+        cookies=[{"name": "JSESSIONID", "value": '"ajax:0"', "domain": "", "secure": True}],
+        ua="Mozilla/5.0",
+        session=ReplaySession([fixture_entry("GET", ME_URL, {"plainId": 1})]),
+        request_hooks=[metrics],
+    )
+
+
+def test_linkedin_request_metrics():
+    metrics = RequestMetrics(account_label=True)
+    api = create_api(metrics)
+    response_json(api._fetch("/me", evade=None))
+
+    for name in ("request_evade_seconds", "request_network_seconds", "response_parse_seconds"):
+        assert metrics.histogram(name, *LABELS).count == 1
+    assert metrics.histogram("response_bytes", *LABELS).sum == len('{"plainId": 1}')
+    assert metrics.counters[("requests_total", LABELS + ("200",))] == 1
+
+    text = metrics.prometheus_text()
+    assert "# TYPE linkedin_api_request_network_seconds summary" in text
+    assert (
+        'linkedin_api_requests_total{account="account",method="GET",request_type="identity",'
+        'endpoint="me",status="200"} 1'
+    ) in text
+
+
+def test_request_metrics_without_account_label():
+    metrics = RequestMetrics()
+    for account in ("account", "other-account"):
+        api = create_api(metrics, account)
+        response_json(api._fetch("/me", evade=None))
+
+    # Accounts share series, their number doesn't grow with accounts
+    assert len(metrics.histograms) == 4
+    assert metrics.histogram("request_network_seconds", *LABELS).count == 2
+    assert (
+        'linkedin_api_requests_total{method="GET",request_type="identity",'
+        'endpoint="me",status="200"} 2'
+    ) in metrics.prometheus_text()
+
+    previous = metrics.reset()
+    assert previous.histogram("request_network_seconds", *LABELS).count == 2
+    assert not metrics.histograms and not metrics.counters
+
+
+def test_metrics_redis_merge():
+    rds = FakeRedis()
+    for pid in range(2):
+        metrics = RequestMetrics(rds)
+        metrics.redis_key = f"ln.api.metrics:host:{pid}"
+        with metrics._lock:
+            metrics._record("request_network_seconds", (None,) + LABELS[1:], 0.5)
+        metrics.flush()
+
+    merged = RequestMetrics.from_redis(rds)
+    assert merged.histogram("request_network_seconds", *LABELS).count == 2
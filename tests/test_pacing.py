@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from salesloop_linkedin_api.utils.pacing import EvadePolicy, PacingScheduler
+
+
+def test_reserve_keeps_account_spacing():
+    scheduler = PacingScheduler()
+    policy = EvadePolicy(10, 10)
+
+    # First request is delayed too
+    assert 9.9 < scheduler.reserve("account", policy) <= 10
+    assert 19.9 < scheduler.reserve("account", policy) <= 20
+
+    # Other accounts are not affected
+    assert 9.9 < scheduler.reserve("other_account", policy) <= 10
+
+
+def test_spacing_is_measured_from_request_completion(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("salesloop_linkedin_api.utils.pacing.time.monotonic", lambda: clock[0])
+    scheduler = PacingScheduler()
+    policy = EvadePolicy(10, 10)
+
+    assert scheduler.reserve("account", policy) == 10
+    # Request is sent at its slot and takes 5 seconds
+    clock[0] = 115.0
+    scheduler.complete("account")
+
+    assert scheduler.reserve("account", policy) == 10
+
+
+def test_defer():
+    scheduler = PacingScheduler()
+    assert scheduler.next_allowed_in("account") == 0
+
+    scheduler.defer("account", 5)
+    assert 4.9 < scheduler.next_allowed_in("account") <= 5
+
+
+def test_async_wait_does_not_block_other_accounts():
+    scheduler = PacingScheduler()
+    policy = EvadePolicy(0.2, 0.2)
+
+    async def send_requests(account):
+        for _ in range(3):
+            await scheduler.async_wait(account, policy)
+
+    async def main():
+        await asyncio.gather(*(send_requests(account) for account in range(10)))
+
+    started = time.monotonic()
+    asyncio.run(main())
+
+    # 3 requests per account are 3 evade delays, accounts are paced concurrently
+    assert time.monotonic() - started < 1
@@ -0,0 +1,67 @@
+import asyncio
+
+from salesloop_linkedin_api.utils.pagination import (
+    AsyncPagedIterator,
+    PagedIterator,
+    PaginationCursor,
+)
+
+TOTAL = 23
+
+
+def fetch_page(start, count):
+    return list(range(start, min(start + count, TOTAL))), {"total": TOTAL}
+
+
+def test_paged_iterator_is_lazy():
+    pages = []
+
+    def fetch(start, count):
+        pages.append((start, count))
+        return fetch_page(start, count)
+
+    elements = PagedIterator(fetch, page_size=10)
+    assert not pages and elements.total is None
+
+    assert next(elements) == 0
+    assert pages == [(0, 10)] and elements.total == TOTAL
+
+    assert list(elements) == list(range(1, TOTAL))
+    assert pages == [(0, 10), (10, 10), (20, 10), (23, 10)]
+
+
+def test_paged_iterator_limit_and_offset():
+    assert list(PagedIterator(fetch_page, page_size=10, limit=15, offset=2)) == list(range(2, 17))
+
+
+def test_paged_iterator_transform():
+    elements = PagedIterator(fetch_page, page_size=10, transform=lambda i: i if i % 2 else None)
+    assert list(elements) == list(range(1, TOTAL, 2))
+
+
+def test_async_paged_iterator():
+    async def fetch(start, count):
+        return fetch_page(start, count)
+
+    async def collect():
+        return [element async for element in AsyncPagedIterator(fetch, page_size=10, limit=12)]
+
+    assert asyncio.run(collect()) == list(range(12))
+
+
+def test_pagination_cursor():
+    cursor = PaginationCursor()
+    page = [{"entityUrn": f"urn:{i}"} for i in range(5)]
+    cursor.advance(page, lambda element: element["entityUrn"])
+    cursor.yielded += len(page)
+
+    restored = PaginationCursor.from_json(cursor.to_json())
+    assert restored == PaginationCursor(start=5, last_entity="urn:4", yielded=5)
+
+    # List shifted by 2 new elements, already seen elements are skipped
+    shifted_page = [{"entityUrn": f"urn:{i}"} for i in range(3, 8)]
+    assert restored.new_elements(shifted_page, lambda element: element["entityUrn"]) == [
+        {"entityUrn": "urn:5"},
+        {"entityUrn": "urn:6"},
+        {"entityUrn": "urn:7"},
+    ]
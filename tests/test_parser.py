@@ -0,0 +1,83 @@
+import pytest
+
+from salesloop_linkedin_api.parser import (
+    IncludedIndex,
+    ProfileParsingError,
+    extract_included_item,
+    parse_full_profile,
+)
+
+PROFILE_TYPE = "com.linkedin.voyager.dash.identity.profile.Profile"
+PROFILE_URN = "urn:li:fsd_profile:ACoAA123"
+
+
+def profile_payload():
+    return {
+        "data": {"data": {"identityDashProfilesByMemberIdentity": {"*elements": [PROFILE_URN]}}},
+        "included": [
+            {
+                "$type": PROFILE_TYPE,
+                "entityUrn": PROFILE_URN,
+                "publicIdentifier": "john-doe",
+                "firstName": "John",
+                "lastName": "Doe",
+                "headline": "Engineer",
+                "emailAddress": {"emailAddress": "john@doe.com"},
+                "phoneNumbers": [{"phoneNumber": {"number": "+100"}}],
+            },
+            {
+                "$type": "com.linkedin.voyager.dash.relationships.MemberRelationship",
+                "entityUrn": "urn:li:fsd_memberRelationship:ACoAA123",
+                "memberRelationship": {"*connection": "urn:li:fsd_connection:ACoAA123"},
+            },
+            {"$type": "com.linkedin.voyager.dash.common.Geo", "entityUrn": "urn:li:fsd_geo:1"},
+        ],
+    }
+
+
+def cards_payload():
+    return {
+        "data": {
+            "data": {"identityDashProfileCardsByDeferredCards": {"*elements": [PROFILE_URN]}}
+        },
+        "included": [{"$type": PROFILE_TYPE, "entityUrn": PROFILE_URN}],
+    }
+
+
+def test_included_index_matches_linear_scan():
+    included = profile_payload()["included"]
+    # Duplicated item, first one is found like with linear scan
+    included.append({**included[0], "firstName": "Duplicate"})
+    index = IncludedIndex(included)
+
+    for item in included:
+        assert extract_included_item(item["$type"], item["entityUrn"], index) is (
+            extract_included_item(item["$type"], item["entityUrn"], included)
+        )
+
+    assert index.get(PROFILE_TYPE, PROFILE_URN)["firstName"] == "John"
+    assert len(index.of_type(PROFILE_TYPE)) == 2
+    assert index.of_type("unknown") == []
+    with pytest.raises(ProfileParsingError):
+        extract_included_item(PROFILE_TYPE, "urn:li:fsd_profile:unknown", index)
+
+
+def test_parse_full_profile_indexes_payloads_once(monkeypatch):
+    indexed = []
+    from_response = IncludedIndex.from_response.__func__
+
+    def count_from_response(cls, response_data):
+        indexed.append(id(response_data))
+        return from_response(cls, response_data)
+
+    monkeypatch.setattr(IncludedIndex, "from_response", classmethod(count_from_response))
+    payload = profile_payload()
+
+    profile = parse_full_profile(payload, cards_payload(), contacts_data=payload)
+
+    assert len(indexed) == 2
+    assert profile["publicIdentifier"] == "john-doe"
+    assert profile["connection"] == "urn:li:fsd_connection:ACoAA123"
+    assert profile["profilePicture"] is None
+    assert profile["contact_info"]["email_address"] == "john@doe.com"
+    assert profile["contact_info"]["phone_numbers"] == ["+100"]
@@ -0,0 +1,45 @@
+from salesloop_linkedin_api.utils.profile_cache import LRUCacheBackend, ProfileCache
+
+
+def test_profile_cache_keys():
+    cache = ProfileCache(LRUCacheBackend())
+    record = {"publicIdentifier": "john-doe", "firstName": "John"}
+    cache.set("profile_data", record, public_id="John-Doe", urn="urn:li:fsd_profile:ACoAA123")
+
+    assert cache.get("profile_data", public_id="john-doe") == record
+    assert cache.get("profile_data", urn="ACoAA123") == record
+    assert cache.get("cards", urn="ACoAA123") is None
+
+
+def test_profile_cache_viewer_groups():
+    cache = ProfileCache(LRUCacheBackend())
+    network_info = {"distance": "DISTANCE_1"}
+    cache.set("network_info", network_info, public_id="john-doe", viewer="account-1")
+    cache.set("cards", {"included": []}, urn="ACoAA123")
+
+    assert cache.get("network_info", public_id="john-doe", viewer="account-1") == network_info
+    assert cache.get("network_info", public_id="john-doe", viewer="account-2") is None
+    assert cache.get("network_info", public_id="john-doe") is None
+    # Viewer-relative records aren't cached without viewer
+    assert cache.get("cards", urn="ACoAA123") is None
+
+
+def test_profile_cache_missing():
+    cache = ProfileCache(LRUCacheBackend())
+    cache.set_missing("profile", public_id="ghost", viewer="account")
+
+    assert cache.is_missing(cache.get("profile", public_id="ghost", viewer="account"))
+
+
+def test_lru_backend_eviction_and_ttl():
+    backend = LRUCacheBackend(maxsize=2)
+    backend.set("a", "1", ttl=60)
+    backend.set("b", "2", ttl=60)
+    backend.get("a")
+    backend.set("c", "3", ttl=60)
+
+    assert backend.get("a") == "1"
+    assert backend.get("b") is None
+
+    backend.set("expired", "4", ttl=-1)
+    assert backend.get("expired") is None
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+from curl_cffi.requests.exceptions import RequestsError
+
+from salesloop_linkedin_api.linkedin import Linkedin
+from salesloop_linkedin_api.utils.proxy_pool import NoHealthyProxy, ProxyPool
+from salesloop_linkedin_api.utils.replay import ReplaySession, fixture_entry
+
+PROXY_A = {"https": "http://10.0.0.1:3128"}
+PROXY_B = {"https": "http://10.0.0.2:3128"}
+PROXY_C = {"https": "http://10.0.0.3:3128"}
+COOKIES = [
+    {"name": "JSESSIONID", "value": '"ajax:0000"', "domain": ".linkedin.com", "secure": True}
+]
+
+
+class DeadProxySession(ReplaySession):
+    """
+    Requests sent with dead proxies fail with connection error
+    """
+
+    def __init__(self, entries, dead_proxies):
+        super().__init__(entries)
+        self.dead_proxies = dead_proxies
+        self.proxies = None
+
+    def get(self, url, **kwargs):
+        if self.proxies in self.dead_proxies:
+            raise RequestsError("Failed to connect to proxy")
+        return super().get(url, **kwargs)
+
+
+def test_sticky_balanced_assignment():
+    pool = ProxyPool([PROXY_A, PROXY_B, PROXY_C])
+    pool.report_success(PROXY_A, 0.5)
+    pool.report_success(PROXY_B, 0.1)
+    pool.report_success(PROXY_C, 0.2)
+
+    assert [pool.assign(account) for account in range(4)] == [PROXY_B, PROXY_C, PROXY_A, PROXY_B]
+    assert pool.assign(2) == PROXY_A
+
+    pool.unassign(0)
+    assert pool.stats()[PROXY_B["https"]]["accounts"] == 1
+
+
+def test_stored_proxy_is_preferred():
+    pool = ProxyPool([PROXY_A, PROXY_B])
+    pool.assign("other")
+
+    assert pool.assign("account", preferred=PROXY_A) == PROXY_A
+    # Assigned proxy is kept, unknown stored proxy is ignored
+    assert pool.assign("account", preferred=PROXY_B) == PROXY_A
+    assert pool.assign("new", preferred={"https": "http://10.0.0.9:3128"}) == PROXY_B
+
+    for _ in range(pool.max_failures):
+        pool.report_error(PROXY_B)
+    assert pool.assign("unhealthy", preferred=PROXY_B) == PROXY_A
+
+
+def test_unhealthy_proxy(monkeypatch):
+    pool = ProxyPool([PROXY_A, PROXY_B], max_failures=3, unhealthy_ttl=60)
+    assert pool.assign("account") == PROXY_A
+
+    assert not pool.report_error(PROXY_A)
+    pool.report_success(PROXY_A, 0.1)
+    assert not pool.report_error(PROXY_A) and not pool.report_error(PROXY_A)
+    assert pool.report_error(PROXY_A)
+
+    assert not pool.is_healthy(PROXY_A)
+    assert pool.assign("account") == PROXY_B
+    assert 0 < pool.stats()[PROXY_A["https"]]["error_rate"] < 1
+
+    for _ in range(3):
+        pool.report_error(PROXY_B)
+    with pytest.raises(NoHealthyProxy):
+        pool.assign("account")
+
+    # Proxy is tried again after unhealthy TTL, one error marks it unhealthy again
+    clock = time.monotonic() + 61
+    monkeypatch.setattr("salesloop_linkedin_api.utils.proxy_pool.time.monotonic", lambda: clock)
+    assert pool.is_healthy(PROXY_A)
+    assert pool.report_error(PROXY_A)
+
+
+def test_linkedin_switches_dead_proxy(monkeypatch):
+    # Backoff waits between retries are skipped
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+
+    pool = ProxyPool([PROXY_A, PROXY_B], max_failures=2)
+    pool.report_success(PROXY_B, 1)
+    session = DeadProxySession(
+        [fixture_entry("GET", "https://www.linkedin.com/voyager/api/me", {"plainId": 1})],
+        dead_proxies=[PROXY_A],
+    )
+    api = Linkedin(
+        "john.doe@example.com",
+        None,
+        proxy_pool=pool,
+        session=session,
+        cookies=COOKIES,
+        ua="Mozilla/5.0",
+    )
+    session.proxies = api.proxies
+    assert api.proxies == PROXY_A
+
+    response = api._fetch("/me", evade=None)
+
+    assert response.json() == {"plainId": 1}
+    assert api.proxies == PROXY_B and session.proxies == PROXY_B
+    assert not pool.is_healthy(PROXY_A)
+    assert pool.assign(api.pacing_key) == PROXY_B
+    api.close()
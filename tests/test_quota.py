@@ -0,0 +1,194 @@
+import asyncio
+import time
+
+import pytest
+from curl_cffi.requests.exceptions import RequestsError
+
+from salesloop_linkedin_api.linkedin import Linkedin
+from salesloop_linkedin_api.settings import get_account_requests_limits
+from salesloop_linkedin_api.utils.account_pool import AccountPool
+from salesloop_linkedin_api.utils.pacing import EvadePolicy, PacingScheduler, RetryDeferred
+from salesloop_linkedin_api.utils.quota import (
+    QUOTA_PERIOD,
+    LocalTokenBuckets,
+    QuotaEngine,
+    QuotaExceeded,
+)
+from salesloop_linkedin_api.utils.replay import ReplaySession, fixture_entry
+
+API_URL = "https://www.linkedin.com/voyager/api"
+COOKIES = [
+    {"name": "JSESSIONID", "value": '"ajax:0000"', "domain": ".linkedin.com", "secure": True}
+]
+
+
+def drain(quota, account, request_type):
+    for _ in range(quota.get_account_limits(account)[request_type]):
+        quota.acquire(account, request_type)
+
+
+def test_reject_when_daily_limit_is_used():
+    quota = QuotaEngine(LocalTokenBuckets(), policy="reject")
+    drain(quota, "account", "feed")
+
+    with pytest.raises(QuotaExceeded) as e:
+        quota.acquire("account", "feed")
+
+    # One request is refilled in 1 / daily limit of the day
+    limit = get_account_requests_limits(0, False)["feed"]
+    assert 0 < e.value.retry_after <= QUOTA_PERIOD / limit
+    assert 0 < quota.available_in("account", "feed") <= QUOTA_PERIOD / limit
+
+    # Other request types and accounts have own buckets
+    quota.acquire("account", "search")
+    quota.acquire("other_account", "feed")
+
+
+def test_wait_for_refill():
+    buckets = LocalTokenBuckets()
+    quota = QuotaEngine(buckets, policy="wait", max_wait=1)
+    quota._limits["account"] = {"feed": QUOTA_PERIOD * 20}  # 20 requests per second
+
+    buckets._buckets["account:feed"] = (0, time.time())
+    started = time.monotonic()
+    asyncio.run(quota.async_acquire("account", "feed"))
+    assert 0.03 < time.monotonic() - started < 1
+
+    quota.max_wait = 0
+    buckets._buckets["account:feed"] = (0, time.time())
+    with pytest.raises(QuotaExceeded):
+        quota.acquire("account", "feed")
+
+
+def test_account_limits_are_cached():
+    quota = QuotaEngine(LocalTokenBuckets())
+    assert quota.get_account_limits("account") == get_account_requests_limits(0, False)
+
+    limits = quota.set_account_limits("account", 10000, True)
+    assert quota.get_account_limits("account") is limits
+
+    # Request types without limits aren't limited
+    assert quota.available_in("account", "unknown") == 0
+
+
+def create_api(quota, entries):
+    return Linkedin(
+        "john.doe@example.com",
+        None,
+        proxies={"https": "http://10.0.0.1:3128"},
+        session=ReplaySession(entries),
+        cookies=COOKIES,
+        ua="Mozilla/5.0",
+        quota=quota,
+    )
+
+
+def test_token_is_taken_on_each_attempt(monkeypatch):
+    # Backoff waits between retries and evade delays are skipped
+    monkeypatch.setattr("time.sleep", lambda seconds: None)
+    monkeypatch.setattr(EvadePolicy, "delay", lambda self: 0)
+    buckets = LocalTokenBuckets()
+    quota = QuotaEngine(buckets, policy="reject")
+    api = create_api(quota, [fixture_entry("GET", f"{API_URL}/me", {"plainId": 1})])
+    quota._limits[api.pacing_key] = {"identity": 10}
+
+    # First attempt fails with network error
+    replay = api.client.session.get
+    errors = [RequestsError("Connection reset")]
+
+    def get(url, **kwargs):
+        if errors:
+            raise errors.pop()
+        return replay(url, **kwargs)
+
+    api.client.session.get = get
+
+    assert api.get_user_profile() == {"plainId": 1}
+    tokens, _ = buckets._buckets[f"{api.pacing_key}:identity"]
+    assert 8 <= tokens < 8.1
+    api.close()
+
+
+def test_retry_is_deferred_to_caller(monkeypatch):
+    monkeypatch.setattr(EvadePolicy, "delay", lambda self: 0)
+    quota = QuotaEngine(LocalTokenBuckets(), policy="reject")
+    api = create_api(quota, [fixture_entry("GET", f"{API_URL}/me", {"plainId": 1})])
+    api.defer_retries = True
+    replay = api.client.session.get
+    errors = [RequestsError("Connection reset")]
+
+    def get(url, **kwargs):
+        if errors:
+            raise errors.pop()
+        return replay(url, **kwargs)
+
+    api.client.session.get = get
+
+    with pytest.raises(RetryDeferred) as e:
+        api.get_user_profile()
+    assert isinstance(e.value.error, RequestsError)
+    assert e.value.max_time > 0
+
+    # Reserved slot isn't waited for again by the request
+    api.pacing = PacingScheduler()
+    monkeypatch.setattr(EvadePolicy, "delay", lambda self: 60)
+    assert api.reserve_request_slot() >= 60
+    started = time.monotonic()
+    assert api.get_user_profile() == {"plainId": 1}
+    assert time.monotonic() - started < 1
+    api.close()
+
+
+def test_limits_are_set_from_account_data(monkeypatch):
+    monkeypatch.setattr(EvadePolicy, "delay", lambda self: 0)
+    quota = QuotaEngine(LocalTokenBuckets())
+    api = create_api(
+        quota,
+        [
+            fixture_entry(
+                "GET",
+                f"{API_URL}/relationships/connectionsSummary/",
+                {"data": {"numConnections": 6000}},
+            )
+        ],
+    )
+    api._update_requests_limits(is_premium=True)
+    assert api.pacing_key not in quota._limits
+
+    api.get_connections_summary()
+    assert quota.get_account_limits(api.pacing_key) == get_account_requests_limits(6000, True)
+    api.close()
+
+
+class QuotaAccount:
+    pacing_key = "account"
+
+    def __init__(self):
+        self.calls = []
+        self.quota_refilled_at = time.monotonic() + 0.2
+
+    def reserve_request_slot(self):
+        return 0
+
+    def search(self, query):
+        self.calls.append(query)
+        if query == "search" and time.monotonic() < self.quota_refilled_at:
+            raise QuotaExceeded(self.pacing_key, "search", 0.2)
+
+        return query
+
+
+def test_account_pool_reorders_calls_on_quota():
+    account = QuotaAccount()
+    with AccountPool(max_workers=2, reorder_on_quota=True) as pool:
+        key = pool.add(account)
+        futures = [pool.submit(key, "search", query) for query in ("search", "feed", "messages")]
+
+        assert [future.result(timeout=5) for future in futures] == ["search", "feed", "messages"]
+        # Call of exceeded quota is moved behind other calls, until quota is refilled
+        assert account.calls == ["search", "feed", "messages", "search"]
+
+    with AccountPool(max_workers=1) as pool:
+        key = pool.add(QuotaAccount())
+        with pytest.raises(QuotaExceeded):
+            pool.submit(key, "search", "search").result(timeout=5)
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+from curl_cffi.requests.exceptions import RequestsError
+
+from salesloop_linkedin_api.utils.replay import (
+    SCRUBBED,
+    RecordingSession,
+    ReplayMissError,
+    ReplayResponse,
+    ReplaySession,
+    fixture_entry,
+)
+
+PROFILE_URL = "https://www.linkedin.com/voyager/api/identity/profiles/john-doe"
+
+
+class LiveSession:
+    """
+    Live session stand-in, returns the same response for each request
+    """
+
+    def __init__(self, response):
+        self.response = response
+        self.headers = {"csrf-token": "ajax:123456"}
+        self.cookies = ReplaySession().cookies
+        self.cookies.set("li_at", "AQEDAsecret", domain=".linkedin.com")
+
+    def get(self, url, **kwargs):
+        return self.response
+
+    def post(self, url, **kwargs):
+        return self.response
+
+
+def test_record_scrubs_and_replays(tmp_path):
+    body = {
+        "publicIdentifier": "john-doe",
+        "emailAddress": "john@doe.com",
+        "firstName": "John",
+        "headline": "Engineer at Jane Owner Inc",
+        "phoneNumbers": [{"phoneNumber": {"number": "+100"}, "type": "MOBILE"}],
+        "about": "Write me to john@doe.com, token AQEDAsecret",
+        "owner": "Jane Owner",
+    }
+    live = LiveSession(
+        ReplayResponse(
+            PROFILE_URL,
+            content=json.dumps(body).encode(),
+            headers={"content-type": "application/json", "set-cookie": "li_at=AQEDAsecret"},
+        )
+    )
+    recording = RecordingSession(live, replacements={"Jane Owner": "Account Owner"})
+    recording.get(PROFILE_URL, params={"b": 2, "a": 1})
+    path = tmp_path / "profile.json"
+    recording.save(path)
+
+    fixtures = path.read_text()
+    assert "AQEDAsecret" not in fixtures
+    assert "john@doe.com" not in fixtures
+    assert "Engineer" not in fixtures
+    assert "set-cookie" not in fixtures
+
+    session = ReplaySession.load(path)
+    response = session.get(PROFILE_URL, params={"a": 1, "b": 2})
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {
+        "publicIdentifier": "john-doe",
+        "emailAddress": SCRUBBED,
+        "firstName": SCRUBBED,
+        "headline": SCRUBBED,
+        # Structure of personal data is kept
+        "phoneNumbers": [{"phoneNumber": {"number": SCRUBBED}, "type": SCRUBBED}],
+        "about": f"Write me to user@example.com, token {SCRUBBED}",
+        "owner": "Account Owner",
+    }
+
+
+def test_replay_order_and_misses():
+    session = ReplaySession(
+        [
+            fixture_entry("GET", PROFILE_URL, {"page": 1}),
+            fixture_entry("GET", PROFILE_URL, {"page": 2}),
+            fixture_entry("POST", PROFILE_URL, "", status_code=429),
+        ]
+    )
+
+    # Query params don't matter, if there's no response for exact url
+    assert session.get(PROFILE_URL + "?start=10").json() == {"page": 1}
+    assert session.get(PROFILE_URL).json() == {"page": 2}
+    assert session.get(PROFILE_URL).json() == {"page": 2}
+
+    with pytest.raises(RequestsError):
+        session.post(PROFILE_URL).raise_for_status()
+
+    with pytest.raises(ReplayMissError):
+        session.get("https://www.linkedin.com/voyager/api/me")
+
+    assert len(session.requests) == 5
@@ -0,0 +1,257 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from redis import ConnectionError as RedisConnectionError
+
+from salesloop_linkedin_api.async_linkedin import AsyncLinkedin
+from salesloop_linkedin_api.linkedin import Linkedin
+from salesloop_linkedin_api.utils.company_cache import CompanyIdCache
+from salesloop_linkedin_api.utils.pacing import EvadePolicy
+from salesloop_linkedin_api.utils.profile_cache import (
+    LRUCacheBackend,
+    ProfileCache,
+    RedisCacheBackend,
+)
+from salesloop_linkedin_api.utils.replay import AsyncReplaySession, ReplaySession, fixture_entry
+from salesloop_linkedin_api.utils.request_flow import (
+    Request,
+    async_iter_flow,
+    async_run_flow,
+    iter_flow,
+    run_flow,
+)
+
+PROXIES = {"https": "http://10.0.0.1:3128"}
+COOKIES = [
+    {"name": "JSESSIONID", "value": '"ajax:0000"', "domain": ".linkedin.com", "secure": True}
+]
+API_URL = "https://www.linkedin.com/voyager/api"
+COMPANY_PARAMS = {
+    "decorationId": "com.linkedin.voyager.deco.organization.web.WebFullCompanyMain-12",
+    "q": "universalName",
+}
+
+
+def fixtures():
+    return [
+        fixture_entry("GET", f"{API_URL}/me", {"plainId": 1}),
+        fixture_entry(
+            "GET",
+            f"{API_URL}/organization/companies",
+            {"elements": [{"entityUrn": "urn:li:fs_normalized_company:1035"}]},
+            params={**COMPANY_PARAMS, "universalName": "microsoft"},
+        ),
+        fixture_entry(
+            "GET",
+            f"{API_URL}/organization/companies",
+            {"status": 404, "message": "Not found"},
+            status_code=404,
+            params={**COMPANY_PARAMS, "universalName": "missing"},
+        ),
+    ]
+
+
+def create_api(api_class, session):
+    return api_class(
+        "john.doe@example.com",
+        None,
+        proxies=PROXIES,
+        session=session,
+        company_id_cache=CompanyIdCache(LRUCacheBackend()),
+        cookies=COOKIES,
+        ua="Mozilla/5.0",
+    )
+
+
+def test_linkedin_and_async_linkedin_share_flows(monkeypatch):
+    # Evade delays are skipped
+    monkeypatch.setattr(EvadePolicy, "delay", lambda self: 0)
+    api = create_api(Linkedin, ReplaySession(fixtures()))
+    sync_results = (
+        api.get_user_profile(),
+        api.get_company_id("microsoft", use_cache=False, evade=None),
+        api.get_company_id("missing", use_cache=False, evade=None),
+    )
+    api.close()
+
+    async def main():
+        async with create_api(AsyncLinkedin, AsyncReplaySession(fixtures())) as api:
+            return (
+                await api.get_user_profile(),
+                await api.get_company_id("microsoft", use_cache=False, evade=None),
+                await api.get_company_id("missing", use_cache=False, evade=None),
+            )
+
+    assert sync_results == asyncio.run(main()) == ({"plainId": 1}, "1035", None)
+
+
+def test_only_not_found_company_is_cached(monkeypatch):
+    monkeypatch.setattr(EvadePolicy, "delay", lambda self: 0)
+    throttled = fixture_entry(
+        "GET",
+        f"{API_URL}/organization/companies",
+        {"status": 429, "message": "Too many requests"},
+        params={**COMPANY_PARAMS, "universalName": "throttled"},
+    )
+    api = create_api(Linkedin, ReplaySession([*fixtures(), throttled]))
+
+    assert api.get_company_id("throttled", evade=None) is None
+    assert api.get_company_id("missing", evade=None) is None
+    assert api.get_company_id("microsoft", evade=None) == "1035"
+
+    assert api.company_id_cache.get("throttled") is None
+    assert api.company_id_cache.is_missing(api.company_id_cache.get("missing"))
+    assert api.company_id_cache.get("microsoft") == "1035"
+    api.close()
+
+
+class DownRedis:
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            raise RedisConnectionError("Connection refused")
+
+        return command
+
+
+def test_invites_sent_cache_errors_are_skipped():
+    api = create_api(Linkedin, ReplaySession())
+    api.rds = DownRedis()
+
+    # Sent invites are fetched, when cache isn't available
+    assert api._get_cached_invites_sent(86400.0) is None
+    api._cache_invites_sent(86400.0, [{"invitationId": "1"}])
+    api.invalidate_invites_sent_cache()
+    api.close()
+
+
+def test_profile_cache_errors_are_skipped():
+    api = create_api(Linkedin, ReplaySession())
+    api.profile_cache = ProfileCache(RedisCacheBackend(DownRedis()))
+
+    # Profiles are fetched, when cache isn't available
+    assert api._get_cached_profile("profile", public_id="john-doe") is None
+    api._cache_profile("profile", {"firstName": "John"}, public_id="john-doe")
+    assert "not found" in str(api._profile_not_found("profile", public_id="ghost"))
+    api.close()
+
+
+class ConcurrencySession(ReplaySession):
+    """
+    Replay session, which counts requests sent at the same time
+    """
+
+    def __init__(self, entries):
+        super().__init__(entries)
+        self.running = 0
+        self.max_running = 0
+        self._counter_lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self._counter_lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(0.02)
+        try:
+            return super().get(url, **kwargs)
+        finally:
+            with self._counter_lock:
+                self.running -= 1
+
+
+def test_threads_share_instance_state(monkeypatch):
+    monkeypatch.setattr(EvadePolicy, "delay", lambda self: 0)
+    session = ConcurrencySession(fixtures())
+    api = create_api(Linkedin, session)
+    amount_before = sum(
+        amount for key, amount in api.requests_amount.items() if not key.endswith("_timestamp")
+    )
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        profiles = list(executor.map(lambda _: api.get_user_profile(), range(16)))
+        warmups = list(executor.map(lambda _: api._claim_profile_warmup(), range(16)))
+
+    assert profiles == [{"plainId": 1}] * 16
+    # Requests of threads are in flight at the same time, no request is lost in counters
+    assert session.max_running > 1
+    amount = sum(
+        amount for key, amount in api.requests_amount.items() if not key.endswith("_timestamp")
+    )
+    assert amount - amount_before == 16
+    # Profile page is fetched by one thread only
+    assert warmups.count(True) == 1
+    api.close()
+
+
+def test_reformat_results_fetches_profiles_in_parallel(monkeypatch):
+    monkeypatch.setattr(EvadePolicy, "delay", lambda self: 0)
+    profile_urn = "urn:li:fsd_profile:ACoAA1"
+    profile = {
+        "data": {"data": {"identityDashProfilesByMemberIdentity": {"*elements": [profile_urn]}}},
+        "included": [
+            {
+                "$type": "com.linkedin.voyager.dash.identity.profile.Profile",
+                "entityUrn": profile_urn,
+                "publicIdentifier": "john-doe",
+                "firstName": "John",
+                "lastName": "Doe",
+                "headline": "Engineer",
+            }
+        ],
+    }
+    session = ConcurrencySession(
+        [
+            fixture_entry("GET", "https://www.linkedin.com/in/john-doe", "<html></html>"),
+            fixture_entry("GET", f"{API_URL}/graphql", profile),
+        ]
+    )
+    api = create_api(Linkedin, session)
+    api.profile_cache = None
+    # Enrichment pauses are skipped
+    api._defer = lambda delay: None
+    leads = [{"publicIdentifier": "john-doe"} for _ in range(8)]
+
+    results = api.reformat_results(leads, max_workers=4)
+
+    assert [lead["firstname"] for lead in results] == ["John"] * 8
+    assert session.max_running > 1
+    api.close()
+
+
+def flow():
+    response = yield Request("GET", "/first")
+    return response
+
+
+def iterator_flow():
+    try:
+        response = yield Request("GET", "/first")
+    except ValueError:
+        response = "recovered"
+
+    yield response
+    yield (yield Request("POST", "/second"))
+
+
+def test_flow_errors_are_raised_at_yield():
+    def send(request):
+        if request.uri == "/first":
+            raise ValueError("failed")
+        return request.method
+
+    assert list(iter_flow(iterator_flow(), send)) == ["recovered", "POST"]
+    with pytest.raises(ValueError):
+        run_flow(flow(), send)
+
+    async def async_send(request):
+        return send(request)
+
+    async def main():
+        return [item async for item in async_iter_flow(iterator_flow(), async_send)]
+
+    assert asyncio.run(main()) == ["recovered", "POST"]
+    with pytest.raises(ValueError):
+        asyncio.run(async_run_flow(flow(), async_send))
@@ -0,0 +1,145 @@
+import gc
+
+from salesloop_linkedin_api.client import Client
+from salesloop_linkedin_api.linkedin import Linkedin
+from salesloop_linkedin_api.utils.session_cache import SessionCache
+from salesloop_linkedin_api.utils.session_snapshot import dump_cookies, dump_headers
+
+PROXIES = {"https": "http://127.0.0.1:3128"}
+COOKIES = [
+    {"name": "JSESSIONID", "value": '"ajax:123"', "domain": ".www.linkedin.com", "secure": True},
+    {"name": "li_at", "value": "AQEDA", "domain": ".linkedin.com", "secure": True},
+]
+
+
+def session_snapshots():
+    client = Client(cookies=COOKIES, ua="Mozilla/5.0")
+    snapshots = dump_cookies(client.session), dump_headers(client.session)
+    client.close()
+    return snapshots
+
+
+class ClientFactory:
+    def __init__(self, api_cookies, api_headers):
+        self.api_cookies = api_cookies
+        self.api_headers = api_headers
+        self.clients = []
+
+    def __call__(self):
+        client = Client(proxies=PROXIES, api_cookies=self.api_cookies, api_headers=self.api_headers)
+        client.closed = False
+        close = client.close
+
+        def close_client():
+            client.closed = True
+            close()
+
+        client.close = close_client
+        self.clients.append(client)
+        return client
+
+
+def test_client_reuse():
+    api_cookies, api_headers = session_snapshots()
+    create_client = ClientFactory(api_cookies, api_headers)
+    cache = SessionCache()
+
+    client = cache.acquire(1, PROXIES, api_cookies, api_headers, create_client)
+    # Client is checked out, other task gets a new one
+    other_client = cache.acquire(1, PROXIES, api_cookies, api_headers, create_client)
+    assert other_client is not client
+
+    cache.release(1, PROXIES, other_client)
+    cache.release(1, PROXIES, client)
+    assert other_client.closed and not client.closed
+
+    assert cache.acquire(1, PROXIES, api_cookies, api_headers, create_client) is client
+    assert cache.acquire(2, PROXIES, api_cookies, api_headers, create_client) is not client
+    assert len(create_client.clients) == 3
+
+    cache.release(1, PROXIES, client)
+    cache.clear()
+    assert client.closed and len(cache) == 0
+
+
+def test_cookies_refresh():
+    api_cookies, api_headers = session_snapshots()
+    create_client = ClientFactory(api_cookies, api_headers)
+    refreshed = []
+    cache = SessionCache(on_cookies_refresh=lambda *args: refreshed.append(args))
+
+    client = cache.acquire(1, PROXIES, api_cookies, api_headers, create_client)
+    cache.release(1, PROXIES, client)
+    assert refreshed == []
+
+    # LinkedIn updates session cookie
+    client = cache.acquire(1, PROXIES, api_cookies, api_headers, create_client)
+    client.session.cookies.set("li_at", "AQEDB", domain=".linkedin.com")
+    cache.release(1, PROXIES, client)
+    assert refreshed == [(1, dump_cookies(client.session))]
+
+    # Stale and refreshed snapshots are reused as is
+    for snapshot in (api_cookies, refreshed[0][1]):
+        assert cache.acquire(1, PROXIES, snapshot, api_headers, create_client) is client
+        assert client.session.cookies.get("li_at") == "AQEDB"
+        cache.release(1, PROXIES, client)
+
+    # New account session replaces client session cookies
+    client.session.cookies.set("li_at", "AQEDC", domain=".linkedin.com")
+    new_api_cookies = dump_cookies(client.session)
+    client.session.cookies.set("li_at", "AQEDB", domain=".linkedin.com")
+
+    assert cache.acquire(1, PROXIES, new_api_cookies, api_headers, create_client) is client
+    assert client.session.cookies.get("li_at") == "AQEDC"
+    assert len(create_client.clients) == 1
+
+
+def test_idle_clients_eviction():
+    api_cookies, api_headers = session_snapshots()
+    create_client = ClientFactory(api_cookies, api_headers)
+    cache = SessionCache(max_idle=0)
+
+    client = cache.acquire(1, PROXIES, api_cookies, api_headers, create_client)
+    cache.release(1, PROXIES, client)
+
+    assert client.closed and len(cache) == 0
+    assert cache.acquire(1, PROXIES, api_cookies, api_headers, create_client) is not client
+
+
+def test_checked_out_clients_dont_count_toward_max_size():
+    api_cookies, api_headers = session_snapshots()
+    create_client = ClientFactory(api_cookies, api_headers)
+    cache = SessionCache(max_size=1)
+
+    clients = [
+        cache.acquire(account, None, api_cookies, api_headers, create_client)
+        for account in range(3)
+    ]
+    for account, client in enumerate(clients):
+        cache.release(account, None, client)
+
+    # Only the least recently released clients are evicted
+    assert [client.closed for client in clients] == [True, True, False]
+    assert len(cache) == 1
+
+
+def test_client_released_when_instance_is_collected():
+    api_cookies, api_headers = session_snapshots()
+    cache = SessionCache()
+
+    api = Linkedin(
+        "john.doe@example.com",
+        None,
+        proxies=PROXIES,
+        linkedin_login_id=1,
+        api_cookies=api_cookies,
+        api_headers=api_headers,
+        session_cache=cache,
+        request_hooks=[],
+    )
+    client = api.client
+    del api
+    gc.collect()
+
+    assert cache.acquire(1, PROXIES, api_cookies, api_headers, None) is client
+    cache.clear()
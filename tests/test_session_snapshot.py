@@ -0,0 +1,108 @@
+import json
+import pickle
+
+import pytest
+from curl_cffi.requests import Session
+
+from salesloop_linkedin_api.client import Client
+from salesloop_linkedin_api.utils.session_snapshot import (
+    SessionSnapshotError,
+    dump_cookies,
+    dump_headers,
+    load_cookies,
+    load_headers,
+)
+
+COOKIES = [
+    {"name": "JSESSIONID", "value": '"ajax:123"', "domain": ".www.linkedin.com", "secure": True},
+    {"name": "li_at", "value": "AQEDA", "domain": ".linkedin.com", "secure": True},
+    {"name": "tracker", "value": "1", "domain": ".example.com", "secure": False},
+]
+
+
+@pytest.fixture
+def client():
+    client = Client(cookies=COOKIES, ua="Mozilla/5.0")
+    yield client
+    client.close()
+
+
+def test_snapshot_roundtrip(client):
+    api_cookies = dump_cookies(client.session)
+    api_headers = dump_headers(client.session)
+
+    snapshot = json.loads(api_cookies)
+    assert snapshot["version"] == 1
+    assert [cookie["name"] for cookie in snapshot["cookies"]] == ["li_at", "JSESSIONID"]
+    assert json.loads(api_headers)["headers"]["csrf-token"] == "ajax:123"
+
+    restored = Client(api_cookies=api_cookies, api_headers=api_headers)
+    assert restored.session.cookies.get("li_at") == "AQEDA"
+    assert restored.session.headers["User-Agent"] == "Mozilla/5.0"
+
+    # Snapshots of the same session are equal
+    assert dump_cookies(restored.session) == api_cookies
+    assert dump_headers(restored.session) == api_headers
+    restored.close()
+
+
+@pytest.fixture
+def pickled_session(client):
+    session = client.session
+    api_cookies = pickle.dumps(session.cookies.jar._cookies, protocol=pickle.HIGHEST_PROTOCOL)
+    api_headers = pickle.dumps(session.headers, protocol=pickle.HIGHEST_PROTOCOL)
+    return api_cookies, api_headers
+
+
+def test_load_pickled_session(pickled_session, monkeypatch):
+    api_cookies, api_headers = pickled_session
+    assert {cookie.name for cookie in load_cookies(api_cookies)} == {
+        "JSESSIONID",
+        "li_at",
+        "tracker",
+    }
+    assert load_headers(api_headers)["csrf-token"] == "ajax:123"
+
+    # Pickled sessions are rejected once the fallback is disabled
+    monkeypatch.setattr(
+        "salesloop_linkedin_api.utils.session_snapshot.SESSION_SNAPSHOT_PICKLE_FALLBACK", False
+    )
+    with pytest.raises(SessionSnapshotError):
+        load_cookies(api_cookies)
+
+    with pytest.raises(SessionSnapshotError):
+        Client(api_cookies=api_cookies, api_headers=api_headers)
+
+
+def test_pickled_session_is_migrated(client, pickled_session):
+    api_cookies, api_headers = pickled_session
+    restored = Client(api_cookies=api_cookies, api_headers=api_headers)
+
+    # Pickled session is restored and its JSON snapshots are kept to be saved
+    assert restored.session.cookies.get("li_at") == "AQEDA"
+    assert restored.migrated_snapshot == {
+        "session_cookies": dump_cookies(client.session),
+        "session_headers": dump_headers(client.session),
+    }
+    restored.close()
+
+    migrated = Client(
+        api_cookies=restored.migrated_snapshot["session_cookies"],
+        api_headers=restored.migrated_snapshot["session_headers"],
+    )
+    assert migrated.session.cookies.get("li_at") == "AQEDA"
+    assert migrated.migrated_snapshot is None
+    migrated.close()
+
+
+def test_invalid_snapshots():
+    with pytest.raises(SessionSnapshotError):
+        load_cookies(b'{"version": 2, "cookies": []}')
+
+    with pytest.raises(SessionSnapshotError):
+        load_cookies(b'{"version": 1, "cookies": [{"name": "li_at", "value": "AQEDA"}]}')
+
+    with pytest.raises(SessionSnapshotError):
+        load_headers(b"not json")
+
+    assert load_cookies(dump_cookies(Session())) == []
@@ -0,0 +1,20 @@
+import pytest
+
+from salesloop_linkedin_api.settings import UNKNOWN_REQUEST_TYPE
+from salesloop_linkedin_api.statistic import APIRequestType
+
+
+@pytest.mark.parametrize(
+    "url, request_type",
+    [
+        ("https://www.linkedin.com/voyager/api/feed/updates?count=10", "feed"),
+        ("https://www.linkedin.com/voyager/api/graphql?queryId=search", "search"),
+        ("https://www.linkedin.com/voyager/api/me", "identity"),
+        ("https://www.linkedin.com/in/john-doe/", "identity"),
+        ("https://www.linkedin.com/voyager/api/voyagerMessagingDashComposeOptions", "identity"),
+        ("https://www.linkedin.com/sales-api/salesApiIdentity?q=findLicenses", "identity"),
+        ("https://www.linkedin.com/voyager/api/unknown/endpoint", UNKNOWN_REQUEST_TYPE),
+    ],
+)
+def test_get_request_type(url, request_type):
+    assert APIRequestType.get_request_type(url) == request_type
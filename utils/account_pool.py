@@ -0,0 +1,376 @@
+import heapq
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+
+from salesloop_linkedin_api.settings import ACCOUNT_POOL_WORKERS, QUOTA_POLICY
+from salesloop_linkedin_api.utils.pacing import RetryDeferred
+from salesloop_linkedin_api.utils.quota import QuotaExceeded
+
+logger = logging.getLogger("application")
+
+
+class _QueuedCall:
+    __slots__ = (
+        "future",
+        "method",
+        "args",
+        "kwargs",
+        "not_before",
+        "slot_at",
+        "retries",
+        "retry_started",
+    )
+
+    def __init__(self, future, method, args, kwargs):
+        self.future = future
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        # Call isn't started before this time, e.g. until account quota is refilled
+        self.not_before = 0.0
+        # Reserved account request slot of the call
+        self.slot_at = None
+        # Deferred retries of the call and time of its first retryable error
+        self.retries = 0
+        self.retry_started = None
+
+
+class AccountPool:
+    """
+    Runs Linkedin calls of many accounts on one node.
+
+    Calls of one account are running one by one, in submit order, so account requests keep
+    evade spacing and session cookies aren't changed by parallel calls. Calls of different
+    accounts are running in parallel in a shared thread pool, an account takes one worker
+    per call, so accounts with long queues don't starve other accounts.
+
+    Worker isn't taken by an account call until the call is ready: slot of the first request
+    of the call is reserved in account pacing and the call is started at the slot. Waiting
+    calls are started by one scheduler thread. Later requests of the call, e.g. search after
+    sales_login in get_leads, still wait for their slots in the worker.
+
+    Retryable request errors defer the account with backoff wait and the call is started
+    again from the beginning, before other queued calls of the account. Requests of the call
+    sent before the error are sent again, e.g. a call sending several messages may send its
+    first messages twice. Such calls are better run outside of the pool.
+
+    With `reorder_on_quota` (QUOTA_POLICY "reorder") call failed with QuotaExceeded is moved
+    behind other queued calls of the account and started again from the beginning, when
+    the account quota is refilled. Calls of other request types run in the meantime.
+
+        with AccountPool() as pool:
+            pool.add(api)
+            future = pool.submit(api.pacing_key, "get_leads", search_url)
+            results = list(pool.map("get_profile", [key_1, key_2], ["john-doe", "jane-doe"]))
+    """
+
+    def __init__(
+        self, max_workers=ACCOUNT_POOL_WORKERS, reorder_on_quota=QUOTA_POLICY == "reorder"
+    ):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="account-pool"
+        )
+        self.reorder_on_quota = reorder_on_quota
+        self._accounts = {}
+        self._queues = {}
+        # Accounts with scheduled call, at most one call of the account is scheduled
+        self._scheduled = set()
+        # Accounts waiting for their first ready call -> wake up time, and heap of
+        # (wake up time, key), entries of removed or rescheduled accounts are skipped
+        self._waiting = {}
+        self._wakeups = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._closed = False
+        self._scheduler = threading.Thread(
+            target=self._run_scheduler, name="account-pool-scheduler", daemon=True
+        )
+        self._scheduler.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add(self, linkedin_api, key=None):
+        """
+        Add account Linkedin instance, by default it's identified by its pacing key.
+        Retries of the instance requests are deferred to the pool until it's removed.
+
+        Returns:
+            account key
+        """
+        key = key if key is not None else linkedin_api.pacing_key
+        with self._lock:
+            if key in self._accounts:
+                raise KeyError(f"Account {key} is already added to account pool")
+
+            self._accounts[key] = linkedin_api
+            self._queues[key] = deque()
+            linkedin_api.defer_retries = True
+
+        return key
+
+    def remove(self, key):
+        """
+        Remove account, its queued calls are cancelled
+
+        Returns:
+            removed Linkedin instance
+        """
+        with self._lock:
+            linkedin_api = self._accounts.pop(key)
+            queue = self._queues.pop(key)
+            if self._waiting.pop(key, None) is not None:
+                self._scheduled.discard(key)
+            linkedin_api.defer_retries = False
+
+        for call in queue:
+            call.future.cancel()
+
+        return linkedin_api
+
+    def get(self, key):
+        return self._accounts[key]
+
+    def __contains__(self, key):
+        return key in self._accounts
+
+    def __len__(self):
+        return len(self._accounts)
+
+    def submit(self, key, method, *args, **kwargs) -> Future:
+        """
+        Queue call of the account Linkedin instance. `method` is method name, e.g. "get_leads",
+        or function, called with Linkedin instance as first argument.
+
+        Returns:
+            future with call result
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Can't submit calls to closed account pool")
+
+            if key not in self._queues:
+                raise KeyError(f"Account {key} isn't added to account pool")
+
+            self._queues[key].append(_QueuedCall(future, method, args, kwargs))
+            self._schedule(key)
+
+        return future
+
+    def map(self, method, keys, *iterables):
+        """
+        Like Executor.map, calls `method` of accounts from `keys` with arguments from `iterables`
+
+        Returns:
+            iterator of calls results in `keys` order
+        """
+        futures = [self.submit(key, method, *args) for key, *args in zip(keys, *iterables)]
+
+        def results():
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+        return results()
+
+    def _schedule(self, key):
+        """
+        Schedule next queued call of the account, if none is scheduled. Must be called with lock
+        """
+        if key in self._scheduled or not self._queues.get(key):
+            return
+
+        self._scheduled.add(key)
+        queue = self._queues[key]
+        now = time.monotonic()
+        call = self._first_ready(queue, now)
+        if call is None:
+            delay = min(call.not_before for call in queue) - now
+        else:
+            if call.slot_at is None:
+                # Call is started at its account request slot, other calls are queued behind it
+                call.slot_at = now + self._accounts[key].reserve_request_slot()
+            delay = call.slot_at - now
+
+        if delay > 0:
+            # No call is ready, worker isn't taken until the first one is
+            wake_at = now + delay
+            self._waiting[key] = wake_at
+            heapq.heappush(self._wakeups, (wake_at, key))
+            self._wakeup.notify()
+        else:
+            self._executor.submit(self._run_next, key)
+
+    def _run_scheduler(self):
+        """
+        Schedule waiting accounts again at their wake up time
+        """
+        with self._lock:
+            while not self._closed:
+                now = time.monotonic()
+                while self._wakeups and self._wakeups[0][0] <= now:
+                    wake_at, key = heapq.heappop(self._wakeups)
+                    if self._waiting.get(key) == wake_at:
+                        del self._waiting[key]
+                        self._scheduled.discard(key)
+                        self._schedule(key)
+
+                timeout = self._wakeups[0][0] - time.monotonic() if self._wakeups else None
+                self._wakeup.wait(timeout)
+
+    @staticmethod
+    def _first_ready(queue, now):
+        for call in queue:
+            if call.not_before <= now:
+                return call
+
+        return None
+
+    @classmethod
+    def _pop_ready(cls, queue):
+        now = time.monotonic()
+        call = cls._first_ready(queue, now)
+        if call is None or call.slot_at is None or call.slot_at > now:
+            return None
+
+        queue.remove(call)
+        return call
+
+    def _run_next(self, key):
+        with self._lock:
+            queue = self._queues.get(key)
+            linkedin_api = self._accounts.get(key)
+            call = self._pop_ready(queue) if queue else None
+
+        try:
+            if call is not None and call.future.set_running_or_notify_cancel():
+                self._run_call(key, linkedin_api, call)
+        finally:
+            with self._lock:
+                self._scheduled.discard(key)
+                if not self._closed:
+                    self._schedule(key)
+
+    def _run_call(self, key, linkedin_api, call):
+        try:
+            if callable(call.method):
+                result = call.method(linkedin_api, *call.args, **call.kwargs)
+            else:
+                result = getattr(linkedin_api, call.method)(*call.args, **call.kwargs)
+        except QuotaExceeded as e:
+            if not self.reorder_on_quota or not self._requeue(key, call, e.retry_after):
+                call.future.set_exception(e)
+            else:
+                logger.info(
+                    "Account %s quota is exceeded, call is requeued for %.0f seconds",
+                    key,
+                    e.retry_after,
+                )
+        except RetryDeferred as e:
+            if not self._retry_later(key, linkedin_api, call, e.max_time):
+                call.future.set_exception(e.error)
+        except BaseException as e:
+            call.future.set_exception(e)
+        else:
+            call.future.set_result(result)
+
+    def _retry_later(self, key, linkedin_api, call, max_time) -> bool:
+        """
+        Defer the account with backoff wait and queue the call before other account calls,
+        the whole call is run again
+
+        Returns:
+            False, if retry time is over, account is removed or pool is closed
+        """
+        now = time.monotonic()
+        if call.retry_started is None:
+            call.retry_started = now
+        elif now - call.retry_started >= max_time:
+            return False
+
+        call.retries += 1
+        # Full jitter exponential wait, like backoff.expo
+        delay = random.uniform(0, 2**call.retries)
+        linkedin_api.pacing.defer(linkedin_api.pacing_key, delay)
+        if not self._requeue(key, call, front=True):
+            return False
+
+        logger.info("Account %s request failed, call is retried in %.1f seconds", key, delay)
+        return True
+
+    def _requeue(self, key, call, delay=0.0, front=False) -> bool:
+        """
+        Move call behind other queued calls of the account, or before them with `front`,
+        it's started after `delay` seconds
+
+        Returns:
+            False, if account is removed or pool is closed
+        """
+        # Running future can't be queued again, the call gets a new one chained to it
+        future = Future()
+        future.add_done_callback(lambda done: self._chain(done, call.future))
+        requeued = _QueuedCall(future, call.method, call.args, call.kwargs)
+        requeued.not_before = time.monotonic() + delay
+        requeued.retries = call.retries
+        requeued.retry_started = call.retry_started
+        with self._lock:
+            queue = self._queues.get(key)
+            if self._closed or queue is None:
+                return False
+
+            if front:
+                queue.appendleft(requeued)
+            else:
+                queue.append(requeued)
+
+        return True
+
+    @staticmethod
+    def _chain(source: Future, destination: Future):
+        if source.cancelled():
+            # Destination future is running, it can't be cancelled
+            destination.set_exception(CancelledError())
+        elif source.exception() is not None:
+            destination.set_exception(source.exception())
+        else:
+            destination.set_result(source.result())
+
+    def close(self, wait=True, close_accounts=True):
+        """
+        Stop the pool, queued calls are cancelled. Linkedin instances are closed
+        if `close_accounts` is set.
+        """
+        with self._lock:
+            self._closed = True
+            queues = list(self._queues.values())
+            accounts = list(self._accounts.items())
+            self._waiting.clear()
+            self._wakeups.clear()
+            self._wakeup.notify()
+
+        if wait:
+            self._scheduler.join()
+
+        for queue in queues:
+            for call in queue:
+                call.future.cancel()
+
+        self._executor.shutdown(wait=wait)
+
+        if close_accounts:
+            for key, linkedin_api in accounts:
+                try:
+                    linkedin_api.close()
+                except Exception as e:
+                    logger.warning("Failed to close %s account", key, exc_info=e)
@@ -0,0 +1,132 @@
+import sqlite3
+import threading
+import time
+
+from salesloop_linkedin_api.settings import (
+    COMPANY_ID_CACHE_BACKEND,
+    COMPANY_ID_CACHE_MISSING_TTL,
+    COMPANY_ID_CACHE_SQLITE_PATH,
+    COMPANY_ID_CACHE_TTL,
+)
+from salesloop_linkedin_api.statistic import get_redis_connection
+from salesloop_linkedin_api.utils.profile_cache import RedisCacheBackend
+
+# Cached "company not found" value
+MISSING = "missing"
+
+
+class SQLiteCacheBackend:
+    """
+    Local SQLite cache backend, persisted between process restarts
+    """
+
+    def __init__(self, path=COMPANY_ID_CACHE_SQLITE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at < time.time():
+                with self._connection:
+                    self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+
+    def delete(self, key):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class CompanyIdCache:
+    """
+    Cache of company universal name (public id) to numeric company id.
+
+    Company ids don't change, so they are cached for `ttl` seconds (30 days by default).
+    Not found companies are cached as `MISSING` for `missing_ttl` seconds.
+    """
+
+    KEY_PREFIX = "ln.api.company_id"
+
+    def __init__(self, backend, ttl=COMPANY_ID_CACHE_TTL, missing_ttl=COMPANY_ID_CACHE_MISSING_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+
+    @staticmethod
+    def normalize_universal_name(universal_name: str) -> str:
+        return universal_name.strip().strip("/").lower()
+
+    def _key(self, universal_name) -> str:
+        return f"{self.KEY_PREFIX}:{self.normalize_universal_name(universal_name)}"
+
+    def get(self, universal_name):
+        """
+        Returns:
+            cached company id, `MISSING` for not found company or None if nothing is cached
+        """
+        return self.backend.get(self._key(universal_name))
+
+    def set(self, universal_name, company_id):
+        self.backend.set(self._key(universal_name), str(company_id), self.ttl)
+
+    def set_missing(self, universal_name):
+        self.backend.set(self._key(universal_name), MISSING, self.missing_ttl)
+
+    def delete(self, universal_name):
+        self.backend.delete(self._key(universal_name))
+
+    @staticmethod
+    def is_missing(company_id) -> bool:
+        return company_id == MISSING
+
+
+_default_company_id_cache = None
+_default_company_id_cache_lock = threading.Lock()
+
+
+def get_default_company_id_cache():
+    """
+    Company id cache shared by Linkedin instances and search url generation of the process,
+    based on COMPANY_ID_CACHE_BACKEND. None is returned if cache is disabled.
+    """
+    global _default_company_id_cache
+
+    if COMPANY_ID_CACHE_BACKEND == "none":
+        return None
+
+    if _default_company_id_cache is None:
+        with _default_company_id_cache_lock:
+            if _default_company_id_cache is None:
+                if COMPANY_ID_CACHE_BACKEND == "sqlite":
+                    backend = SQLiteCacheBackend()
+                else:
+                    backend = RedisCacheBackend(get_redis_connection())
+
+                _default_company_id_cache = CompanyIdCache(backend)
+
+    return _default_company_id_cache
@@ -0,0 +1,131 @@
+"""
+Normalization of company leads from website visitors services (leadfeeder, visitorqueue)
+"""
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import urlparse
+
+from salesloop_linkedin_api.utils.helpers import logger
+
+
+def index_included(included: list) -> dict:
+    """
+    Index JSON:API "included" resources by (type, id), built in one pass.
+    First resource is kept if ids are repeated.
+    """
+    index = {}
+    for item in included:
+        index.setdefault((item.get("type"), item.get("id")), item)
+
+    return index
+
+
+@lru_cache(maxsize=1024)
+def get_country_code(country_name: str) -> Optional[str]:
+    """
+    Returns:
+        lowercase ISO 3166 alpha-2 code of the country name or None
+    """
+    # pycountry is slow to import, it's imported only when country is looked up
+    import pycountry
+
+    country = pycountry.countries.get(name=country_name)
+    return country.alpha_2.lower() if country else None
+
+
+def get_linkedin_public_id(linkedin_url: str) -> str:
+    return urlparse(linkedin_url).path.rpartition("/")[-1]
+
+
+def parse_leadfeeder_leads(company_leads: dict, maximum_companies: int, log_extra=None):
+    """
+    Returns:
+        (parsed leads by company public id, skipped leads names)
+        or None if there's no leads data
+    """
+    data = company_leads.get("data")
+    included_data = company_leads.get("included")
+
+    if not data or not included_data:
+        return None
+
+    included_index = index_included(included_data)
+    parsed_leads = {}
+    skipped_leads = []
+
+    for lead in data:
+        attributes = lead.get("attributes", {})
+        lead_company_name = attributes.get("name")
+        lead_linkedin_url = attributes.get("linkedin_url")
+        public_id = get_linkedin_public_id(lead_linkedin_url) if lead_linkedin_url else None
+
+        if not public_id:
+            skipped_leads.append(lead_company_name)
+            continue
+
+        # Location field
+        location_attributes = {}
+        location_data = lead.get("relationships", {}).get("location", {}).get("data") or {}
+        if location_data.get("id"):
+            location = included_index.get(
+                (location_data.get("type", "locations"), location_data["id"]), {}
+            )
+            location_attributes = location.get("attributes", {})
+
+        company_id = int(public_id) if public_id.isnumeric() else None
+        parsed_leads[public_id] = {
+            "id": lead["id"],
+            "name": lead_company_name,
+            "company_id": company_id,
+            "country_code": (location_attributes.get("country_code") or "").lower(),
+            "valid": company_id is not None,
+            "country": location_attributes.get("country"),
+            "region": location_attributes.get("region"),
+            "city": location_attributes.get("city"),
+        }
+
+        if len(parsed_leads) >= maximum_companies:
+            logger.debug("Raised maximum companies - %s, stop.", maximum_companies, extra=log_extra)
+            break
+
+    return parsed_leads, skipped_leads
+
+
+def parse_visitorqueue_leads(company_leads: list, maximum_companies: int, log_extra=None):
+    """
+    Returns:
+        (parsed leads by company public id, skipped leads names)
+        or None if there's no leads data
+    """
+    if not company_leads:
+        return None
+
+    parsed_leads = {}
+    skipped_leads = []
+
+    for lead in company_leads:
+        company_name = lead.get("name")
+        social_urls = lead.get("social_urls", [])
+        company_country_code = get_country_code(lead["country"]) if lead.get("country") else None
+
+        public_id = next(
+            (get_linkedin_public_id(url) for url in social_urls if "linkedin.com" in url), None
+        )
+
+        if all([company_name, public_id, company_country_code]):
+            parsed_leads[public_id] = {
+                "id": str(lead["id"]),
+                "name": company_name,
+                "company_id": None,
+                "country_code": company_country_code,
+                "valid": False,
+                "social_urls": social_urls,
+            }
+        else:
+            skipped_leads.append(company_name)
+
+        if len(parsed_leads) > maximum_companies:
+            logger.debug("Raised maximum companies - %s, stop.", maximum_companies, extra=log_extra)
+            break
+
+    return parsed_leads, skipped_leads
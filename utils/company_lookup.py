@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from salesloop_linkedin_api.settings import (
+    COMPANY_LOOKUP_CONCURRENCY,
+    COMPANY_LOOKUP_MAX_IDLE,
+    COMPANY_LOOKUP_MAX_RETRY_TIME,
+    COMPANY_LOOKUP_QUEUE_SIZE,
+    COMPANY_LOOKUP_TIMEOUT,
+)
+from salesloop_linkedin_api.utils.helpers import fast_evade
+
+logger = logging.getLogger("application")
+
+
+class CompanyLookupService:
+    """
+    Per-account company id lookups, made with account's Linkedin client session.
+
+    Lookups are running in a long-lived thread pool, so keep-alive connections of the session
+    are reused between calls. Requests are paced, cached and counted in statistics like other
+    Linkedin requests. At most `max_queue_size` lookups are pending, `submit` blocks
+    until a queue slot is free. Each lookup request times out after `timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        linkedin_api,
+        max_workers=COMPANY_LOOKUP_CONCURRENCY,
+        max_queue_size=COMPANY_LOOKUP_QUEUE_SIZE,
+        evade=fast_evade,
+        timeout=COMPANY_LOOKUP_TIMEOUT,
+    ):
+        self.linkedin_api = linkedin_api
+        self.evade = evade
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"company-lookup-{linkedin_api.pacing_key}",
+        )
+        self._queue_slots = threading.BoundedSemaphore(max_queue_size)
+
+    def submit(self, universal_name):
+        """
+        Queue company id lookup
+
+        Returns:
+            future with numeric company id or None
+        """
+        self._queue_slots.acquire()
+        try:
+            future = self._executor.submit(
+                self.linkedin_api.get_company_id,
+                universal_name,
+                evade=self.evade,
+                timeout=self.timeout,
+            )
+        except BaseException:
+            self._queue_slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._queue_slots.release())
+        return future
+
+    def lookup_many(self, universal_names) -> dict:
+        """
+        Returns:
+            company universal name -> numeric company id or None, if company isn't found
+            or lookup failed
+        """
+        futures = [
+            (universal_name, self.submit(universal_name)) for universal_name in universal_names
+        ]
+
+        company_ids = {}
+        for universal_name, future in futures:
+            try:
+                company_ids[universal_name] = future.result()
+            except Exception as e:
+                logger.warning("Failed get company! %s", universal_name, exc_info=e)
+                company_ids[universal_name] = None
+
+        return company_ids
+
+    def close(self):
+        self._executor.shutdown(cancel_futures=True)
+
+
+class CompanyLookupRegistry:
+    """
+    Lookup services of accounts, which are passed as session records.
+
+    Linkedin client of the record is created with short retry time and reused until record
+    cookies are changed. Services unused for `max_idle` seconds are closed with their clients,
+    so clients are returned to the session cache.
+    """
+
+    def __init__(
+        self, max_idle=COMPANY_LOOKUP_MAX_IDLE, max_retry_time=COMPANY_LOOKUP_MAX_RETRY_TIME
+    ):
+        self.max_idle = max_idle
+        self.max_retry_time = max_retry_time
+        # key -> (api_cookies, service, last used time)
+        self._services = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._services)
+
+    def get(self, account, max_workers=COMPANY_LOOKUP_CONCURRENCY) -> CompanyLookupService:
+        from salesloop_linkedin_api.linkedin import Linkedin
+
+        key = (account.username, repr(sorted(account.api_proxies.items())))
+        with self._lock:
+            expired = self._pop_expired(exclude=key)
+            api_cookies, service, _ = self._services.get(key, (None, None, None))
+            if service is not None and api_cookies != account.api_cookies:
+                logger.debug("Account %s cookies are changed, recreate client", key[0])
+                expired.append(service)
+                service = None
+
+            if service is None:
+                client = Linkedin(
+                    account.username,
+                    None,
+                    proxies=account.api_proxies,
+                    api_cookies=account.api_cookies,
+                    api_headers=account.api_headers,
+                    linkedin_login_id=getattr(account, "linkedin_login_id", None),
+                    default_retry_max_time=self.max_retry_time,
+                )
+                service = client.get_company_lookup(max_workers=max_workers)
+
+            self._services[key] = (account.api_cookies, service, time.monotonic())
+
+        self._close_services(expired)
+        return service
+
+    def close(self):
+        with self._lock:
+            services = [service for _, service, _ in self._services.values()]
+            self._services.clear()
+
+        self._close_services(services)
+
+    def _pop_expired(self, exclude=None) -> list:
+        """
+        Remove services unused for max_idle seconds, called with the lock held
+        """
+        now = time.monotonic()
+        expired = [
+            key
+            for key, (_, _, used_at) in self._services.items()
+            if key != exclude and now - used_at > self.max_idle
+        ]
+        return [self._services.pop(key)[1] for key in expired]
+
+    @staticmethod
+    def _close_services(services):
+        for service in services:
+            try:
+                # Lookup service is closed with its Linkedin instance
+                service.linkedin_api.close()
+            except Exception as e:
+                logger.warning("Failed close company lookup service", exc_info=e)
+
+
+_default_company_lookup_registry = None
+_default_company_lookup_registry_lock = threading.Lock()
+
+
+def get_default_company_lookup_registry() -> CompanyLookupRegistry:
+    global _default_company_lookup_registry
+
+    if _default_company_lookup_registry is None:
+        with _default_company_lookup_registry_lock:
+            if _default_company_lookup_registry is None:
+                _default_company_lookup_registry = CompanyLookupRegistry()
+
+    return _default_company_lookup_registry
+
+
+def get_company_lookup_service(linkedin_api, max_workers=COMPANY_LOOKUP_CONCURRENCY):
+    """
+    Company lookup service of the account. `linkedin_api` is a Linkedin instance or account record
+    with `api_cookies`, `api_headers` snapshots and `api_proxies`, see CompanyLookupRegistry.
+
+    `max_workers` is used only when service is created.
+    """
+    from salesloop_linkedin_api.linkedin import Linkedin
+
+    if isinstance(linkedin_api, Linkedin):
+        return linkedin_api.get_company_lookup(max_workers=max_workers)
+
+    return get_default_company_lookup_registry().get(linkedin_api, max_workers=max_workers)
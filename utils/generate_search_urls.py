@@ -3,20 +3,16 @@ from urllib.parse import urlparse, parse_qs, quote
 
 from collections import OrderedDict
 from json import JSONDecodeError
-from concurrent.futures import ThreadPoolExecutor
-from requests_futures.sessions import FuturesSession
-import pickle
-from os import environ
-import pycountry
 from application.config import Config
 from application.integrations.enums import ServiceType
 
-from salesloop_linkedin_api.utils.helpers import (
-    get_id_from_urn,
-    logger,
-    quote_query_param,
-    fast_evade,
+from salesloop_linkedin_api.utils.company_cache import get_default_company_id_cache
+from salesloop_linkedin_api.utils.company_leads import (
+    parse_leadfeeder_leads,
+    parse_visitorqueue_leads,
 )
+from salesloop_linkedin_api.utils.company_lookup import get_company_lookup_service
+from salesloop_linkedin_api.utils.helpers import logger, quote_query_param
 
 # NEXT: - optimize/convert to class?
 # integration test
@@ -35,7 +31,8 @@ def generate_search_url(
     """
     :param service_type: Service type: leadfeeder or visitorqueue
     :param maximum_companies: limit maximum leads (companies) from services
-    :param max_workers: maximum parallel requests to get company ID using LN Voyager API
+    :param max_workers: maximum parallel requests to get company ID using LN Voyager API,
+        used when account lookup service is created
     :param linkedin_api: linkedin api method
     :param company_leads: raw data from leadfeeder service
     :param title: title to generate search url
@@ -46,117 +43,20 @@ def generate_search_url(
     :return: generates LN search url
     """
 
-    parsed_leads = {}
-    skipped_leads = []
     log_extra = {"ctx": "generate_search_url", "linkedin_login_email": linkedin_api.username}
 
     if service_type == ServiceType.leadfeeder:
-        data = company_leads.get("data")
-        included_data = company_leads.get("included")
-
-        if not data or not included_data:
-            return None, None, None
-
-        for lead in data:
-            company_id = None
-
-            # Location field
-            id = lead["id"]
-            country_code = ""
-            country = None
-            region = None
-            city = None
-            public_id = None
-            lead_company_name = lead.get("attributes", {}).get("name")
-            lead_linkedin_url = lead.get("attributes", {}).get("linkedin_url")
-            if lead_linkedin_url:
-                public_id = urlparse(lead_linkedin_url).path.rpartition("/")[-1]
-
-            if public_id:
-                leadfeeder_location_id = (
-                    lead.get("relationships", {}).get("location", {}).get("data", {}).get("id")
-                )
-
-                if leadfeeder_location_id:
-                    location = next(
-                        iter(
-                            [
-                                location
-                                for location in included_data
-                                if location["id"] == leadfeeder_location_id
-                            ]
-                        ),
-                        {},
-                    )
-
-                    country_code = location.get("attributes", {}).get("country_code")
-                    country = location.get("attributes", {}).get("country")
-                    region = location.get("attributes", {}).get("region")
-                    city = location.get("attributes", {}).get("city")
-
-                if public_id.isnumeric():
-                    company_id = int(public_id)
-
-                parsed_leads[public_id] = {
-                    "id": id,
-                    "name": lead_company_name,
-                    "company_id": company_id,
-                    "country_code": country_code.lower(),
-                    "valid": company_id is not None,
-                    "country": country,
-                    "region": region,
-                    "city": city,
-                }
-            else:
-                skipped_leads.append(lead_company_name)
-
-            if len(parsed_leads) >= maximum_companies:
-                logger.debug(
-                    "Raised maximum companies - %s, stop.", maximum_companies, extra=log_extra
-                )
-                break
+        leads = parse_leadfeeder_leads(company_leads, maximum_companies, log_extra=log_extra)
     elif service_type == ServiceType.visitorqueue:
-        data = company_leads
-        if not data:
-            return None, None, None
-
-        for lead in data:
-            id = str(lead["id"])
-            company_name = lead.get("name")
-            company_country_code = None
-            company_id = None
-            public_id = None
-
-            if lead.get("country"):
-                company_country = pycountry.countries.get(name=lead.get("country"))
-                if company_country:
-                    company_country_code = company_country.alpha_2.lower()
-
-            for url in lead.get("social_urls", []):
-                if "linkedin.com" in url:
-                    public_id = urlparse(url).path.rpartition("/")[-1]
-                    break
-
-            if all([company_name, public_id, company_country_code]):
-                parsed_leads[public_id] = {
-                    "id": id,
-                    "name": company_name,
-                    "company_id": company_id,
-                    "country_code": company_country_code,
-                    "valid": company_id is not None,
-                    "social_urls": lead.get("social_urls", []),
-                }
-            else:
-                skipped_leads.append(company_name)
-
-            if len(parsed_leads) > maximum_companies:
-                logger.debug(
-                    "Raised maximum companies - %s, stop.", maximum_companies, extra=log_extra
-                )
-                break
+        leads = parse_visitorqueue_leads(company_leads, maximum_companies, log_extra=log_extra)
     else:
         raise Exception("Unknown leads type ")
 
+    if leads is None:
+        return None, None, None
+
+    parsed_leads, skipped_leads = leads
+
     if skipped_leads:
         logger.debug(
             "Skipped %d company leads: %s", len(skipped_leads), skipped_leads, extra=log_extra
@@ -193,6 +93,7 @@ def generate_search_url_leads(
     has_sn=None,
     countries_codes=None,
     max_workers=5,
+    company_id_cache=None,
 ):
     log_extra = {"ctx": "generate_search_url", "linkedin_login_email": linkedin_api.username}
 
@@ -221,60 +122,48 @@ def generate_search_url_leads(
         "titleTimeScope": "CURRENT",
     }
 
-    linkedin_api_cookies = pickle.loads(linkedin_api.api_cookies)
-    linkedin_api_headers = pickle.loads(linkedin_api.api_headers)
-    linkedin_api_proxies = linkedin_api.api_proxies
+    if company_id_cache is None:
+        company_id_cache = get_default_company_id_cache()
+
+    # Known companies (and companies known as not found) don't need requests
+    companies_to_fetch = []
+    for company_name, company_data in parsed_leads.items():
+        if company_data.get("company_id"):
+            continue
+
+        cached_company_id = company_id_cache.get(company_name) if company_id_cache else None
+        if cached_company_id is None:
+            companies_to_fetch.append(company_name)
+        elif not company_id_cache.is_missing(cached_company_id):
+            company_data["company_id"] = int(cached_company_id)
+            company_data["valid"] = True
 
-    with FuturesSession(executor=ThreadPoolExecutor(max_workers=max_workers)) as session:
-        search_timeout = int(environ["LINKEDIN_API_SEARCH_TIMEOUT"])
+    logger.debug(
+        "Company ids known for %d leads, %d to fetch",
+        len(parsed_leads) - len(companies_to_fetch),
+        len(companies_to_fetch),
+        extra=log_extra,
+    )
+
+    if companies_to_fetch:
+        company_lookup = get_company_lookup_service(linkedin_api, max_workers=max_workers)
         locations_number = len(
             set([lead_data.get("country_code") for lead, lead_data in parsed_leads.items()])
         )
 
         logger.debug(
-            "Getting companies data with %d workers. Parsed leads %d, Locations number %d",
-            max_workers,
+            "Getting companies data with account lookup service. "
+            "Parsed leads %d, Locations number %d",
             len(parsed_leads),
             locations_number,
         )
-        futures = []
-        for i, (company_name, company_data) in enumerate(parsed_leads.items()):
-            if not company_data.get("company_id"):
-                params = {
-                    "decorationId": "com.linkedin.voyager.deco.organization.web.WebFullCompanyMain-12",
-                    "q": "universalName",
-                    "universalName": company_name,
-                }
-
-                res = session.get(
-                    "https://www.linkedin.com/voyager/api/organization/companies",
-                    params=params,
-                    cookies=linkedin_api_cookies,
-                    headers=linkedin_api_headers,
-                    proxies=linkedin_api_proxies,
-                    timeout=search_timeout,
-                )
+        for company_name, company_id in company_lookup.lookup_many(companies_to_fetch).items():
+            logger.debug("Found %s company id", company_id)
 
-                futures.append((company_name, res))
-                if i < len(parsed_leads) - 1:
-                    fast_evade()
-
-                logger.debug("Added %s company name to futures", company_name)
-
-        for company_name, future in futures:
-            try:
-                future_data = future.result()
-                data = future_data.json()
-                company_linkedin_data = data["elements"][0]
-                company_id = get_id_from_urn(company_linkedin_data.get("entityUrn"))
-                logger.debug("Found %s company id", company_id)
-
-                # TODO do something if company_id not found!
-                if company_id and company_id.isnumeric():
-                    parsed_leads[company_name]["company_id"] = int(company_id)
-                    parsed_leads[company_name]["valid"] = True
-            except Exception as e:
-                logger.warning("Failed get company! %s", company_name, exc_info=e)
+            # TODO do something if company_id not found!
+            if company_id:
+                parsed_leads[company_name]["company_id"] = int(company_id)
+                parsed_leads[company_name]["valid"] = True
 
     if parsed_leads:
         search_urls_list = []
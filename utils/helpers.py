@@ -1,22 +1,35 @@
 import base64
-import pickle
 import json
 import logging
 import random
 import re
 import string
+from html import unescape as html_unescape
 from os import getenv
 from re import finditer
 from time import sleep
 from traceback import print_exc
 from urllib.parse import urlparse, quote
 
-import lxml.html as LH
+from salesloop_linkedin_api.utils import json_codec
+from salesloop_linkedin_api.utils.lead import Lead
+from salesloop_linkedin_api.utils.pacing import EvadePolicy
+from salesloop_linkedin_api.utils.session_snapshot import (
+    dump_cookies,
+    dump_headers,
+    load_cookies,
+)
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger("application")
 EVADE_MIN_TIMEOUT = float(getenv("EVADE_MIN_TIMEOUT", 2.0))
-EVADE_MAX_TIMEOUT = float(getenv("EVADE_MIN_TIMEOUT", 5.0))
+EVADE_MAX_TIMEOUT = float(getenv("EVADE_MAX_TIMEOUT", 5.0))
+
+# `<code>` blocks of html page, LinkedIn embeds html-escaped API responses into them.
+# Blocks with markup inside (e.g. html comments) are skipped, like with text-only tree lookups
+CODE_CHUNK_RE = re.compile(r"<code\b[^>]*>([^<]*)</code>")
+CODE_CHUNK_BYTES_RE = re.compile(rb"<code\b[^>]*>([^<]*)</code>")
+# Entities other than the ones escaped by LinkedIn, html.unescape is used if chunk has them
+UNCOMMON_ENTITY_RE = re.compile(r"&(?!quot;|amp;|lt;|gt;|#39;)")
 
 
 def get_random_base64(length=16):
@@ -29,21 +42,11 @@ def get_random_base64(length=16):
     return base64_message
 
 
-def default_evade():
-    """
-    A catch-all method to try and evade suspension from Linkedin.
-    Currently, just delays the request by a random (bounded) time
-    """
-    evade_delay = random.uniform(EVADE_MIN_TIMEOUT, EVADE_MAX_TIMEOUT)
-    sleep(evade_delay)
-    logger.debug("Evade delay: %s", evade_delay)
-
-def fast_evade():
-    """
-    A catch-all method to try and evade suspension from Linkedin.
-    Currently, just delays the request by a random (bounded) time
-    """
-    sleep(random.uniform(0.5, 2))
+# Catch-all policies to try and evade suspension from Linkedin.
+# Currently, they just delay the request by a random (bounded) time.
+# Linkedin requests are paced through `pacing_scheduler`, calling a policy directly still sleeps.
+default_evade = EvadePolicy(EVADE_MIN_TIMEOUT, EVADE_MAX_TIMEOUT)
+fast_evade = EvadePolicy(0.5, 2)
 
 
 def quote_query_param(data, is_sales=False, has_companies_names=False):
@@ -281,21 +284,66 @@ def get_default_regions(path):
     return regions
 
 
+def iter_code_chunks(html, markers=()):
+    """
+    Scan html page (str or bytes) for `<code>` blocks in one pass, without building a tree.
+
+    Args:
+        html: page source
+        markers: yield only chunks containing any of these strings, e.g. wanted `$type`.
+            Checked before chunk is unescaped, so markers must not contain html special chars
+
+    Returns:
+        iterator of unescaped chunks text
+    """
+    if isinstance(html, bytes):
+        pattern = CODE_CHUNK_BYTES_RE
+        markers = tuple(marker.encode() for marker in markers)
+    else:
+        pattern = CODE_CHUNK_RE
+
+    for match in pattern.finditer(html):
+        chunk = match.group(1)
+        if markers and not any(marker in chunk for marker in markers):
+            continue
+
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode("utf-8", errors="replace")
+
+        chunk = unescape_code_chunk(chunk).strip()
+        if chunk:
+            yield chunk
+
+
+def unescape_code_chunk(chunk: str) -> str:
+    if "&" not in chunk:
+        return chunk
+
+    if UNCOMMON_ENTITY_RE.search(chunk):
+        return html_unescape(chunk)
+
+    return (
+        chunk.replace("&quot;", '"')
+        .replace("&lt;", "<")
+        .replace("&gt;", ">")
+        .replace("&#39;", "'")
+        .replace("&amp;", "&")
+    )
+
+
 def get_raw_leads_from_html(html):
     raw_data = {}
     paging = {}
 
-    tree = LH.document_fromstring(html)
-    search_hits = tree.xpath("//code//text()")
-    for item in search_hits:
+    for item in iter_code_chunks(html, markers=("com.linkedin.restli.common.CollectionResponse",)):
         try:
-            data = json.loads(item)
+            data = json_codec.loads(item)
             data_type = data.get("data", {}).get("$type")
             if data_type == "com.linkedin.restli.common.CollectionResponse":
                 if data.get("data"):
                     raw_data = data.get("data")
                     paging = raw_data.get("paging")
-        except json.JSONDecodeError as e:
+        except json_codec.JSONDecodeError as e:
             print(f"Failed parse item..., {repr(e)}")
 
     return raw_data, paging
@@ -342,7 +390,43 @@ def parse_default_search_data(elements):
     return users, unknown_profiles, {}, users_order
 
 
+def get_navigation_url_public_id(navigation_url):
+    """
+    Get public id from navigation url, like https://www.linkedin.com/in/<public_id>?miniProfileUrn=...
+    """
+    return urlparse(navigation_url).path.rstrip("/").split("/")[-1]
+
+
+def index_entity_results(included):
+    """
+    Group EntityResultViewModel items of the search page by public id from their navigation url.
+
+    Lead is matched to items by its exact public id, the last segment of the navigation url
+    path. Earlier lead matched items whose navigation url contained its public id as substring,
+    so e.g. "john" lead got pictures of "john-doe" item too. Otherwise matches are the same,
+    see tests/test_entity_results.py.
+    """
+    entity_results = {}
+    for item in included:
+        if item.get("$type") != "com.linkedin.voyager.dash.search.EntityResultViewModel":
+            continue
+
+        navigation_url = item.get("navigationUrl")
+        if navigation_url:
+            public_id = get_navigation_url_public_id(navigation_url)
+            entity_results.setdefault(public_id, []).append(item)
+
+    return entity_results
+
+
 def parse_search_hits(search_hits, is_sales=False, search_start=0):
+    """
+    Parse default or sales search hits
+
+    Returns:
+        parsed users (compact `Lead` records, see utils.lead), pagination, unknown profiles
+        and limit data
+    """
     users_data = None
     users = {}
     parsed_users = []
@@ -465,57 +549,47 @@ def parse_search_hits(search_hits, is_sales=False, search_start=0):
                     logger.info("Found %d new linkedin users", len(users))
 
                 # fallback parser - elements
+                entity_results = index_entity_results(mini_profiles)
                 for key, lead in users.items():
                     try:
-                        for item in mini_profiles:
-                            item_type = item.get("$type")
-
-                            if item_type in [
-                                "com.linkedin.voyager.dash.search.EntityResultViewModel"
-                            ]:
-                                if all(
-                                    [
-                                        lead.get("publicIdentifier"),
-                                        item.get("navigationUrl"),
-                                        lead.get("publicIdentifier") in item.get("navigationUrl"),
-                                    ]
-                                ):
-                                    logger.debug(
-                                        "Fallback parser - found new user: public_id - %s, "
-                                        "navigation url - %s",
-                                        lead.get("publicIdentifier"),
-                                        item.get("navigationUrl"),
-                                    )
+                        public_id = lead.get("publicIdentifier")
+                        for item in entity_results.get(public_id, ()):
+                            logger.debug(
+                                "Fallback parser - found new user: public_id - %s, "
+                                "navigation url - %s",
+                                public_id,
+                                item.get("navigationUrl"),
+                            )
 
-                                    image_attributes = item.get("image", {}).get("attributes", [])
+                            image_attributes = item.get("image", {}).get("attributes", [])
 
-                                    if image_attributes:
-                                        vector_image = (
-                                            image_attributes[0]
-                                            .get("detailDataUnion", {})
-                                            .get("nonEntityProfilePicture", {})
-                                            .get("vectorImage")
+                            if image_attributes:
+                                vector_image = (
+                                    image_attributes[0]
+                                    .get("detailDataUnion", {})
+                                    .get("nonEntityProfilePicture", {})
+                                    .get("vectorImage")
+                                )
+
+                                if not vector_image:
+                                    logger.debug("Trying get image from fallback images")
+                                    profile_picture_urn = (
+                                        image_attributes[0]
+                                        .get("detailDataUnion", {})
+                                        .get("profilePicture")
+                                    )
+
+                                    if (
+                                        profile_picture_urn
+                                        and profile_picture_urn in fallback_profiles_images
+                                    ):
+                                        vector_image = fallback_profiles_images.get(
+                                            profile_picture_urn
                                         )
 
-                                        if not vector_image:
-                                            logger.debug("Trying get image from fallback images")
-                                            profile_picture_urn = (
-                                                image_attributes[0]
-                                                .get("detailDataUnion", {})
-                                                .get("profilePicture")
-                                            )
-
-                                            if (
-                                                profile_picture_urn
-                                                and profile_picture_urn in fallback_profiles_images
-                                            ):
-                                                vector_image = fallback_profiles_images.get(
-                                                    profile_picture_urn
-                                                )
-
-                                        if vector_image:
-                                            item["picture"] = vector_image
-                                            users[key].update(item)
+                                if vector_image:
+                                    item["picture"] = vector_image
+                                    users[key].update(item)
 
                     except Exception as e:
                         logger.warning("Failed pars %s item", lead, exc_info=e)
@@ -524,11 +598,14 @@ def parse_search_hits(search_hits, is_sales=False, search_start=0):
         if users_order:
             logger.info("Found users order, sort %d users", len(users))
             try:
+                users_by_urn = {}
+                for user_key, user_data in users.items():
+                    users_by_urn.setdefault(user_data.get("entityUrn"), []).append(user_key)
+
                 sorted_users = {}
                 for entity_urn in users_order:
-                    for user_key, user_data in users.items():
-                        if user_data.get("entityUrn") == entity_urn:
-                            sorted_users[user_key] = user_data
+                    for user_key in users_by_urn.get(entity_urn, ()):
+                        sorted_users[user_key] = users[user_key]
 
                 if len(sorted_users) == len(users):
                     logger.info("Replace users with sorted_users")
@@ -580,41 +657,14 @@ def parse_search_hits(search_hits, is_sales=False, search_start=0):
             elif lead.get("primarySubtitle") and isinstance(lead.get("primarySubtitle"), dict):
                 headline = lead.get("primarySubtitle", {}).get("text")
 
-            i = {
-                "index": index + search_start,
-                "publicIdentifier": lead.get("publicIdentifier"),
-                "firstname": lead.get("firstName"),
-                "lastname": lead.get("lastName"),
-                "fullname": fullname or "",
-                "degree": None,
-                "canSendInMail": None,
-                "headline": headline,
-                "picture": None,
-                "profileLink": None,
-                "profileLinkSN": None,
-                "location": None,
-                "position": None,
-                "companyId": None,
-                "companyName": None,
-                "companyType": None,
-                "companyIndustry": None,
-                "companyDescription": None,
-                "companyWebsite": None,
-                "companyStaffCount": None,
-                "companyCountry": None,
-                "companyGeographicArea": None,
-                "companyCity": None,
-                "companyPostalCode": None,
-                "companyLine2": None,
-                "companyLine1": None,
-                "companyFounded": None,
-                "companyFollowerCount": None,
-                "companyEmails": None,
-                "companyLink": None,
-                "companyLinkSN": None,
-                "companySlug": None,
-                "extractEmailAddress": False,
-            }
+            i = Lead(
+                index=index + search_start,
+                publicIdentifier=lead.get("publicIdentifier"),
+                firstname=lead.get("firstName"),
+                lastname=lead.get("lastName"),
+                fullname=fullname or "",
+                headline=headline,
+            )
             degree = lead.get("secondaryTitle", {}).get("text")
             degree_num = -1
             if degree:
@@ -725,40 +775,12 @@ def parse_search_hits(search_hits, is_sales=False, search_start=0):
                     logger.warning("Skip profile parsing, entityUrn identifier not found")
                     continue
 
-                i = {
-                    "publicIdentifier": lead.get("publicIdentifier"),
-                    "firstname": lead.get("firstName"),
-                    "lastname": lead.get("lastName"),
-                    "fullname": f"{lead.get('firstName')} {lead.get('lastName')}",
-                    "degree": None,
-                    "canSendInMail": None,
-                    "headline": None,
-                    "picture": None,
-                    "profileLink": None,
-                    "profileLinkSN": None,
-                    "location": None,
-                    "position": None,
-                    "companyId": None,
-                    "companyName": None,
-                    "companyType": None,
-                    "companyIndustry": None,
-                    "companyDescription": None,
-                    "companyWebsite": None,
-                    "companyStaffCount": None,
-                    "companyCountry": None,
-                    "companyGeographicArea": None,
-                    "companyCity": None,
-                    "companyPostalCode": None,
-                    "companyLine2": None,
-                    "companyLine1": None,
-                    "companyFounded": None,
-                    "companyFollowerCount": None,
-                    "companyEmails": None,
-                    "companyLink": None,
-                    "companyLinkSN": None,
-                    "companySlug": None,
-                    "extractEmailAddress": False,
-                }
+                i = Lead(
+                    publicIdentifier=lead.get("publicIdentifier"),
+                    firstname=lead.get("firstName"),
+                    lastname=lead.get("lastName"),
+                    fullname=f"{lead.get('firstName')} {lead.get('lastName')}",
+                )
 
                 memberId = str(lead["objectUrn"].replace("urn:li:member:", ""))
                 i["memberId"] = memberId
@@ -839,20 +861,17 @@ def parse_search_hits(search_hits, is_sales=False, search_start=0):
 
 
 def get_leads_from_html(html, is_sales=False):
-    tree = LH.document_fromstring(html)
-    search_hits = tree.xpath("//code//text()[string-length() > 0]")
+    search_type = "SALES_SEARCH" if is_sales else "DEFAULT_SEARCH"
+    # base string validation
+    markers = () if is_sales else ("publicIdentifier",)
+    search_hits = list(iter_code_chunks(html, markers=markers))
     logger.info("Found %d search hits", len(search_hits))
     search_hits_list = []
-    search_type = "SALES_SEARCH" if is_sales else "DEFAULT_SEARCH"
 
     for search_hit in search_hits:
-        # base string validation
-        if search_type == "DEFAULT_SEARCH" and "publicIdentifier" not in search_hit:
-            continue
-
         try:
-            search_hit_data = json.loads(search_hit)
-        except json.JSONDecodeError:
+            search_hit_data = json_codec.loads(search_hit)
+        except json_codec.JSONDecodeError:
             logger.warning("Failed load %s search hit", search_hit)
         else:
             # Validator
@@ -862,7 +881,7 @@ def get_leads_from_html(html, is_sales=False):
                 )
                 continue
 
-            search_hits_list.append(json.loads(search_hit))
+            search_hits_list.append(search_hit_data)
 
     if search_hits:
         logger.debug("Found %d search hits", len(search_hits))
@@ -878,11 +897,20 @@ def xstr(s):
 def days_hours_minutes(td):
     return f"{td.days}d. {td.seconds//3600}h. {(td.seconds//60)%60}m."
 
-def cffi_get_cookies(client):
-    return pickle.loads(client.cookies.jar._cookies)
+def cffi_get_cookies(api_cookies):
+    """
+    Cookies of session snapshot, as Cookie objects, see utils.session_snapshot
+    """
+    return load_cookies(api_cookies)
 
 def cffi_set_cookies(client):
-    return pickle.dumps(client.cookies.jar._cookies, protocol=pickle.HIGHEST_PROTOCOL)
+    """
+    Session cookies snapshot, see utils.session_snapshot
+    """
+    return dump_cookies(client)
 
 def cffi_set_headers(client):
-    return pickle.dumps(client.headers, protocol=pickle.HIGHEST_PROTOCOL)
+    """
+    Session headers snapshot, see utils.session_snapshot
+    """
+    return dump_headers(client)
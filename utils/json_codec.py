@@ -0,0 +1,59 @@
+"""
+JSON decoding of LinkedIn payloads, with the fastest available backend
+"""
+import json
+import time
+
+from salesloop_linkedin_api.settings import JSON_BACKEND
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# orjson.JSONDecodeError is subclass of json.JSONDecodeError
+JSONDecodeError = json.JSONDecodeError
+
+# Available decode functions, both accept str and bytes
+BACKENDS = {"json": json.loads}
+if orjson is not None:
+    BACKENDS["orjson"] = orjson.loads
+
+
+def get_backend_name(backend: str = JSON_BACKEND) -> str:
+    """
+    Returns:
+        backend name, "auto" is resolved to the fastest available backend
+    """
+    if backend == "auto":
+        return "orjson" if "orjson" in BACKENDS else "json"
+
+    if backend not in BACKENDS:
+        raise ValueError(f"JSON backend {backend} is not available")
+
+    return backend
+
+
+_loads = BACKENDS[get_backend_name()]
+
+
+def loads(data):
+    """
+    Decode JSON document (bytes or str)
+    """
+    return _loads(data)
+
+
+def response_json(response):
+    """
+    Decode JSON response body from raw bytes, without decoding it to str first.
+    Decode time is reported to request hooks of the response request record, if any.
+    """
+    record = getattr(response, "request_record", None)
+    if record is None:
+        return loads(response.content)
+
+    started = time.perf_counter()
+    data = loads(response.content)
+    record.parsed(time.perf_counter() - started)
+    return data
@@ -0,0 +1,158 @@
+from collections.abc import MutableMapping
+
+# Parsed search lead fields and their defaults, most of them are never filled by search parsers
+LEAD_DEFAULTS = {
+    "publicIdentifier": None,
+    "firstname": None,
+    "lastname": None,
+    "fullname": None,
+    "degree": None,
+    "canSendInMail": None,
+    "headline": None,
+    "picture": None,
+    "profileLink": None,
+    "profileLinkSN": None,
+    "location": None,
+    "position": None,
+    "companyId": None,
+    "companyName": None,
+    "companyType": None,
+    "companyIndustry": None,
+    "companyDescription": None,
+    "companyWebsite": None,
+    "companyStaffCount": None,
+    "companyCountry": None,
+    "companyGeographicArea": None,
+    "companyCity": None,
+    "companyPostalCode": None,
+    "companyLine2": None,
+    "companyLine1": None,
+    "companyFounded": None,
+    "companyFollowerCount": None,
+    "companyEmails": None,
+    "companyLink": None,
+    "companyLinkSN": None,
+    "companySlug": None,
+    "extractEmailAddress": False,
+}
+
+
+# Lead field is not set or deleted
+_UNSET = object()
+_DELETED = object()
+
+
+def lead_dict(**fields) -> dict:
+    """
+    Parsed search lead as plain dict, "index" (search result position) is the first key
+    """
+    lead = {"index": fields.pop("index")} if "index" in fields else {}
+    lead.update(LEAD_DEFAULTS)
+    lead.update(fields)
+    return lead
+
+
+class Lead(MutableMapping):
+    """
+    Compact parsed search lead record, emitted by search parsers, with the same keys
+    and key order as `lead_dict`.
+
+    Fields are stored in slots, fields which aren't set fall back to LEAD_DEFAULTS, so thousands
+    of leads don't need a dict with 35+ keys each. Lead works as a mapping (`lead["firstname"]`,
+    `lead.get("entityUrn")`, `lead["tags"] = ""`), unknown keys are stored in a separate dict.
+    Plain dict is built by `to_dict` only when lead leaves the package, e.g. is serialized.
+    """
+
+    # Fields missing in LEAD_DEFAULTS are set only by some parsers, they are missing until set
+    FIELDS = (
+        ("index",)
+        + tuple(LEAD_DEFAULTS)
+        + ("memberId", "inCrm", "tags", "entityUrn", "ln_auth_token")
+    )
+
+    __slots__ = FIELDS + ("_extra",)
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    def _field(self, key):
+        value = getattr(self, key, _UNSET)
+        if value is _UNSET:
+            return LEAD_DEFAULTS.get(key, _UNSET)
+        if value is _DELETED:
+            return _UNSET
+
+        return value
+
+    def get(self, key, default=None):
+        # Mapping.get is inlined, it's called for each field in the parsers hot loop
+        if key in LEAD_FIELDS:
+            value = getattr(self, key, _UNSET)
+            if value is _UNSET:
+                return LEAD_DEFAULTS.get(key, default)
+            if value is _DELETED:
+                return default
+
+            return value
+
+        extra = getattr(self, "_extra", None)
+        return extra.get(key, default) if extra is not None else default
+
+    def __getitem__(self, key):
+        value = self.get(key, _UNSET)
+        if value is _UNSET:
+            raise KeyError(key)
+
+        return value
+
+    def __setitem__(self, key, value):
+        if key in LEAD_FIELDS:
+            setattr(self, key, value)
+        elif hasattr(self, "_extra"):
+            self._extra[key] = value
+        else:
+            self._extra = {key: value}
+
+    def __delitem__(self, key):
+        # Ensure key exists
+        self[key]
+
+        if key in LEAD_FIELDS:
+            setattr(self, key, _DELETED)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        return self.get(key, _UNSET) is not _UNSET
+
+    def __iter__(self):
+        for key in self.FIELDS:
+            if self._field(key) is not _UNSET:
+                yield key
+
+        yield from getattr(self, "_extra", ())
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> dict:
+        lead = {}
+        for key in self.FIELDS:
+            value = self._field(key)
+            if value is not _UNSET:
+                lead[key] = value
+
+        lead.update(getattr(self, "_extra", {}))
+        return lead
+
+    # dict methods used by callers of search parsers, JSON encoders with `__json__` support
+    # (kombu) serialize lead as dict
+    copy = to_dict
+    __json__ = to_dict
+
+    def __repr__(self):
+        return f"Lead({self.to_dict()!r})"
+
+
+LEAD_FIELDS = frozenset(Lead.FIELDS)
@@ -0,0 +1,422 @@
+"""
+Instrumentation of Linkedin client requests.
+
+Each `_fetch`/`_post` call creates a `RequestRecord` with time spent in evade delay,
+in network (all tries) and backoff retries. Records are passed to request hooks when request
+is finished, response parse time is reported separately, when response JSON is decoded.
+
+`RequestMetrics` hook keeps HDR-style histograms per endpoint (and per account, if enabled),
+they can be exported as Prometheus text or pushed to redis and exported from all processes.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import Counter
+
+from redis import RedisError
+
+from salesloop_linkedin_api.settings import (
+    REQUEST_METRICS_ACCOUNT_LABEL,
+    REQUEST_METRICS_BACKEND,
+    REQUEST_METRICS_PUSH_INTERVAL,
+    REQUEST_METRICS_TTL,
+)
+from salesloop_linkedin_api.statistic import APIRequestType, get_redis_connection
+
+logger = logging.getLogger("application")
+
+METRICS_PREFIX = "linkedin_api"
+REDIS_KEY_PREFIX = "ln.api.metrics"
+QUANTILES = (0.5, 0.9, 0.99)
+LABELS = ("account", "method", "request_type", "endpoint")
+
+
+class Histogram:
+    """
+    Log-linear histogram, like HdrHistogram. Values are stored as integer `unit`s, values above
+    2 ** SUB_BUCKET_BITS are rounded down to SUB_BUCKET_BITS significant bits (< 1% error),
+    so memory is bounded by value range, not by amount of values.
+    """
+
+    SUB_BUCKET_BITS = 7
+
+    def __init__(self, unit: float = 1.0):
+        self.unit = unit
+        self.counts = Counter()
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def bucket(cls, value: int) -> int:
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS
+        if shift <= 0:
+            return value
+
+        return (value >> shift) << shift
+
+    def record(self, value: float):
+        self.counts[self.bucket(max(int(value / self.unit), 0))] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        if q >= 1:
+            return self.max
+
+        rank = q * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(max(bucket * self.unit, self.min), self.max)
+
+        return self.max
+
+    def merge(self, other: "Histogram"):
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.sum += other.sum
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def to_dict(self) -> dict:
+        return {
+            "unit": self.unit,
+            "counts": list(self.counts.items()),
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Histogram":
+        histogram = cls(data["unit"])
+        histogram.counts.update(dict(data["counts"]))
+        histogram.count = data["count"]
+        histogram.sum = data["sum"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class RequestRecord:
+    """
+    Timings and sizes of one `_fetch`/`_post` call, times are in seconds
+    """
+
+    __slots__ = (
+        "method",
+        "url",
+        "account",
+        "request_type",
+        "endpoint",
+        "status_code",
+        "bytes",
+        "evade_time",
+        "network_time",
+        "retries",
+        "error",
+        "hooks",
+    )
+
+    def __init__(self, method, url, account, hooks=()):
+        self.method = method
+        self.url = url
+        self.account = account
+        self.request_type, self.endpoint = APIRequestType.get_request_endpoint(url)
+        self.status_code = None
+        self.bytes = 0
+        self.evade_time = 0.0
+        self.network_time = 0.0
+        self.retries = 0
+        self.error = None
+        self.hooks = hooks
+
+    @property
+    def labels(self) -> tuple:
+        return str(self.account), self.method, self.request_type, self.endpoint
+
+    def response_received(self, response):
+        self.status_code = response.status_code
+        self.bytes = len(response.content or b"")
+
+    def retried(self, details):
+        """
+        backoff on_backoff handler
+        """
+        self.retries += 1
+
+    def finished(self, error=None):
+        self.error = error
+        for hook in self.hooks:
+            try:
+                hook.on_request(self)
+            except Exception as e:
+                logger.warning("Request hook %r failed", hook, exc_info=e)
+
+    def parsed(self, parse_time: float):
+        for hook in self.hooks:
+            try:
+                hook.on_parse(self, parse_time)
+            except Exception as e:
+                logger.warning("Request hook %r failed", hook, exc_info=e)
+
+
+class RequestHook:
+    """
+    Base request hook, override methods to receive finished requests
+    """
+
+    def on_request(self, record: RequestRecord):
+        pass
+
+    def on_parse(self, record: RequestRecord, parse_time: float):
+        pass
+
+    def flush(self):
+        pass
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: tuple, **extra) -> str:
+    pairs = list(zip(LABELS, labels)) + list(extra.items())
+    # Unset labels, e.g. account of metrics without account label, aren't exported
+    return ",".join(
+        f'{name}="{_escape_label(value)}"' for name, value in pairs if value is not None
+    )
+
+
+class RequestMetrics(RequestHook):
+    """
+    Histograms of requests evade, network and parse times and response sizes, counters of
+    requests by status and of backoff retries. Labeled by method, request type and endpoint,
+    and by account with `account_label`: series of every account seen by the process are
+    kept until `reset`.
+
+    If `rds` is set, histograms of the process are pushed to redis every `push_interval`
+    seconds and on `flush`, use `from_redis` to merge histograms of all processes.
+    """
+
+    HISTOGRAMS = {
+        "request_evade_seconds": 1e-6,
+        "request_network_seconds": 1e-6,
+        "response_parse_seconds": 1e-6,
+        "response_bytes": 1,
+    }
+
+    def __init__(
+        self,
+        rds=None,
+        push_interval=REQUEST_METRICS_PUSH_INTERVAL,
+        ttl=REQUEST_METRICS_TTL,
+        account_label=REQUEST_METRICS_ACCOUNT_LABEL,
+    ):
+        self.rds = rds
+        self.push_interval = push_interval
+        self.ttl = ttl
+        self.account_label = account_label
+        self.redis_key = f"{REDIS_KEY_PREFIX}:{socket.gethostname()}:{os.getpid()}"
+
+        # (metric name, labels) -> Histogram or counter value
+        self.histograms = {}
+        self.counters = Counter()
+        self._last_push = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _record(self, name, labels, value):
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.HISTOGRAMS[name])
+
+        histogram.record(value)
+
+    def _labels(self, record: RequestRecord) -> tuple:
+        labels = record.labels
+        return labels if self.account_label else (None,) + labels[1:]
+
+    def on_request(self, record: RequestRecord):
+        labels = self._labels(record)
+        status = record.status_code if record.status_code is not None else "error"
+        with self._lock:
+            self._record("request_evade_seconds", labels, record.evade_time)
+            self._record("request_network_seconds", labels, record.network_time)
+            if record.status_code is not None:
+                self._record("response_bytes", labels, record.bytes)
+
+            self.counters[("requests_total", labels + (str(status),))] += 1
+            if record.retries:
+                self.counters[("request_retries_total", labels)] += record.retries
+
+            push_needed = self.rds is not None and (
+                time.monotonic() - self._last_push >= self.push_interval
+            )
+
+        if push_needed:
+            self.push()
+
+    def on_parse(self, record: RequestRecord, parse_time: float):
+        with self._lock:
+            self._record("response_parse_seconds", self._labels(record), parse_time)
+
+    def flush(self):
+        if self.rds is not None:
+            self.push()
+
+    def histogram(self, name, account, method, request_type, endpoint):
+        account = account if self.account_label else None
+        return self.histograms.get((name, (account, method, request_type, endpoint)))
+
+    def reset(self) -> "RequestMetrics":
+        """
+        Drop all series, e.g. after they are exported, to start new ones
+
+        Returns:
+            metrics with dropped series
+        """
+        previous = RequestMetrics(account_label=self.account_label)
+        with self._lock:
+            previous.histograms, self.histograms = self.histograms, {}
+            previous.counters, self.counters = self.counters, Counter()
+
+        return previous
+
+    def merge(self, other: "RequestMetrics"):
+        with self._lock:
+            for key, histogram in other.histograms.items():
+                if key in self.histograms:
+                    self.histograms[key].merge(histogram)
+                else:
+                    self.histograms[key] = Histogram.from_dict(histogram.to_dict())
+
+            self.counters.update(other.counters)
+
+    def to_json(self) -> str:
+        with self._lock:
+            return json.dumps(
+                {
+                    "histograms": [
+                        [name, labels, histogram.to_dict()]
+                        for (name, labels), histogram in self.histograms.items()
+                    ],
+                    "counters": [
+                        [name, labels, value] for (name, labels), value in self.counters.items()
+                    ],
+                }
+            )
+
+    @classmethod
+    def from_json(cls, data: str) -> "RequestMetrics":
+        snapshot = json.loads(data)
+        metrics = cls()
+        for name, labels, histogram in snapshot["histograms"]:
+            metrics.histograms[(name, tuple(labels))] = Histogram.from_dict(histogram)
+        for name, labels, value in snapshot["counters"]:
+            metrics.counters[(name, tuple(labels))] = value
+
+        return metrics
+
+    def push(self):
+        """
+        Save histograms snapshot of the process to redis
+        """
+        with self._lock:
+            self._last_push = time.monotonic()
+
+        try:
+            self.rds.set(self.redis_key, self.to_json(), ex=self.ttl)
+        except RedisError as e:
+            logger.warning(f"Can't push requests metrics to redis: {e}")
+
+    @classmethod
+    def from_redis(cls, rds) -> "RequestMetrics":
+        """
+        Merged histograms of all processes, which pushed them to redis
+        """
+        metrics = cls()
+        for key in rds.scan_iter(match=f"{REDIS_KEY_PREFIX}:*"):
+            data = rds.get(key)
+            if data:
+                metrics.merge(cls.from_json(data))
+
+        return metrics
+
+    def prometheus_text(self) -> str:
+        """
+        Metrics in Prometheus text exposition format, histograms are exported as summaries
+        """
+        lines = []
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+
+        current_name = None
+        for (name, labels), histogram in histograms:
+            metric = f"{METRICS_PREFIX}_{name}"
+            if name != current_name:
+                lines.append(f"# TYPE {metric} summary")
+                current_name = name
+
+            for q in QUANTILES:
+                lines.append(
+                    f"{metric}{{{_format_labels(labels, quantile=q)}}} {histogram.quantile(q)}"
+                )
+            lines.append(f"{metric}_sum{{{_format_labels(labels)}}} {histogram.sum}")
+            lines.append(f"{metric}_count{{{_format_labels(labels)}}} {histogram.count}")
+
+        for (name, labels), value in counters:
+            metric = f"{METRICS_PREFIX}_{name}"
+            if name != current_name:
+                lines.append(f"# TYPE {metric} counter")
+                current_name = name
+
+            if name == "requests_total":
+                labels, status = labels[:-1], labels[-1]
+                lines.append(f"{metric}{{{_format_labels(labels, status=status)}}} {value}")
+            else:
+                lines.append(f"{metric}{{{_format_labels(labels)}}} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+_request_metrics = None
+_request_metrics_lock = threading.Lock()
+
+
+def get_request_metrics():
+    """
+    Requests metrics shared by Linkedin instances of the process, based on REQUEST_METRICS_BACKEND.
+    None is returned if metrics are disabled.
+    """
+    global _request_metrics
+
+    if REQUEST_METRICS_BACKEND == "none":
+        return None
+
+    if _request_metrics is None:
+        with _request_metrics_lock:
+            if _request_metrics is None:
+                rds = get_redis_connection() if REQUEST_METRICS_BACKEND == "redis" else None
+                _request_metrics = RequestMetrics(rds)
+
+    return _request_metrics
+
+
+def get_default_request_hooks() -> list:
+    metrics = get_request_metrics()
+    return [metrics] if metrics is not None else []
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger("application")
+
+
+class EvadePolicy:
+    """
+    Random (bounded) delay between two requests of the same account.
+    Calling the policy sleeps for a random delay, like the old sleep-based evade functions.
+    """
+
+    def __init__(self, min_delay: float, max_delay: float):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+
+    def delay(self) -> float:
+        return random.uniform(self.min_delay, self.max_delay)
+
+    def __call__(self):
+        time.sleep(self.delay())
+
+    def __repr__(self):
+        return f"EvadePolicy({self.min_delay}, {self.max_delay})"
+
+
+class RetryDeferred(Exception):
+    """
+    Request failed with retryable error and isn't retried in place, the caller retries it
+    after the account is deferred (see AccountPool)
+    """
+
+    def __init__(self, error, max_time: float):
+        super().__init__(f"Request retry is deferred after {error!r}")
+        self.error = error
+        self.max_time = max_time
+
+
+class PacingScheduler:
+    """
+    Keeps "busy until" time per account: the last reserved request slot or the time the
+    account's last request was completed, whichever is later.
+
+    Each request slot is a random delay from the evade policy after the account's busy
+    time (or after now, if the account is idle), so every request, including the first one,
+    keeps the anti-detection spacing from the end of the previous request, while the caller
+    is free to do something else (e.g. serve another account) until the slot is reached.
+    Requests are marked completed with `complete`.
+    """
+
+    def __init__(self):
+        self._busy_until = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, account, policy: EvadePolicy) -> float:
+        """
+        Reserve next request slot for the account
+
+        Returns:
+            seconds to wait before the request can be sent
+        """
+        delay = policy.delay()
+        now = time.monotonic()
+        with self._lock:
+            slot = max(now, self._busy_until.get(account, now)) + delay
+            self._busy_until[account] = slot
+
+        return slot - now
+
+    def complete(self, account):
+        """
+        Mark request of the account completed, next slots are spaced from now
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._busy_until[account] = max(now, self._busy_until.get(account, now))
+
+    def defer(self, account, delay: float):
+        """
+        Push busy time of the account by `delay` seconds
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._busy_until[account] = max(now, self._busy_until.get(account, now)) + delay
+
+        logger.debug("Account %s deferred by %.2f seconds", account, delay)
+
+    def next_allowed_in(self, account) -> float:
+        """
+        Seconds left until the account is idle, 0 if it's idle now. Next request slot is
+        an evade delay after it.
+        """
+        with self._lock:
+            busy_until = self._busy_until.get(account)
+
+        if busy_until is None:
+            return 0.0
+
+        return max(0.0, busy_until - time.monotonic())
+
+    def wait(self, account, policy: EvadePolicy) -> float:
+        delay = self.reserve(account, policy)
+        if delay > 0:
+            logger.debug("Evade delay: %s", delay)
+            time.sleep(delay)
+
+        return delay
+
+    async def async_wait(self, account, policy: EvadePolicy) -> float:
+        delay = self.reserve(account, policy)
+        if delay > 0:
+            logger.debug("Evade delay: %s", delay)
+            await asyncio.sleep(delay)
+
+        return delay
+
+
+# Shared by all Linkedin instances of the process, so tasks of the same account are paced together
+pacing_scheduler = PacingScheduler()
@@ -0,0 +1,172 @@
+import json
+import logging
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+logger = logging.getLogger("application")
+
+# Saved pagination cursors expire in 1 day
+CURSOR_TTL = 60 * 60 * 24
+
+
+class PagedIterator:
+    """
+    Lazily fetches pages of results and yields their elements as each page arrives.
+
+    `fetch_page(start, count)` must return `(elements, paging)`, where `paging` is
+    LinkedIn paging dict (or None). Paging `total` is available in `total` attribute
+    once the first page is fetched.
+
+    Elements are counted before `transform`, elements transformed to None are skipped.
+    """
+
+    def __init__(
+        self,
+        fetch_page,
+        page_size,
+        limit=-1,
+        offset=0,
+        max_repeated_requests=None,
+        transform=None,
+    ):
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.limit = -1 if limit is None else limit
+        self.offset = offset
+        self.max_repeated_requests = max_repeated_requests
+        self.transform = transform
+
+        self.total = None
+        self.results_count = 0
+        self._count = page_size
+        self._done = False
+        self._elements = None
+
+    def _next_page_args(self):
+        if self.limit > -1 and self.limit - self.results_count < self._count:
+            self._count = self.limit - self.results_count
+
+        return self.results_count + self.offset, self._count
+
+    def _page_fetched(self, elements, paging):
+        """
+        Count new elements and check we're done searching
+
+        Returns:
+            elements to yield
+        """
+        if paging and paging.get("total") is not None:
+            self.total = paging["total"]
+
+        self.results_count += len(elements)
+
+        if (
+            (self.limit > -1 and self.results_count >= self.limit)  # results exceed set limit
+            or (
+                self.max_repeated_requests
+                and self.results_count / self._count >= self.max_repeated_requests
+            )
+        ) or len(elements) == 0:
+            self._done = True
+        else:
+            logger.debug(f"results grew to {self.results_count}")
+
+        if self.transform is None:
+            return elements
+
+        return [item for item in map(self.transform, elements) if item is not None]
+
+    def _iter_elements(self):
+        while not self._done:
+            elements, paging = self.fetch_page(*self._next_page_args())
+            yield from self._page_fetched(elements, paging)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._elements is None:
+            self._elements = self._iter_elements()
+
+        return next(self._elements)
+
+
+class AsyncPagedIterator(PagedIterator):
+    """
+    Asyncio flavour of `PagedIterator`, `fetch_page` is a coroutine function
+    """
+
+    async def _iter_elements(self):
+        while not self._done:
+            elements, paging = await self.fetch_page(*self._next_page_args())
+            for element in self._page_fetched(elements, paging):
+                yield element
+
+    def __iter__(self):
+        raise TypeError("Use 'async for' with AsyncPagedIterator")
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._elements is None:
+            self._elements = self._iter_elements()
+
+        return await self._elements.__anext__()
+
+
+@dataclass
+class PaginationCursor:
+    """
+    Position of a paginated crawl: next page start offset, last entity seen and amount of
+    results yielded so far. Can be saved to redis, to resume a crawl from the last page.
+    """
+
+    start: int = 0
+    last_entity: Optional[str] = None
+    yielded: int = 0
+
+    def new_elements(self, elements: list, entity_key) -> list:
+        """
+        Skip elements up to the last entity seen, they are repeated if the list shifted
+        (e.g. new connection was added) since previous page
+        """
+        if self.last_entity is None:
+            return elements
+
+        for i, element in enumerate(elements):
+            if entity_key(element) == self.last_entity:
+                return elements[i + 1 :]
+
+        return elements
+
+    def advance(self, elements: list, entity_key):
+        self.start += len(elements)
+        if elements:
+            self.last_entity = entity_key(elements[-1])
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, data: str) -> "PaginationCursor":
+        return cls(**json.loads(data))
+
+    def save(self, rds, key, ttl=CURSOR_TTL):
+        rds.set(key, self.to_json(), ex=ttl)
+
+    @classmethod
+    def load(cls, rds, key) -> "PaginationCursor":
+        """
+        Load saved cursor, new cursor is returned if nothing is saved
+        """
+        data = rds.get(key)
+        if not data:
+            return cls()
+
+        logger.info(f"Resume pagination from saved cursor {key}: {data}")
+        return cls.from_json(data)
+
+    @staticmethod
+    def delete(rds, key):
+        rds.delete(key)
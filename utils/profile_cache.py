@@ -0,0 +1,193 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from redis import RedisError
+
+from salesloop_linkedin_api.settings import (
+    PROFILE_CACHE_BACKEND,
+    PROFILE_CACHE_LRU_SIZE,
+    PROFILE_CACHE_MISSING_TTL,
+    PROFILE_CACHE_TTLS,
+)
+from salesloop_linkedin_api.statistic import get_redis_connection
+from salesloop_linkedin_api.utils.helpers import get_id_from_urn
+
+logger = logging.getLogger("application")
+
+# Cached "profile not found" (404) record
+MISSING = {"$missing": True}
+
+
+class LRUCacheBackend:
+    """
+    In-process cache backend, values are evicted after ttl or when cache is full
+    """
+
+    def __init__(self, maxsize=PROFILE_CACHE_LRU_SIZE):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return None
+
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+
+class RedisCacheBackend:
+    """
+    Redis cache backend, shared by all processes. Cache isn't required for requests,
+    so read errors are cache misses and write errors are just logged.
+    """
+
+    def __init__(self, rds):
+        self.rds = rds
+
+    def get(self, key):
+        try:
+            return self.rds.get(key)
+        except RedisError as e:
+            logger.warning(f"Can't read {key} from cache: {e}")
+            return None
+
+    def set(self, key, value, ttl):
+        try:
+            self.rds.set(key, value, ex=int(ttl))
+        except RedisError as e:
+            logger.warning(f"Can't cache {key}: {e}")
+
+    def delete(self, key):
+        try:
+            self.rds.delete(key)
+        except RedisError as e:
+            logger.warning(f"Can't delete {key} from cache: {e}")
+
+
+class ProfileCache:
+    """
+    Cache of profile records, grouped by requested data (e.g. "profile", "cards").
+
+    Records are stored by both public identifier and fsd_profile URN (when known), each group
+    has its own TTL. Not found profiles are cached as `MISSING` for `missing_ttl` seconds.
+
+    Normalised records (e.g. "profile_data") are shared by all accounts. Records of
+    `VIEWER_GROUPS` depend on the account viewing the profile (connection distance,
+    memberRelationship of raw responses), they are cached per `viewer` account and
+    aren't cached at all without it.
+    """
+
+    KEY_PREFIX = "ln.api.profile"
+    VIEWER_GROUPS = frozenset({"profile", "cards", "network_info"})
+
+    def __init__(self, backend, ttls=PROFILE_CACHE_TTLS, missing_ttl=PROFILE_CACHE_MISSING_TTL):
+        self.backend = backend
+        self.ttls = ttls
+        self.missing_ttl = missing_ttl
+
+    @staticmethod
+    def normalize_public_id(public_id: str) -> str:
+        return public_id.strip().strip("/").lower()
+
+    @staticmethod
+    def normalize_urn(urn: str) -> str:
+        if urn.startswith("urn:"):
+            return get_id_from_urn(urn)
+
+        return urn.strip()
+
+    def _keys(self, group, public_id=None, urn=None, viewer=None) -> list:
+        prefix = f"{self.KEY_PREFIX}:{group}"
+        if group in self.VIEWER_GROUPS:
+            if viewer is None:
+                return []
+            prefix = f"{prefix}:viewer:{viewer}"
+
+        keys = []
+        if public_id:
+            public_id = self.normalize_public_id(public_id)
+            keys.append(f"{prefix}:public_id:{public_id}")
+        if urn:
+            urn = self.normalize_urn(urn)
+            keys.append(f"{prefix}:urn:{urn}")
+
+        return keys
+
+    def get(self, group, public_id=None, urn=None, viewer=None):
+        """
+        Returns:
+            cached record, `MISSING` for not found profile or None if nothing is cached
+        """
+        for key in self._keys(group, public_id=public_id, urn=urn, viewer=viewer):
+            value = self.backend.get(key)
+            if value is not None:
+                return json.loads(value)
+
+        return None
+
+    def set(self, group, record, public_id=None, urn=None, ttl=None, viewer=None):
+        value = json.dumps(record)
+        for key in self._keys(group, public_id=public_id, urn=urn, viewer=viewer):
+            self.backend.set(key, value, ttl or self.ttls[group])
+
+    def set_missing(self, group, public_id=None, urn=None, viewer=None):
+        self.set(
+            group, MISSING, public_id=public_id, urn=urn, ttl=self.missing_ttl, viewer=viewer
+        )
+
+    def delete(self, group, public_id=None, urn=None, viewer=None):
+        for key in self._keys(group, public_id=public_id, urn=urn, viewer=viewer):
+            self.backend.delete(key)
+
+    @staticmethod
+    def is_missing(record) -> bool:
+        return record == MISSING
+
+
+_default_profile_cache = None
+_default_profile_cache_lock = threading.Lock()
+
+
+def get_default_profile_cache():
+    """
+    Profile cache shared by Linkedin instances of the process, based on PROFILE_CACHE_BACKEND.
+    None is returned if cache is disabled.
+    """
+    global _default_profile_cache
+
+    if PROFILE_CACHE_BACKEND == "none":
+        return None
+
+    if _default_profile_cache is None:
+        with _default_profile_cache_lock:
+            if _default_profile_cache is None:
+                if PROFILE_CACHE_BACKEND == "lru":
+                    backend = LRUCacheBackend()
+                else:
+                    backend = RedisCacheBackend(get_redis_connection())
+
+                _default_profile_cache = ProfileCache(backend)
+
+    return _default_profile_cache
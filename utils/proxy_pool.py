@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from salesloop_linkedin_api.settings import (
+    PROXY_POOL_CHECK_TIMEOUT,
+    PROXY_POOL_CHECK_URL,
+    PROXY_POOL_EWMA_ALPHA,
+    PROXY_POOL_MAX_FAILURES,
+    PROXY_POOL_UNHEALTHY_TTL,
+)
+
+logger = logging.getLogger("application")
+
+
+class NoHealthyProxy(Exception):
+    pass
+
+
+def get_proxy_url(proxies: dict) -> str:
+    return next(iter(proxies.values()))
+
+
+class ProxyState:
+    """
+    Proxy health: EWMAs of requests latency and errors rate, consecutive errors
+    """
+
+    __slots__ = ("proxies", "latency", "error_rate", "failures", "unhealthy_until", "accounts")
+
+    def __init__(self, proxies):
+        self.proxies = proxies
+        self.latency = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.unhealthy_until = 0.0
+        self.accounts = set()
+
+    def is_healthy(self, now=None) -> bool:
+        return (now or time.monotonic()) >= self.unhealthy_until
+
+    def score(self) -> float:
+        """
+        Lower is better, errors rate makes proxy up to 5 times slower
+        """
+        return (self.latency or 0.0) * (1 + 4 * self.error_rate)
+
+    def to_dict(self) -> dict:
+        return {
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "failures": self.failures,
+            "healthy": self.is_healthy(),
+            "accounts": len(self.accounts),
+        }
+
+
+class ProxyPool:
+    """
+    Proxies shared by accounts of the process, with health scoring.
+
+    Account is assigned to a proxy and keeps it (sticky assignment), while the proxy is
+    healthy: LinkedIn sees the account session from the same IP. Account is assigned to its
+    stored proxy (`preferred`), if it's a healthy proxy of the pool, so assignment survives
+    process restarts. Other accounts are assigned to the healthy proxy with the least accounts,
+    then the lowest latency and errors rate.
+
+    Proxy is marked unhealthy for `unhealthy_ttl` seconds after `max_failures` consecutive
+    network errors, its accounts are moved to other proxies. After `unhealthy_ttl` the proxy
+    is tried again, one more error marks it unhealthy again.
+
+        pool = ProxyPool([{"https": proxy_url_1}, {"https": proxy_url_2}])
+        pool.check_health()
+        api = Linkedin(username, None, proxies=stored_proxies, proxy_pool=pool, ...)
+    """
+
+    def __init__(
+        self,
+        proxies,
+        alpha=PROXY_POOL_EWMA_ALPHA,
+        max_failures=PROXY_POOL_MAX_FAILURES,
+        unhealthy_ttl=PROXY_POOL_UNHEALTHY_TTL,
+    ):
+        if not proxies:
+            raise ValueError("Proxy pool needs at least one proxy")
+
+        self.alpha = alpha
+        self.max_failures = max_failures
+        self.unhealthy_ttl = unhealthy_ttl
+        self._proxies = {get_proxy_url(item): ProxyState(item) for item in proxies}
+        self._assignments = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._proxies)
+
+    def assign(self, account, preferred=None) -> dict:
+        """
+        Args:
+            account: account key
+            preferred: stored proxies of the account, used if account isn't assigned yet
+
+        Returns:
+            proxies of the account, assigned proxy is kept while it's healthy
+        """
+        with self._lock:
+            now = time.monotonic()
+            proxy_url = self._assignments.get(account)
+            if proxy_url is not None and self._proxies[proxy_url].is_healthy(now):
+                return self._proxies[proxy_url].proxies
+
+            candidates = [state for state in self._proxies.values() if state.is_healthy(now)]
+            if not candidates:
+                raise NoHealthyProxy(f"All {len(self._proxies)} proxies are unhealthy")
+
+            state = self._proxies.get(get_proxy_url(preferred)) if preferred else None
+            if proxy_url is not None or state is None or not state.is_healthy(now):
+                state = min(candidates, key=lambda state: (len(state.accounts), state.score()))
+            if proxy_url is not None:
+                self._proxies[proxy_url].accounts.discard(account)
+                logger.info(
+                    "Account %s proxy %s is unhealthy, switch to %s",
+                    account,
+                    proxy_url,
+                    get_proxy_url(state.proxies),
+                )
+
+            state.accounts.add(account)
+            self._assignments[account] = get_proxy_url(state.proxies)
+            return state.proxies
+
+    def unassign(self, account):
+        with self._lock:
+            proxy_url = self._assignments.pop(account, None)
+            if proxy_url is not None:
+                self._proxies[proxy_url].accounts.discard(account)
+
+    def is_healthy(self, proxies) -> bool:
+        state = self._proxies.get(get_proxy_url(proxies))
+        return state is not None and state.is_healthy()
+
+    def report_success(self, proxies, latency):
+        state = self._proxies.get(get_proxy_url(proxies))
+        if state is None:
+            return
+
+        with self._lock:
+            state.latency = (
+                latency
+                if state.latency is None
+                else self.alpha * latency + (1 - self.alpha) * state.latency
+            )
+            state.error_rate *= 1 - self.alpha
+            state.failures = 0
+
+    def report_error(self, proxies):
+        """
+        Returns:
+            True, if proxy is marked unhealthy
+        """
+        proxy_url = get_proxy_url(proxies)
+        state = self._proxies.get(proxy_url)
+        if state is None:
+            return False
+
+        with self._lock:
+            state.error_rate = self.alpha + (1 - self.alpha) * state.error_rate
+            state.failures += 1
+            if state.failures < self.max_failures:
+                return False
+
+            # After unhealthy_ttl proxy gets one more try
+            state.failures = self.max_failures - 1
+            state.unhealthy_until = time.monotonic() + self.unhealthy_ttl
+
+        logger.warning(
+            "Proxy %s is unhealthy for %.0f seconds, errors rate %.2f",
+            proxy_url,
+            self.unhealthy_ttl,
+            state.error_rate,
+        )
+        return True
+
+    def check_health(self, url=PROXY_POOL_CHECK_URL, timeout=PROXY_POOL_CHECK_TIMEOUT) -> dict:
+        """
+        Check all proxies in parallel, e.g. before accounts are assigned, so dead proxies are
+        marked unhealthy and latency of live proxies is known. It's a health check only, check
+        sessions are closed: connections aren't prewarmed for accounts, client sessions keep
+        curl handle per thread, so connection of a check thread can't be reused by them.
+
+        Returns:
+            proxy url -> proxy health
+        """
+        from curl_cffi.requests import Session
+        from curl_cffi.requests.exceptions import RequestsException
+
+        def check(state):
+            with Session(proxies=state.proxies) as session:
+                for _ in range(self.max_failures):
+                    started = time.perf_counter()
+                    try:
+                        session.head(url, timeout=timeout)
+                    except RequestsException as e:
+                        logger.debug("Proxy %s check failed: %s", get_proxy_url(state.proxies), e)
+                        if self.report_error(state.proxies):
+                            return
+                    else:
+                        self.report_success(state.proxies, time.perf_counter() - started)
+                        return
+
+        states = list(self._proxies.values())
+        with ThreadPoolExecutor(max_workers=len(states), thread_name_prefix="proxy-check") as e:
+            list(e.map(check, states))
+
+        return self.stats()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {proxy_url: state.to_dict() for proxy_url, state in self._proxies.items()}
@@ -0,0 +1,243 @@
+"""
+Requests quota of accounts, enforced in Linkedin `_fetch`/`_post`: a token is taken
+before each request attempt, including backoff retries.
+
+Each account has a token bucket per request type. Bucket capacity is the daily limit
+of the request type from `get_account_requests_limits`, tokens are refilled continuously,
+so the whole daily budget is refilled in 24 hours.
+"""
+import asyncio
+import logging
+import threading
+import time
+
+from redis import RedisError
+
+from salesloop_linkedin_api.settings import (
+    QUOTA_BACKEND,
+    QUOTA_MAX_WAIT,
+    QUOTA_POLICY,
+    get_account_requests_limits,
+)
+from salesloop_linkedin_api.statistic import get_redis_connection
+
+logger = logging.getLogger("application")
+
+QUOTA_PERIOD = 86400
+
+# Refill and take tokens atomically. Returns taken flag and seconds until requested tokens
+# are available (as string, Lua numbers are truncated to integers).
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local consume = tonumber(ARGV[4])
+
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local taken = 0
+local wait = 0
+if tokens >= requested then
+    if consume == 1 then
+        tokens = tokens - requested
+        taken = 1
+    end
+else
+    wait = (requested - tokens) / rate
+end
+
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 60)
+return {taken, tostring(wait)}
+"""
+
+
+class QuotaExceeded(Exception):
+    """
+    Account has no quota left for the request type
+    """
+
+    def __init__(self, account, request_type, retry_after: float):
+        super().__init__(
+            f"Account {account} {request_type} requests quota is exceeded, "
+            f"retry after {retry_after:.0f} seconds"
+        )
+        self.account = account
+        self.request_type = request_type
+        self.retry_after = retry_after
+
+
+class RedisTokenBuckets:
+    """
+    Token buckets in redis hashes, shared by all processes
+    """
+
+    def __init__(self, rds, key_prefix="ln.api.quota"):
+        self.rds = rds
+        self.key_prefix = key_prefix
+        self._script = rds.register_script(TOKEN_BUCKET_LUA)
+
+    def take(self, key, capacity, rate, consume=True) -> tuple:
+        """
+        Returns:
+            (token is taken, seconds until token is available)
+        """
+        taken, wait = self._script(
+            keys=[f"{self.key_prefix}:{key}"], args=[capacity, rate, 1, int(consume)]
+        )
+        return bool(int(taken)), float(wait)
+
+
+class LocalTokenBuckets:
+    """
+    In-process token buckets, for single process workers
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, consume=True) -> tuple:
+        now = time.time()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+
+            taken = False
+            wait = 0.0
+            if tokens >= 1:
+                if consume:
+                    tokens -= 1
+                    taken = True
+            else:
+                wait = (1 - tokens) / rate
+
+            self._buckets[key] = (tokens, now)
+
+        return taken, wait
+
+
+class QuotaEngine:
+    """
+    Takes a token of the account request type before each request.
+
+    Policy, when bucket is empty:
+        "wait" - sleep until a token is refilled, QuotaExceeded is raised
+            if it won't be refilled in `max_wait` seconds
+        "reject" - raise QuotaExceeded at once, so caller can run other work first
+        "reorder" - raise QuotaExceeded at once, AccountPool moves the call behind other
+            queued calls of the account and runs it again when quota is refilled
+
+    Account limits are computed once and cached, new accounts limits are used until
+    `set_account_limits` is called. Request types without limits aren't limited.
+    """
+
+    def __init__(self, buckets, policy=QUOTA_POLICY, max_wait=QUOTA_MAX_WAIT):
+        self.buckets = buckets
+        self.policy = policy
+        self.max_wait = max_wait
+
+        self._limits = {}
+        self._limits_lock = threading.Lock()
+
+    def set_account_limits(self, account, connections_number: int, is_premium: bool) -> dict:
+        limits = get_account_requests_limits(connections_number, is_premium)
+        with self._limits_lock:
+            self._limits[account] = limits
+
+        return limits
+
+    def get_account_limits(self, account) -> dict:
+        limits = self._limits.get(account)
+        if limits is None:
+            limits = self.set_account_limits(account, 0, False)
+
+        return limits
+
+    def _take(self, account, request_type, consume=True):
+        """
+        Returns:
+            (token is taken, seconds until token is available)
+        """
+        limit = self.get_account_limits(account).get(request_type)
+        if not limit:
+            return True, 0.0
+
+        try:
+            return self.buckets.take(
+                f"{account}:{request_type}", limit, limit / QUOTA_PERIOD, consume=consume
+            )
+        except RedisError as e:
+            logger.warning(f"Can't check {account} {request_type} quota: {e}, skip it")
+            return True, 0.0
+
+    def available_in(self, account, request_type) -> float:
+        """
+        Seconds until account can send request of the type, without taking a token
+        """
+        return self._take(account, request_type, consume=False)[1]
+
+    def _check_wait(self, account, request_type, wait):
+        if self.policy in ("reject", "reorder") or wait > self.max_wait:
+            raise QuotaExceeded(account, request_type, wait)
+
+        logger.info(
+            "Account %s %s requests quota is exceeded, wait %.1f seconds",
+            account,
+            request_type,
+            wait,
+        )
+
+    def acquire(self, account, request_type):
+        while True:
+            taken, wait = self._take(account, request_type)
+            if taken:
+                return
+
+            self._check_wait(account, request_type, wait)
+            time.sleep(wait)
+
+    async def async_acquire(self, account, request_type):
+        """
+        Like `acquire`, other accounts requests are running while waiting
+        """
+        while True:
+            taken, wait = self._take(account, request_type)
+            if taken:
+                return
+
+            self._check_wait(account, request_type, wait)
+            await asyncio.sleep(wait)
+
+
+_default_quota = None
+_default_quota_lock = threading.Lock()
+
+
+def get_default_quota():
+    """
+    Quota engine shared by Linkedin instances of the process, based on QUOTA_POLICY and
+    QUOTA_BACKEND. None is returned if quota isn't enforced.
+    """
+    global _default_quota
+
+    if QUOTA_POLICY == "none":
+        return None
+
+    if _default_quota is None:
+        with _default_quota_lock:
+            if _default_quota is None:
+                if QUOTA_BACKEND == "local":
+                    buckets = LocalTokenBuckets()
+                else:
+                    buckets = RedisTokenBuckets(get_redis_connection())
+
+                _default_quota = QuotaEngine(buckets)
+
+    return _default_quota
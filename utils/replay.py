@@ -0,0 +1,340 @@
+"""
+Record/replay of Linkedin client HTTP traffic, to run the client offline (tests, benchmarks).
+
+Record responses of a live session:
+
+    api.client.session = RecordingSession(api.client.session)
+    ...  # call api methods
+    api.client.session.save("fixtures/search.json")
+
+Replay them without network, e.g. `Linkedin(..., session=ReplaySession.load(path))`.
+Recorded responses are scrubbed of credentials and personal data (Scrubber). Tests and
+benchmarks of the package replay synthetic payloads (`fixture_entry`), not recordings.
+"""
+import json
+import logging
+import re
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from curl_cffi.requests import Cookies, Headers
+from curl_cffi.requests.exceptions import RequestsError
+
+logger = logging.getLogger("application")
+
+FIXTURE_VERSION = 1
+
+# Response headers saved to fixtures, other headers (cookies, tracking ids) are dropped
+RECORDED_HEADERS = ("content-type",)
+
+# JSON keys with personal data of the account and third-party profiles (leads, connections,
+# messages participants), their string values are replaced when recorded. Public ids are
+# kept, they are in request urls too: use Scrubber replacements for them
+PII_KEYS = frozenset(
+    (
+        # Contact info
+        "emailAddress",
+        "phoneNumbers",
+        "twitterHandles",
+        "address",
+        "birthDateOn",
+        "weChatContactInfo",
+        "ims",
+        "websites",
+        # Names
+        "firstName",
+        "lastName",
+        "maidenName",
+        "fullName",
+        "formattedName",
+        # Profile
+        "headline",
+        "occupation",
+        "summary",
+        "locationName",
+        "geoLocationName",
+        "geoRegion",
+        "profilePicture",
+        "profilePictureDisplayImage",
+        "backgroundPicture",
+        "picture",
+        # Messages
+        "body",
+        "subject",
+    )
+)
+
+SCRUBBED = "SCRUBBED"
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+
+
+class ReplayMissError(LookupError):
+    """
+    Request has no recorded response
+    """
+
+
+def request_url(url: str, params=None) -> str:
+    """
+    Full request url, with query params sorted, so equal requests have equal urls
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(key), str(value)) for key, value in dict(params).items())
+
+    return urlunsplit(parts._replace(query=urlencode(sorted(query)), fragment=""))
+
+
+def request_path(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+class Scrubber:
+    """
+    Removes credentials and personal data from recorded requests and responses.
+
+    Args:
+        secrets: exact strings (cookies, csrf token) replaced everywhere
+        replacements: real value -> fake value, e.g. account owner name
+    """
+
+    def __init__(self, secrets=(), replacements=None):
+        self.secrets = [secret for secret in secrets if secret]
+        self.replacements = dict(replacements or {})
+
+    def text(self, text: str) -> str:
+        for secret in self.secrets:
+            text = text.replace(secret, SCRUBBED)
+
+        for value, replacement in self.replacements.items():
+            text = text.replace(value, replacement)
+
+        return EMAIL_RE.sub("user@example.com", text)
+
+    def data(self, data):
+        if isinstance(data, dict):
+            return {
+                key: self.scrub(value) if key in PII_KEYS else self.data(value)
+                for key, value in data.items()
+            }
+        if isinstance(data, list):
+            return [self.data(item) for item in data]
+
+        return data
+
+    def scrub(self, value):
+        """
+        Replace strings of personal data value, its structure is kept, so replayed responses
+        are parsed like real ones
+        """
+        if isinstance(value, dict):
+            return {key: self.scrub(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.scrub(item) for item in value]
+        if isinstance(value, str) and value:
+            return SCRUBBED
+
+        return value
+
+    def body(self, content: bytes) -> str:
+        text = content.decode("utf-8", errors="replace")
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return self.text(text)
+
+        return self.text(json.dumps(self.data(data)))
+
+
+class ReplayResponse:
+    """
+    Recorded response, with the subset of curl_cffi Response interface used by the client
+    """
+
+    def __init__(self, url, status_code=200, content=b"", headers=None, reason=""):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = Headers(headers or {})
+        self.reason = reason
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self, **kwargs):
+        return json.loads(self.content, **kwargs)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RequestsError(f"HTTP Error {self.status_code}: {self.reason}")
+
+    @classmethod
+    def from_entry(cls, entry: dict) -> "ReplayResponse":
+        return cls(
+            url=entry["url"],
+            status_code=entry["status_code"],
+            content=entry["body"].encode(),
+            headers=entry.get("headers"),
+        )
+
+
+def load_fixtures(path) -> list:
+    with open(path) as f:
+        fixtures = json.load(f)
+
+    if fixtures.get("version") != FIXTURE_VERSION:
+        raise ValueError(f"Unsupported fixtures version: {fixtures.get('version')}")
+
+    return fixtures["entries"]
+
+
+def save_fixtures(path, entries: list):
+    with open(path, "w") as f:
+        json.dump({"version": FIXTURE_VERSION, "entries": entries}, f, indent=1)
+
+
+def fixture_entry(method, url, body, status_code=200, headers=None, params=None) -> dict:
+    """
+    Fixture entry of a response, `body` is str, bytes or JSON serializable object
+    """
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    elif not isinstance(body, str):
+        body = json.dumps(body)
+        headers = {"content-type": "application/json", **(headers or {})}
+
+    return {
+        "method": method.upper(),
+        "url": request_url(url, params),
+        "status_code": status_code,
+        "headers": dict(headers or {}),
+        "body": body,
+    }
+
+
+class ReplaySession:
+    """
+    Offline session, which serves recorded responses instead of sending requests.
+
+    Responses are matched by method and url (query params order doesn't matter),
+    then by method and url path. Responses of repeated requests are served in recorded
+    order, the last one is repeated. ReplayMissError is raised for unknown requests.
+    """
+
+    def __init__(self, entries=()):
+        self.cookies = Cookies()
+        self.headers = Headers()
+        self.max_redirects = None
+        self.requests = []
+
+        self._entries = []
+        self._served = set()
+        self._by_url = defaultdict(list)
+        self._by_path = defaultdict(list)
+        for entry in entries:
+            self.add(entry)
+
+    @classmethod
+    def load(cls, *paths) -> "ReplaySession":
+        return cls([entry for path in paths for entry in load_fixtures(path)])
+
+    def add(self, entry: dict):
+        method = entry["method"].upper()
+        entry_id = len(self._entries)
+        self._entries.append(entry)
+        self._by_url[(method, request_url(entry["url"]))].append(entry_id)
+        self._by_path[(method, request_path(entry["url"]))].append(entry_id)
+
+    def _next(self, entry_ids: list) -> dict:
+        entry_id = next((i for i in entry_ids if i not in self._served), entry_ids[-1])
+        self._served.add(entry_id)
+        return self._entries[entry_id]
+
+    def _replay(self, method, url, params=None, **kwargs) -> ReplayResponse:
+        full_url = request_url(url, params)
+        self.requests.append((method, full_url))
+
+        entries = self._by_url.get((method, full_url)) or self._by_path.get(
+            (method, request_path(full_url))
+        )
+        if not entries:
+            raise ReplayMissError(f"No recorded response for {method} {full_url}")
+
+        return ReplayResponse.from_entry(self._next(entries))
+
+    def get(self, url, **kwargs):
+        return self._replay("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._replay("POST", url, **kwargs)
+
+    def close(self):
+        pass
+
+
+class AsyncReplaySession(ReplaySession):
+    """
+    Asyncio flavour of `ReplaySession`, for AsyncClient
+    """
+
+    async def get(self, url, **kwargs):
+        return self._replay("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return self._replay("POST", url, **kwargs)
+
+    async def close(self):
+        pass
+
+
+class RecordingSession:
+    """
+    Wraps live session and records scrubbed responses of its requests.
+    Session cookies and csrf token are always scrubbed.
+    """
+
+    def __init__(self, session, replacements=None):
+        self.session = session
+        self.entries = []
+
+        secrets = [cookie.value for cookie in session.cookies.jar]
+        secrets.append(session.headers.get("csrf-token"))
+        self.scrubber = Scrubber(secrets=secrets, replacements=replacements)
+
+    def __getattr__(self, name):
+        # cookies, headers and other session attributes
+        return getattr(self.session, name)
+
+    def _record(self, method, url, response, params=None):
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() in RECORDED_HEADERS
+        }
+        self.entries.append(
+            fixture_entry(
+                method,
+                self.scrubber.text(request_url(url, params)),
+                self.scrubber.body(response.content),
+                status_code=response.status_code,
+                headers=headers,
+            )
+        )
+        return response
+
+    def get(self, url, params=None, **kwargs):
+        return self._record("GET", url, self.session.get(url, params=params, **kwargs), params)
+
+    def post(self, url, params=None, **kwargs):
+        return self._record("POST", url, self.session.post(url, params=params, **kwargs), params)
+
+    def save(self, path):
+        save_fixtures(path, self.entries)
+        logger.info("Saved %d recorded responses to %s", len(self.entries), path)
@@ -0,0 +1,147 @@
+"""
+Request flows: Linkedin methods doing requests are written once, as generators which yield
+`Request` and get its response back. Linkedin runs flows with the blocking session and
+AsyncLinkedin with the async one, so building requests and parsing responses is shared:
+
+    @request_flow
+    def get_user_profile(self):
+        res = yield Request("GET", "/me")
+        return response_json(res)
+
+Request errors are raised inside the flow at its `yield`. Other flows are called with
+`yield from`, e.g. `navs = yield from self.dash_global_navs.flow(self)`.
+
+Values yielded by `iter_request_flow` generators, which aren't requests, are items
+of the iterator (generator with Linkedin, async generator with AsyncLinkedin).
+"""
+import functools
+
+
+class Request:
+    """
+    Request to send with `Linkedin._fetch` ("GET") or `Linkedin._post` ("POST")
+    """
+
+    __slots__ = ("method", "uri", "kwargs")
+
+    def __init__(self, method, uri, **kwargs):
+        self.method = method
+        self.uri = uri
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        return f"Request({self.method!r}, {self.uri!r})"
+
+
+def request_flow(method):
+    """
+    Linkedin method written as a request flow, it's run by `_run_flow` of the instance
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self._run_flow(method(self, *args, **kwargs))
+
+    wrapper.flow = method
+    return wrapper
+
+
+def iter_request_flow(method):
+    """
+    Linkedin iterator method written as a request flow, it's run by `_iter_flow`
+    of the instance
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self._iter_flow(method(self, *args, **kwargs))
+
+    wrapper.flow = method
+    return wrapper
+
+
+def run_flow(flow, send):
+    """
+    Run flow, requests are sent with `send(request)`
+
+    Returns:
+        flow result
+    """
+    response = error = None
+    while True:
+        try:
+            request = flow.throw(error) if error is not None else flow.send(response)
+        except StopIteration as e:
+            return e.value
+
+        response = error = None
+        try:
+            response = send(request)
+        except Exception as e:
+            error = e
+
+
+def iter_flow(flow, send):
+    """
+    Run iterator flow, requests are sent with `send(request)`, other values are yielded
+    """
+    response = error = None
+    try:
+        while True:
+            try:
+                value = flow.throw(error) if error is not None else flow.send(response)
+            except StopIteration:
+                return
+
+            response = error = None
+            if isinstance(value, Request):
+                try:
+                    response = send(value)
+                except Exception as e:
+                    error = e
+            else:
+                yield value
+    finally:
+        flow.close()
+
+
+async def async_run_flow(flow, send):
+    """
+    Asyncio flavour of `run_flow`, `send(request)` is a coroutine function
+    """
+    response = error = None
+    while True:
+        try:
+            request = flow.throw(error) if error is not None else flow.send(response)
+        except StopIteration as e:
+            return e.value
+
+        response = error = None
+        try:
+            response = await send(request)
+        except Exception as e:
+            error = e
+
+
+async def async_iter_flow(flow, send):
+    """
+    Asyncio flavour of `iter_flow`, `send(request)` is a coroutine function
+    """
+    response = error = None
+    try:
+        while True:
+            try:
+                value = flow.throw(error) if error is not None else flow.send(response)
+            except StopIteration:
+                return
+
+            response = error = None
+            if isinstance(value, Request):
+                try:
+                    response = await send(value)
+                except Exception as e:
+                    error = e
+            else:
+                yield value
+    finally:
+        flow.close()
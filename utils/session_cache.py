@@ -0,0 +1,212 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from salesloop_linkedin_api.settings import (
+    SESSION_CACHE_BACKEND,
+    SESSION_CACHE_MAX_IDLE,
+    SESSION_CACHE_SIZE,
+)
+from salesloop_linkedin_api.utils.session_snapshot import dump_cookies, restore_session
+
+logger = logging.getLogger("application")
+
+
+class _CachedClient:
+    __slots__ = (
+        "client",
+        "api_cookies",
+        "api_headers",
+        "session_cookies",
+        "in_use",
+        "released_at",
+    )
+
+    def __init__(self, client, api_cookies, api_headers):
+        self.client = client
+        # Snapshots the client session was created or restored with
+        self.api_cookies = api_cookies
+        self.api_headers = api_headers
+        # Cookies of the client session, when it was released
+        self.session_cookies = api_cookies
+        self.in_use = True
+        self.released_at = None
+
+    def is_synced(self, api_cookies, api_headers):
+        return api_headers == self.api_headers and api_cookies in (
+            self.api_cookies,
+            self.session_cookies,
+        )
+
+
+class SessionCache:
+    """
+    Process-level cache of live Linkedin clients, keyed by linkedin login id and proxies.
+
+    Client is checked out by one Linkedin instance at a time and returned to the cache on
+    `Linkedin.close`, so back-to-back tasks of the account reuse its warm session: open
+    connections, TLS sessions and cookies updated by LinkedIn responses. If the account client
+    is checked out, a new client is created and closed on release.
+
+    Client is reused as is, when task snapshots are the ones the client was created or
+    restored with, or its cookies on the last release. Otherwise cookies and headers of the
+    client session are replaced with the new snapshots. When LinkedIn updates session cookies,
+    `on_cookies_refresh` is called on release with login id and new cookies snapshot, e.g. to
+    save it for the next tasks.
+
+    Clients idle for more than `max_idle` seconds are closed, at most `max_size` idle clients
+    are cached. Checked out clients don't count toward `max_size`, they are returned on
+    `Linkedin.close` or when the instance is garbage collected.
+    """
+
+    def __init__(
+        self, max_idle=SESSION_CACHE_MAX_IDLE, max_size=SESSION_CACHE_SIZE, on_cookies_refresh=None
+    ):
+        self.max_idle = max_idle
+        self.max_size = max_size
+        self.on_cookies_refresh = on_cookies_refresh
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._clients)
+
+    @staticmethod
+    def get_key(linkedin_login_id, proxies):
+        return linkedin_login_id, repr(sorted((proxies or {}).items()))
+
+    def acquire(self, linkedin_login_id, proxies, api_cookies, api_headers, create_client):
+        """
+        Check out client of the account, `create_client` is called without arguments to
+        create a new one
+        """
+        key = self.get_key(linkedin_login_id, proxies)
+        checked_out = False
+        with self._lock:
+            expired = self._pop_expired()
+            cached = self._clients.get(key)
+            if cached is not None and not cached.in_use:
+                cached.in_use = True
+                checked_out = True
+                self._clients.move_to_end(key)
+
+        self._close_clients(expired)
+
+        if cached is None:
+            client = create_client()
+            with self._lock:
+                if key not in self._clients:
+                    self._clients[key] = _CachedClient(client, api_cookies, api_headers)
+            return client
+
+        if not checked_out:
+            logger.debug("Account %s session is in use, create new client", key[0])
+            return create_client()
+
+        if cached.is_synced(api_cookies, api_headers):
+            logger.debug("Reuse account %s session", key[0])
+        else:
+            logger.debug("Account %s session snapshots are changed, restore session", key[0])
+            cached.client.session.cookies.clear()
+            restore_session(cached.client.session, api_cookies, api_headers)
+            cached.api_cookies = cached.session_cookies = api_cookies
+            cached.api_headers = api_headers
+
+        return cached.client
+
+    def release(self, linkedin_login_id, proxies, client):
+        """
+        Return client to the cache, clients not owned by the cache are closed
+        """
+        key = self.get_key(linkedin_login_id, proxies)
+        with self._lock:
+            cached = self._clients.get(key)
+            owned = cached is not None and cached.client is client
+
+        if not owned:
+            client.close()
+            return
+
+        api_cookies = dump_cookies(client.session)
+        if api_cookies != cached.session_cookies:
+            cached.session_cookies = api_cookies
+            if self.on_cookies_refresh:
+                try:
+                    self.on_cookies_refresh(linkedin_login_id, api_cookies)
+                except Exception as e:
+                    logger.warning("Failed save account %s cookies", key[0], exc_info=e)
+
+        with self._lock:
+            cached.in_use = False
+            cached.released_at = time.monotonic()
+            expired = self._pop_expired()
+
+        self._close_clients(expired)
+
+    def discard(self, linkedin_login_id, proxies):
+        """
+        Close and remove client of the account, e.g. when its session is logged out
+        """
+        with self._lock:
+            cached = self._clients.pop(self.get_key(linkedin_login_id, proxies), None)
+
+        if cached is not None and not cached.in_use:
+            cached.client.close()
+
+    def clear(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+
+        self._close_clients([cached.client for cached in clients if not cached.in_use])
+
+    def _pop_expired(self):
+        """
+        Remove clients idle over max_idle and least recently used idle clients over max_size,
+        called with the lock held
+
+        Returns:
+            removed clients, which should be closed
+        """
+        idle = [(key, cached) for key, cached in self._clients.items() if not cached.in_use]
+        over_size = len(idle) - self.max_size
+
+        expired = []
+        now = time.monotonic()
+        for key, cached in idle:
+            if over_size > 0 or now - cached.released_at > self.max_idle:
+                del self._clients[key]
+                expired.append(cached.client)
+                over_size -= 1
+
+        return expired
+
+    def _close_clients(self, clients):
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning("Failed close cached client", exc_info=e)
+
+
+_default_session_cache = None
+_default_session_cache_lock = threading.Lock()
+
+
+def get_default_session_cache():
+    """
+    Session cache shared by Linkedin instances of the process, based on SESSION_CACHE_BACKEND.
+    None is returned if sessions aren't cached.
+    """
+    global _default_session_cache
+
+    if SESSION_CACHE_BACKEND == "none":
+        return None
+
+    if _default_session_cache is None:
+        with _default_session_cache_lock:
+            if _default_session_cache is None:
+                _default_session_cache = SessionCache()
+
+    return _default_session_cache
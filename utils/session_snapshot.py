@@ -0,0 +1,233 @@
+"""
+Session snapshots: LinkedIn cookies and fingerprint headers of the client session, saved
+between tasks (`api_cookies`, `api_headers`) to restore the session without login.
+
+Snapshot is a compact JSON document with schema version, keys and cookies are sorted,
+so snapshots of the same session are equal and can be diffed:
+
+    {"cookies":[{"domain":".linkedin.com","expires":null,"httponly":false,...}],"version":1}
+    {"headers":{"csrf-token":"ajax:123","user-agent":"Mozilla/5.0 ..."},"version":1}
+
+Cookies are validated against cookies_schema.json. Pickled cookie jars and headers of old
+sessions are loaded only with SESSION_SNAPSHOT_PICKLE_FALLBACK, to migrate them to snapshots.
+"""
+import json
+import logging
+import os
+import pickle
+import threading
+from http.cookiejar import Cookie
+
+from salesloop_linkedin_api.settings import ROOT_DIR, SESSION_SNAPSHOT_PICKLE_FALLBACK
+from salesloop_linkedin_api.utils.json_codec import JSONDecodeError, loads
+
+logger = logging.getLogger("application")
+
+SNAPSHOT_VERSION = 1
+COOKIES_SCHEMA_PATH = os.path.join(ROOT_DIR, "cookies_schema.json")
+COOKIES_DOMAIN = "linkedin.com"
+# Headers which identify the client, other session headers aren't saved
+FINGERPRINT_HEADERS = frozenset(
+    (
+        "user-agent",
+        "csrf-token",
+        "accept-language",
+        "x-li-lang",
+        "x-restli-protocol-version",
+        "x-li-track",
+    )
+)
+PICKLE_PREFIX = b"\x80"
+
+_cookies_validator = None
+_cookies_validator_lock = threading.Lock()
+
+
+class SessionSnapshotError(ValueError):
+    pass
+
+
+def _dumps(data: dict) -> bytes:
+    return json.dumps(data, separators=(",", ":"), sort_keys=True).encode()
+
+
+def _get_cookies_validator():
+    """
+    Cookies validator, jsonschema is optional: without it only required cookie fields
+    of the schema are checked
+    """
+    global _cookies_validator
+
+    if _cookies_validator is None:
+        with _cookies_validator_lock:
+            if _cookies_validator is None:
+                with open(COOKIES_SCHEMA_PATH) as f:
+                    schema = json.load(f)
+
+                try:
+                    import jsonschema
+                except ImportError:  # pragma: no cover
+                    required = schema["items"]["required"]
+
+                    def validate(cookies):
+                        for cookie in cookies:
+                            missing = [key for key in required if key not in cookie]
+                            if missing:
+                                raise SessionSnapshotError(f"Cookie misses fields: {missing}")
+
+                    _cookies_validator = validate
+                else:
+                    validator_class = jsonschema.validators.validator_for(schema)
+                    validator = validator_class(schema)
+
+                    def validate(cookies):
+                        error = jsonschema.exceptions.best_match(validator.iter_errors(cookies))
+                        if error is not None:
+                            raise SessionSnapshotError(f"Invalid cookies: {error.message}")
+
+                    _cookies_validator = validate
+
+    return _cookies_validator
+
+
+def cookie_to_dict(cookie: Cookie) -> dict:
+    return {
+        "domain": cookie.domain,
+        "expires": cookie.expires,
+        "httponly": cookie.has_nonstandard_attr("HttpOnly"),
+        "name": cookie.name,
+        "path": cookie.path,
+        "secure": cookie.secure,
+        "value": cookie.value,
+    }
+
+
+def cookie_from_dict(data: dict) -> Cookie:
+    domain = data["domain"]
+    return Cookie(
+        version=0,
+        name=data["name"],
+        value=data["value"],
+        port=None,
+        port_specified=False,
+        domain=domain,
+        domain_specified=bool(domain),
+        domain_initial_dot=domain.startswith("."),
+        path=data["path"],
+        path_specified=True,
+        secure=data["secure"],
+        expires=data.get("expires"),
+        discard=data.get("expires") is None,
+        comment=None,
+        comment_url=None,
+        rest={"HttpOnly": None} if data["httponly"] else {},
+    )
+
+
+def dump_cookies(session) -> bytes:
+    """
+    Snapshot of session LinkedIn cookies
+    """
+    cookies = sorted(
+        (
+            cookie_to_dict(cookie)
+            for cookie in session.cookies.jar
+            if cookie.domain.endswith(COOKIES_DOMAIN)
+        ),
+        key=lambda cookie: (cookie["domain"], cookie["path"], cookie["name"]),
+    )
+    return _dumps({"version": SNAPSHOT_VERSION, "cookies": cookies})
+
+
+def dump_headers(session) -> bytes:
+    """
+    Snapshot of session fingerprint headers
+    """
+    headers = {
+        name.lower(): value
+        for name, value in session.headers.items()
+        if name.lower() in FINGERPRINT_HEADERS
+    }
+    return _dumps({"version": SNAPSHOT_VERSION, "headers": headers})
+
+
+def is_pickled(data) -> bool:
+    """
+    Returns:
+        True if api cookies or headers are pickled by old sessions
+    """
+    if isinstance(data, str):
+        data = data.encode()
+
+    return bool(data) and data.startswith(PICKLE_PREFIX)
+
+
+def _load_snapshot(data, key):
+    if isinstance(data, str):
+        data = data.encode()
+
+    if is_pickled(data):
+        if not SESSION_SNAPSHOT_PICKLE_FALLBACK:
+            raise SessionSnapshotError("Pickled sessions aren't supported")
+
+        logger.debug("Load pickled session %s", key)
+        return None, pickle.loads(data)
+
+    try:
+        snapshot = loads(data)
+    except JSONDecodeError as e:
+        raise SessionSnapshotError(f"Invalid session snapshot: {e}") from None
+
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        raise SessionSnapshotError("Unsupported session snapshot version")
+
+    if key not in snapshot:
+        raise SessionSnapshotError(f"Session snapshot has no {key}")
+
+    return snapshot[key], None
+
+
+def load_cookies(data) -> list:
+    """
+    Returns:
+        cookies of snapshot or pickled cookie jar, as Cookie objects
+    """
+    cookies, legacy = _load_snapshot(data, "cookies")
+    if legacy is not None:
+        # cookiejar internal structure: domain -> path -> name -> Cookie
+        return [
+            cookie
+            for paths in legacy.values()
+            for names in paths.values()
+            for cookie in names.values()
+        ]
+
+    _get_cookies_validator()(cookies)
+    return [cookie_from_dict(cookie) for cookie in cookies]
+
+
+def load_headers(data) -> dict:
+    """
+    Returns:
+        headers of snapshot or pickled headers
+    """
+    headers, legacy = _load_snapshot(data, "headers")
+    if legacy is not None:
+        return dict(legacy)
+
+    if not isinstance(headers, dict):
+        raise SessionSnapshotError("Invalid session snapshot headers")
+
+    return headers
+
+
+def restore_session(session, api_cookies=None, api_headers=None):
+    """
+    Restore session cookies and headers from snapshots
+    """
+    if api_cookies:
+        for cookie in load_cookies(api_cookies):
+            session.cookies.jar.set_cookie(cookie)
+
+    if api_headers:
+        session.headers.update(load_headers(api_headers))